@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Measure point-in-area lookups with the ``.sidx`` spatial index.
+
+Samples random points inside the bounding box of a TopoJSON file and compares:
+
+* ``brute``: ``shapely.contains_xy`` of every point against every feature
+* ``indexed``: ``SpatialIndex.lookup`` (packed R-tree + exact test)
+
+Both must resolve every point to the same area id. Brute force only runs on
+the first ``--brute-points`` points.
+
+Usage example:
+
+    python benchmarks/bench_lookup.py data/global_areas.topojson --points 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import shapely
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.spatial_index import SpatialIndex, write_spatial_index  # noqa: E402
+
+
+def brute_lookup(index: SpatialIndex, points: np.ndarray) -> np.ndarray:
+    result = np.full(len(points), None, dtype=object)
+    best = np.full(len(points), len(index.rank), dtype=np.int64)
+    for feature, geometry in enumerate(index.geometries):
+        if geometry is None:
+            continue
+        inside = shapely.contains_xy(geometry, points[:, 0], points[:, 1])
+        best[inside] = np.minimum(best[inside], index.rank_of[feature])
+    matched = best < len(index.rank)
+    result[matched] = index.ids[index.rank[best[matched]]]
+    return result
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path, help="TopoJSON file to query")
+    parser.add_argument("--points", type=int, default=1_000_000, help="Random points to look up (default: %(default)s)")
+    parser.add_argument("--brute-points", type=int, default=20_000, help="Points checked by brute force (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    write_spatial_index(args.path)
+    index = SpatialIndex.open(args.path)
+    print(f"Loaded {len(index.ids):,} features and index in {time.perf_counter() - start:.2f}s")
+
+    minx, miny, maxx, maxy = shapely.total_bounds(index.geometries[index.geometries != None])  # noqa: E711
+    rng = np.random.default_rng(args.seed)
+    points = np.column_stack([rng.uniform(minx, maxx, args.points), rng.uniform(miny, maxy, args.points)])
+
+    start = time.perf_counter()
+    ids = index.lookup(points)
+    indexed = time.perf_counter() - start
+
+    sample = points[: args.brute_points]
+    start = time.perf_counter()
+    expected = brute_lookup(index, sample)
+    brute = (time.perf_counter() - start) * len(points) / max(len(sample), 1)
+
+    identical = bool(np.all(expected == ids[: len(sample)]))
+    print(
+        f"{len(points):,} points: indexed {indexed:.2f}s ({len(points) / indexed * 60 / 1e6:.1f}M points/min), "
+        f"brute force ~{brute:.1f}s (extrapolated), {np.mean(ids != None):.1%} inside an area"  # noqa: E711
+        f"{'' if identical else '  RESULTS DIFFER'}"
+    )
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
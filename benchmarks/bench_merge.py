@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Measure the merge stage of ``build_global_dataset``.
+
+Loads every ``*_combined_areas.topojson`` under ``data/`` (like the global
+build does) and compares wall time and peak traced memory (``tracemalloc``)
+of merging and emitting them with:
+
+* ``legacy``: ``copy.deepcopy`` of every feature into per-feature dict records
+* ``current``: ``IPCAreaDownloader.merge_features`` + ``emit_features``
+
+Feature loading is excluded from the measurement; both variants must emit
+identical features.
+
+Usage example:
+
+    python benchmarks/bench_merge.py --limit 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from bench_suite import scratch_downloader  # noqa: E402
+from scripts.feature_keys import DEFAULT_KEY_STRATEGY, feature_key  # noqa: E402
+from scripts.topojson_io import load_topojson_features  # noqa: E402
+
+DATA_DIR = REPO_ROOT / "data"
+
+Sources = List[List[Dict[str, Any]]]
+
+
+def legacy_merge(sources: Sources) -> List[Dict[str, Any]]:
+    aggregate: Dict[str, Dict[str, Any]] = {}
+    for features in sources:
+        for feature in features:
+            feature_copy = copy.deepcopy(feature)
+            props = feature_copy.get("properties") or {}
+            key = feature_key(feature_copy)
+            candidate = {
+                "feature": feature_copy,
+                "priority": 0,
+                "source_year": props.get("year"),
+                "source_label": "",
+                "title": props.get("title"),
+            }
+            existing = aggregate.get(key)
+            if existing is None or (candidate["source_year"] or 0) >= (existing["source_year"] or 0):
+                aggregate[key] = candidate
+    return [entry["feature"] for _, entry in sorted(aggregate.items(), key=lambda item: item[0])]
+
+
+def current_merge(sources: Sources) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory(prefix="ipc-merge-") as scratch:
+        downloader = scratch_downloader(Path(scratch), key_strategy=DEFAULT_KEY_STRATEGY, precision=4)
+        aggregate: Dict[str, Any] = {}
+        for features in sources:
+            downloader.merge_features(aggregate, features, priority=0, source_year=None, source_label="")
+        return downloader.emit_features(aggregate)
+
+
+def measure(func: Callable[[Sources], List[Dict[str, Any]]], sources: Sources) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = func(sources)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(sources)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": elapsed, "peak_bytes": peak, "result": result}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=None, help="Only merge the first N combined files")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for machine-readable results")
+    args = parser.parse_args(argv)
+
+    paths = sorted(DATA_DIR.glob("*/*_combined_areas.topojson"))[: args.limit]
+    sources = [load_topojson_features(path) for path in paths]
+    feature_count = sum(len(features) for features in sources)
+
+    legacy = measure(legacy_merge, sources)
+    current = measure(current_merge, sources)
+    identical = json.dumps(legacy.pop("result")) == json.dumps(current.pop("result"))
+
+    print(f"Merged {feature_count:,} features from {len(paths)} combined files")
+    print(
+        f"time {legacy['seconds']:.3f}s -> {current['seconds']:.3f}s "
+        f"({legacy['seconds'] / max(current['seconds'], 1e-9):.1f}x)  "
+        f"peak {legacy['peak_bytes'] / 1e6:.1f} MB -> {current['peak_bytes'] / 1e6:.1f} MB"
+        f"{'' if identical else '  OUTPUT DIFFERS'}"
+    )
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(
+                {"files": len(paths), "features": feature_count, "legacy": legacy, "current": current, "identical": identical},
+                handle,
+                indent=2,
+            )
+
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
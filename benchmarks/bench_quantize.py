@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Report size and parse-time deltas of quantized TopoJSON output.
+
+For the largest TopoJSON files under ``data/`` this compares the committed
+absolute-coordinate payload with ``scripts.topojson_io.quantize_topology`` at
+one or more grid sizes:
+
+* serialised size (compact separators, as the scripts write it)
+* ``json.loads`` time (best of ``--repeat`` runs)
+* the largest coordinate error introduced by snapping to the grid
+
+Usage example:
+
+    python benchmarks/bench_quantize.py --largest 5 --quantize 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.topojson_io import decode_arcs, quantize_topology  # noqa: E402
+
+DATA_DIR = REPO_ROOT / "data"
+
+
+def parse_seconds(payload: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json.loads(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def max_error(topology: Dict[str, Any], quantized: Dict[str, Any]) -> float:
+    # Snapping drops repeated points, so only arc endpoints (always kept) can
+    # be paired up with the original positions.
+    error = 0.0
+    for before, after in zip(topology["arcs"], decode_arcs(quantized)):
+        for a, b in ((before[0], after[0]), (before[-1], after[-1])):
+            error = max(error, abs(a[0] - b[0]), abs(a[1] - b[1]))
+    return error
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--largest", type=int, default=5, help="Number of largest files to measure (default: 5)")
+    parser.add_argument(
+        "--quantize",
+        type=int,
+        nargs="+",
+        default=[100000],
+        help="Grid sizes to compare (default: 100000)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="json.loads repetitions per payload (default: 3)")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for machine-readable results")
+    args = parser.parse_args(argv)
+
+    files = sorted(DATA_DIR.rglob("*.topojson"), key=lambda path: path.stat().st_size, reverse=True)
+    results = []
+    for path in files[: args.largest]:
+        raw = path.read_text(encoding="utf-8")
+        topology = json.loads(raw)
+        if topology.get("transform"):
+            print(f"{path.name:<34} already quantized, skipped")
+            continue
+
+        baseline = {"bytes": len(raw.encode("utf-8")), "parse_seconds": parse_seconds(raw, args.repeat)}
+        variants = []
+        for quantization in args.quantize:
+            quantized = quantize_topology(json.loads(raw), quantization)
+            payload = json.dumps(quantized, separators=(",", ":"))
+            variant = {
+                "quantize": quantization,
+                "bytes": len(payload.encode("utf-8")),
+                "parse_seconds": parse_seconds(payload, args.repeat),
+                "max_endpoint_error": max_error(topology, quantized),
+            }
+            variants.append(variant)
+            print(
+                f"{path.name:<34} q={quantization:<8} "
+                f"size {baseline['bytes'] / 1e6:6.2f} MB -> {variant['bytes'] / 1e6:5.2f} MB "
+                f"({variant['bytes'] / baseline['bytes']:6.1%})  "
+                f"parse {baseline['parse_seconds'] * 1e3:7.1f} ms -> {variant['parse_seconds'] * 1e3:6.1f} ms  "
+                f"max error {variant['max_endpoint_error']:.2e}"
+            )
+
+        results.append({"file": path.relative_to(REPO_ROOT).as_posix(), "baseline": baseline, "quantized": variants})
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Compare the packed NumPy simplification path with the per-feature one.
+
+For the largest TopoJSON files under ``data/`` this measures wall time and
+peak traced memory (``tracemalloc``) of:
+
+* ``legacy``: JSON deep copy + Shapely ``simplify`` + recursive ``round`` per feature
+* ``packed``: ``scripts.simplify_ipc_global_areas.simplify_features``
+
+Both start from already decoded features and the outputs are checked to be
+identical.
+
+Usage example:
+
+    python benchmarks/bench_simplify.py --largest 5 --simplify-tolerance 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from shapely.geometry import shape  # noqa: E402
+
+from scripts.simplify_ipc_global_areas import round_nested, simplify_features  # noqa: E402
+from scripts.topojson_io import load_topojson_features  # noqa: E402
+
+DATA_DIR = REPO_ROOT / "data"
+
+Features = List[Dict[str, Any]]
+
+
+def legacy_simplify(features: Features, precision: int, tolerance: float) -> Features:
+    processed = []
+    for feature in features:
+        feature_copy = json.loads(json.dumps(feature))
+        geometry = feature_copy.get("geometry")
+        if isinstance(geometry, dict):
+            if tolerance > 0:
+                simplified = shape(geometry).simplify(tolerance, preserve_topology=True)
+                if not simplified.is_empty:
+                    geometry = json.loads(json.dumps(simplified.__geo_interface__))
+                    feature_copy["geometry"] = geometry
+            if "coordinates" in geometry:
+                geometry["coordinates"] = round_nested(geometry["coordinates"], precision)
+        processed.append(feature_copy)
+    return processed
+
+
+def packed_simplify(features: Features, precision: int, tolerance: float) -> Features:
+    return simplify_features(features, precision=precision, simplify_tolerance=tolerance)
+
+
+def measure(func: Callable[[Features, int, float], Features], features: Features, precision: int, tolerance: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = func(features, precision, tolerance)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(features, precision, tolerance)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": elapsed, "peak_bytes": peak, "result": result}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--largest", type=int, default=5, help="Number of largest files to measure (default: 5)")
+    parser.add_argument("--precision", type=int, default=4, help="Decimal places to keep (default: 4)")
+    parser.add_argument("--simplify-tolerance", type=float, default=0.0, help="Simplification tolerance (default: 0)")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for machine-readable results")
+    args = parser.parse_args(argv)
+
+    files = sorted(DATA_DIR.rglob("*.topojson"), key=lambda path: path.stat().st_size, reverse=True)
+    results = []
+    mismatches = 0
+    for path in files[: args.largest]:
+        features = load_topojson_features(path)
+        legacy = measure(legacy_simplify, features, args.precision, args.simplify_tolerance)
+        packed = measure(packed_simplify, features, args.precision, args.simplify_tolerance)
+        identical = json.dumps(legacy.pop("result")) == json.dumps(packed.pop("result"))
+        mismatches += not identical
+
+        results.append({
+            "file": path.relative_to(REPO_ROOT).as_posix(),
+            "features": len(features),
+            "legacy": legacy,
+            "packed": packed,
+            "identical": identical,
+        })
+        print(
+            f"{path.name:<34} {len(features):5d} features  "
+            f"time {legacy['seconds']:7.3f}s -> {packed['seconds']:6.3f}s "
+            f"({legacy['seconds'] / max(packed['seconds'], 1e-9):5.1f}x)  "
+            f"peak {legacy['peak_bytes'] / 1e6:7.1f} MB -> {packed['peak_bytes'] / 1e6:6.1f} MB"
+            f"{'' if identical else '  OUTPUT DIFFERS'}"
+        )
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite over the committed ``data/`` tree.
+
+Times the hot paths of the pipeline on fixed fixtures so regressions show up
+as a diff of the stored results:
+
+* ``load_features``: ``combine_ipc_areas.load_features_from_topojson``
+* ``simplify_topojson``: ``simplify_ipc_global_areas.simplify_topojson`` on a copy
+* ``collect_all_features``: ``combine_ipc_areas.collect_all_features``
+* ``save_topology``: ``combine_ipc_areas.save_topology`` of the collected features
+* ``merge_features``: ``IPCAreaDownloader.merge_features`` over the per-year files
+* ``find_duplicate_ids``: ``optimize_global_topojson.find_duplicate_ids``
+* ``replay_download``: a full ``IPCAreaDownloader.run()`` against
+  ``scripts/fake_ipc_api.py``, which serves the committed per-year files as
+  GeoJSON responses (no network access or ``IPC_KEY`` needed)
+
+Fixtures are ``small`` (AGO), ``medium`` (AFG), ``large`` (ZMB) and ``full``
+(every country; opt-in, it takes a long time). Each case reports the minimum
+and median per-call wall time of ``--repeat`` samples and the peak traced
+memory (``tracemalloc``) of one extra run. Like ``timeit``, a sample loops
+fast cases until it lasts at least ``MIN_SAMPLE_SECONDS`` so sub-millisecond
+timings are not dominated by timer noise. The replay case runs once and also
+stores the per-stage totals of the downloader's run report.
+
+Results are written as JSON to ``--output`` (default the git-ignored
+``build/bench_suite.json``); the reviewed baseline
+``benchmarks/results/bench_suite.json`` is only rewritten when passed as
+``--output`` on purpose. ``--compare`` prints the median ratio against an
+earlier result file and exits with status 1 when a case got slower than
+``--threshold`` and by more than ``--min-seconds`` per call.
+
+Usage examples:
+
+    python benchmarks/bench_suite.py --fixtures small medium --compare benchmarks/results/bench_suite.json
+    python benchmarks/bench_suite.py --output benchmarks/results/bench_suite.json  # refresh the baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import scripts.download_ipc_areas as downloader_module  # noqa: E402
+from scripts.combine_ipc_areas import collect_all_features, load_features_from_topojson, save_topology  # noqa: E402
+from scripts.download_ipc_areas import COUNTRY_COMBINED_SUFFIX, COUNTRY_FILENAME_SUFFIX, IPCAreaDownloader  # noqa: E402
+from scripts.fake_ipc_api import FakeIPCApi, running_api  # noqa: E402
+from scripts.feature_keys import DEFAULT_KEY_STRATEGY  # noqa: E402
+from scripts.optimize_global_topojson import find_duplicate_ids, load_geometries  # noqa: E402
+from scripts.simplify_ipc_global_areas import simplify_topojson  # noqa: E402
+from scripts.topojson_io import load_topojson_features  # noqa: E402
+
+DATA_DIR = REPO_ROOT / "data"
+COUNTRIES_CSV = REPO_ROOT / "countries.csv"
+DEFAULT_OUTPUT = REPO_ROOT / "build" / "bench_suite.json"
+FIXTURES: Dict[str, Optional[Tuple[str, ...]]] = {
+    "small": ("AGO",),
+    "medium": ("AFG",),
+    "large": ("ZMB",),
+    "full": None,
+}
+DEFAULT_FIXTURES = ("small", "medium", "large")
+MIN_SAMPLE_SECONDS = 0.2
+MAX_LOOPS = 10000
+DEFAULT_MIN_SECONDS = 0.002
+RESULTS_VERSION = 1
+
+Features = List[Dict[str, Any]]
+
+
+class Fixture:
+    """The committed files of a set of countries."""
+
+    def __init__(self, name: str, countries: Optional[Sequence[str]]):
+        self.name = name
+        if countries is None:
+            countries = sorted(path.name for path in DATA_DIR.iterdir() if path.is_dir())
+        self.countries = tuple(countries)
+        self.combined_files = [
+            DATA_DIR / iso3 / f"{iso3}{COUNTRY_COMBINED_SUFFIX}"
+            for iso3 in self.countries
+            if (DATA_DIR / iso3 / f"{iso3}{COUNTRY_COMBINED_SUFFIX}").exists()
+        ]
+        self.year_files = [
+            path
+            for iso3 in self.countries
+            for path in sorted((DATA_DIR / iso3).glob(f"{iso3}_*{COUNTRY_FILENAME_SUFFIX}"))
+            if path.name != f"{iso3}{COUNTRY_COMBINED_SUFFIX}"
+        ]
+
+    def years(self) -> List[int]:
+        years = set()
+        for path in self.year_files:
+            iso3 = path.parent.name
+            year = IPCAreaDownloader.extract_year_from_path(path, iso3)
+            if year is not None:
+                years.add(year)
+        return sorted(years, reverse=True)
+
+
+def fixture_countries(fixture: Fixture) -> List[Dict[str, str]]:
+    """``countries.csv`` rows of the fixture's countries."""
+    with open(COUNTRIES_CSV, "r", encoding="utf-8-sig", newline="") as handle:
+        return [
+            row
+            for row in csv.DictReader(handle)
+            if (row.get("Alpha_3_Code") or "").strip() in fixture.countries
+        ]
+
+
+# --- cases -----------------------------------------------------------------
+
+
+Case = Callable[[Fixture, Path], Tuple[Callable[[], Any], Callable[[Any], int]]]
+
+
+def case_load_features(fixture: Fixture, scratch: Path):
+    def run() -> int:
+        return sum(len(load_features_from_topojson(path)) for path in fixture.combined_files)
+
+    return run, lambda items: items
+
+
+def case_simplify_topojson(fixture: Fixture, scratch: Path):
+    def run() -> int:
+        # Work on fresh copies so every run simplifies the committed input.
+        for path in fixture.combined_files:
+            target = scratch / path.name
+            shutil.copyfile(path, target)
+            simplify_topojson(target, precision=4, quiet=True)
+        return len(fixture.combined_files)
+
+    return run, lambda items: items
+
+
+def case_collect_all_features(fixture: Fixture, scratch: Path):
+    def run() -> int:
+        return len(collect_all_features(fixture.combined_files))
+
+    return run, lambda items: items
+
+
+def case_save_topology(fixture: Fixture, scratch: Path):
+    features = collect_all_features(fixture.combined_files)
+    output = scratch / "saved.topojson"
+
+    def run() -> int:
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_topology(features, output)
+        return len(features)
+
+    return run, lambda items: items
+
+
+def case_merge_features(fixture: Fixture, scratch: Path):
+    sources = [(path, load_topojson_features(path)) for path in fixture.year_files]
+    downloader = scratch_downloader(scratch / "merge-data", key_strategy=DEFAULT_KEY_STRATEGY, precision=4)
+
+    def run() -> int:
+        aggregate: Dict[str, Any] = {}
+        for path, features in sources:
+            downloader.merge_features(
+                aggregate, features, priority=10, source_year=None, source_label=path.name
+            )
+        return len(downloader.emit_features(aggregate))
+
+    return run, lambda items: items
+
+
+def case_find_duplicate_ids(fixture: Fixture, scratch: Path):
+    geometries = [geometry for path in fixture.combined_files for geometry in load_geometries(path)]
+
+    def run() -> int:
+        find_duplicate_ids(geometries)
+        return len(geometries)
+
+    return run, lambda items: items
+
+
+def write_fixture_countries(fixture: Fixture, path: Path) -> Path:
+    """Write the fixture's ``countries.csv`` rows to ``path``."""
+    rows = fixture_countries(fixture)
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+@contextlib.contextmanager
+def placeholder_ipc_key() -> Iterator[None]:
+    """Set ``IPC_KEY`` for the block; the fake API accepts any key."""
+    previous_key = os.environ.get("IPC_KEY")
+    os.environ["IPC_KEY"] = "replay"
+    try:
+        yield
+    finally:
+        if previous_key is None:
+            os.environ.pop("IPC_KEY", None)
+        else:
+            os.environ["IPC_KEY"] = previous_key
+
+
+def scratch_downloader(data_dir: Path, **options: Any) -> IPCAreaDownloader:
+    """A downloader built through ``__init__`` whose files all live under ``data_dir``."""
+    with placeholder_ipc_key():
+        return IPCAreaDownloader(data_dir=data_dir, **options)
+
+
+def replay_download(
+    fixture: Fixture, api: FakeIPCApi, countries_csv: Path, data_dir: Path, **options: Any
+) -> IPCAreaDownloader:
+    """Run the downloader on ``fixture`` against the fake API into a fresh ``data_dir``."""
+    shutil.rmtree(data_dir, ignore_errors=True)
+    previous_csv = downloader_module.COUNTRIES_CSV
+    downloader_module.COUNTRIES_CSV = countries_csv
+    try:
+        with running_api(api), contextlib.redirect_stdout(io.StringIO()):
+            downloader = scratch_downloader(
+                data_dir, years_to_try=fixture.years(), workers=4, max_rps=0, api_base_url=api.url, **options
+            )
+            downloader.run()
+    finally:
+        downloader_module.COUNTRIES_CSV = previous_csv
+    return downloader
+
+
+def case_replay_download(fixture: Fixture, scratch: Path):
+    countries_csv = write_fixture_countries(fixture, scratch / "countries.csv")
+    api = FakeIPCApi()
+    api.preload(fixture.countries)
+
+    def run() -> Dict[str, Any]:
+        downloader = replay_download(fixture, api, countries_csv, scratch / "replay-data")
+        return {**downloader.profiler.report(), "api": dict(api.stats)}
+
+    return run, lambda report: sum(stage["calls"] for name, stage in report["stages"].items() if name == "download_areas")
+
+
+CASES: Dict[str, Tuple[Case, bool]] = {
+    # name -> (factory, repeatable with memory tracing)
+    "load_features": (case_load_features, True),
+    "simplify_topojson": (case_simplify_topojson, True),
+    "collect_all_features": (case_collect_all_features, True),
+    "save_topology": (case_save_topology, True),
+    "merge_features": (case_merge_features, True),
+    "find_duplicate_ids": (case_find_duplicate_ids, True),
+    "replay_download": (case_replay_download, False),
+}
+
+
+def calibrate(run: Callable[[], Any]) -> Tuple[int, Any]:
+    """Calls per sample needed to last ``MIN_SAMPLE_SECONDS`` (one warm-up call)."""
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    if elapsed >= MIN_SAMPLE_SECONDS:
+        return 1, result
+    return min(MAX_LOOPS, math.ceil(MIN_SAMPLE_SECONDS / max(elapsed, 1e-9))), result
+
+
+def measure(run: Callable[[], Any], repeat: int, trace_memory: bool) -> Tuple[Dict[str, Any], Any]:
+    loops, result = calibrate(run) if trace_memory else (1, None)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            result = run()
+        timings.append((time.perf_counter() - start) / loops)
+
+    measured: Dict[str, Any] = {
+        "runs": len(timings),
+        "loops": loops,
+        "seconds_min": round(min(timings), 6),
+        "seconds_median": round(statistics.median(timings), 6),
+    }
+    if trace_memory:
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        measured["peak_bytes"] = peak
+    return measured, result
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_seconds: float) -> int:
+    regressions = 0
+    previous = baseline.get("results", {})
+    for name, entry in results["results"].items():
+        before = previous.get(name)
+        if not before:
+            print(f"{name:<40} new")
+            continue
+        ratio = entry["seconds_median"] / max(before["seconds_median"], 1e-9)
+        # Ratios of tiny timings are noise; also require an absolute slowdown.
+        regressed = ratio > threshold and entry["seconds_median"] - before["seconds_median"] > min_seconds
+        regressions += regressed
+        print(
+            f"{name:<40} {before['seconds_median']:9.3f}s -> {entry['seconds_median']:9.3f}s "
+            f"({ratio:5.2f}x){'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--fixtures", nargs="+", choices=list(FIXTURES), default=list(DEFAULT_FIXTURES),
+        help="Fixtures to run (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cases", nargs="+", choices=list(CASES), default=list(CASES),
+        help="Cases to run (default: all)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (default: %(default)s)")
+    parser.add_argument(
+        "--output", type=Path, default=DEFAULT_OUTPUT,
+        help="Result JSON path (default: %(default)s; pass benchmarks/results/bench_suite.json to refresh the baseline)",
+    )
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result JSON to compare medians against")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25,
+        help="Median slowdown ratio reported as a regression by --compare (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-seconds", type=float, default=DEFAULT_MIN_SECONDS,
+        help="Per-call slowdown in seconds a case also needs to count as a regression (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    # Read the baseline first: it is usually the file about to be overwritten.
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    for fixture_name in args.fixtures:
+        fixture = Fixture(fixture_name, FIXTURES[fixture_name])
+        for case_name in args.cases:
+            factory, repeatable = CASES[case_name]
+            with tempfile.TemporaryDirectory(prefix="ipc-bench-") as scratch:
+                run, items_of = factory(fixture, Path(scratch))
+                measured, result = measure(run, args.repeat if repeatable else 1, trace_memory=repeatable)
+            entry = {"fixture": fixture_name, "countries": len(fixture.countries), "items": items_of(result), **measured}
+            if case_name == "replay_download":
+                entry["stages"] = {
+                    name: {"calls": stage["calls"], "wall_s": stage["wall_s"], "cpu_s": stage["cpu_s"]}
+                    for name, stage in result["stages"].items()
+                }
+                entry["api"] = {name: result["api"][name] for name in ("requests", "bytes_sent")}
+            key = f"{case_name}/{fixture_name}"
+            results["results"][key] = entry
+            peak = f"  peak {entry['peak_bytes'] / 1e6:7.1f} MB" if "peak_bytes" in entry else ""
+            print(
+                f"{key:<40} {entry['items']:6d} items  "
+                f"min {entry['seconds_min']:8.3f}s  median {entry['seconds_median']:8.3f}s{peak}"
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+        handle.write("\n")
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        print(f"\nCompared with {args.compare}:")
+        return 1 if compare(results, baseline, args.threshold, args.min_seconds) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Compare the direct TopoJSON decoder with the ``to_geojson`` round-trip.
+
+For the largest TopoJSON files under ``data/`` this measures wall time and
+peak traced memory (``tracemalloc``) of:
+
+* ``legacy``: ``tp.Topology(payload, topology=True).to_geojson()`` + ``json.loads``
+* ``direct``: ``scripts.topojson_io.topology_to_features``
+
+Both start from an already parsed payload so only the decoding differs.
+
+Usage example:
+
+    python benchmarks/bench_topojson_decode.py --largest 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import topojson as tp  # noqa: E402
+
+from scripts.topojson_io import topology_to_features  # noqa: E402
+
+DATA_DIR = REPO_ROOT / "data"
+
+
+def legacy_decode(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    topology = tp.Topology(payload, topology=True, prequantize=False)
+    return json.loads(topology.to_geojson())["features"]
+
+
+def direct_decode(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return topology_to_features(payload)
+
+
+def measure(func: Callable[[Dict[str, Any]], List[Dict[str, Any]]], payload: Dict[str, Any]) -> Dict[str, float]:
+    start = time.perf_counter()
+    func(payload)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": elapsed, "peak_bytes": peak}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--largest", type=int, default=5, help="Number of largest files to measure (default: 5)")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for machine-readable results")
+    args = parser.parse_args(argv)
+
+    files = sorted(DATA_DIR.rglob("*.topojson"), key=lambda path: path.stat().st_size, reverse=True)
+    results = []
+    for path in files[: args.largest]:
+        with open(path, "r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+
+        legacy = measure(legacy_decode, payload)
+        direct = measure(direct_decode, payload)
+        results.append({
+            "file": path.relative_to(REPO_ROOT).as_posix(),
+            "bytes": path.stat().st_size,
+            "legacy": legacy,
+            "direct": direct,
+        })
+        print(
+            f"{path.name:<34} {path.stat().st_size / 1e6:6.2f} MB  "
+            f"time {legacy['seconds']:7.3f}s -> {direct['seconds']:6.3f}s "
+            f"({legacy['seconds'] / max(direct['seconds'], 1e-9):5.1f}x)  "
+            f"peak {legacy['peak_bytes'] / 1e6:7.1f} MB -> {direct['peak_bytes'] / 1e6:6.1f} MB"
+        )
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Replay fresh downloads under several ``--key-strategy`` chains.
+
+For each strategy the downloader runs once against ``scripts/fake_ipc_api.py``
+into an empty data directory (see ``bench_suite.replay_download``) and the
+written ``index.json`` is checked: every per-year file on disk must have a
+``year`` entry and every country a ``combined`` entry. Strategies without
+``geometry`` skip fingerprinting entirely, so this covers the bookkeeping
+that must not depend on it.
+
+Usage example:
+
+    python benchmarks/check_key_strategies.py --fixtures small --strategies id,title id,title,geometry
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from typing import List
+
+# bench_suite puts the repository root on sys.path for the scripts package.
+from bench_suite import COUNTRY_COMBINED_SUFFIX, COUNTRY_FILENAME_SUFFIX, FIXTURES, Fixture
+from bench_suite import replay_download, write_fixture_countries
+from scripts.fake_ipc_api import FakeIPCApi
+
+DEFAULT_STRATEGIES = ("id,title", "title", "id,title,geometry")
+
+
+def check(fixture: Fixture, strategy: str, scratch: Path) -> List[str]:
+    """Problems found in the output of one replayed run."""
+    api = FakeIPCApi()
+    api.preload(fixture.countries)
+    countries_csv = write_fixture_countries(fixture, scratch / "countries.csv")
+    data_dir = scratch / "data"
+    replay_download(fixture, api, countries_csv, data_dir, key_strategy=strategy)
+
+    with open(data_dir / "index.json", "r", encoding="utf-8") as handle:
+        items = json.load(handle)["items"]
+    indexed = {(item.get("variant"), item.get("file_name")) for item in items}
+
+    problems = []
+    for iso3 in fixture.countries:
+        country_dir = data_dir / iso3
+        combined = f"{iso3}{COUNTRY_COMBINED_SUFFIX}"
+        if ("combined", combined) not in indexed:
+            problems.append(f"{iso3}: no combined index entry")
+        for path in sorted(country_dir.glob(f"{iso3}_*{COUNTRY_FILENAME_SUFFIX}")):
+            if path.name != combined and ("year", path.name) not in indexed:
+                problems.append(f"{iso3}: no year index entry for {path.name}")
+    return problems
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--fixtures", nargs="+", choices=list(FIXTURES), default=["small"],
+        help="Fixtures to replay (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--strategies", nargs="+", default=list(DEFAULT_STRATEGIES),
+        help="Key strategies to replay (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for fixture_name in args.fixtures:
+        fixture = Fixture(fixture_name, FIXTURES[fixture_name])
+        for strategy in args.strategies:
+            with tempfile.TemporaryDirectory(prefix="ipc-keys-") as scratch:
+                problems = check(fixture, strategy, Path(scratch))
+            failures += bool(problems)
+            print(f"{fixture_name:<8} {strategy:<20} {'ok' if not problems else 'FAILED'}")
+            for problem in problems:
+                print(f"    {problem}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Tag a large point file with the IPC area containing each point.
+
+Points are streamed from a CSV (or a Parquet file when ``pyarrow`` is
+installed) in chunks of ``--chunk-size`` rows. Each chunk is resolved against
+the packed R-tree of ``scripts/spatial_index.py`` (bounding-box prefilter, then
+an exact polygon test) in a pool of worker processes, and written out in input
+order as soon as it is done. At most two chunks per worker are in flight, so
+memory stays bounded regardless of the input size.
+
+The output repeats every input column and appends ``ipc_id``, ``ipc_title``,
+``ipc_iso3`` and ``ipc_year`` (empty when a point lies outside every area;
+overlapping assessment years resolve to the most recent one).
+
+Usage example:
+
+    python scripts/assign_ipc_areas.py households.csv --output households_ipc.csv \
+        --lon-column longitude --lat-column latitude --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+try:
+    from .spatial_index import SpatialIndex, write_spatial_index
+except ImportError:  # pragma: no cover - script executed directly
+    from spatial_index import SpatialIndex, write_spatial_index
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_ROOT / "data"
+DEFAULT_AREAS = DATA_DIR / "global_areas.topojson"
+DEFAULT_CHUNK_SIZE = 200_000
+OUTPUT_COLUMNS = ("ipc_id", "ipc_title", "ipc_iso3", "ipc_year")
+
+_worker_index: Optional[SpatialIndex] = None
+
+
+def is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in (".parquet", ".pq")
+
+
+def parse_coordinates(values: Sequence[Any]) -> np.ndarray:
+    """Floats for ``values``; blanks and unparsable entries become NaN."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        parsed = np.full(len(values), np.nan)
+        for position, value in enumerate(values):
+            try:
+                parsed[position] = float(value)
+            except (TypeError, ValueError):
+                pass
+        return parsed
+
+
+def _column_position(header: List[str], name: str, path: Path) -> int:
+    try:
+        return header.index(name)
+    except ValueError:
+        raise SystemExit(f"Column {name!r} not found in {path} (columns: {', '.join(header)})") from None
+
+
+def iter_csv_chunks(
+    path: Path, lon_column: str, lat_column: str, chunk_size: int
+) -> Iterator[Tuple[List[str], List[List[str]], np.ndarray]]:
+    """Yield ``(header, rows, points)`` for consecutive CSV row chunks.
+
+    Rows are padded or cut to the header width so appended columns line up.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return
+        lon_at = _column_position(header, lon_column, path)
+        lat_at = _column_position(header, lat_column, path)
+        width = len(header)
+        while True:
+            rows = [
+                row if len(row) == width else (row + [""] * width)[:width]
+                for _, row in zip(range(chunk_size), reader)
+            ]
+            if not rows:
+                return
+            lons = parse_coordinates([row[lon_at] for row in rows])
+            lats = parse_coordinates([row[lat_at] for row in rows])
+            yield header, rows, np.column_stack([lons, lats])
+
+
+def iter_parquet_chunks(
+    path: Path, lon_column: str, lat_column: str, chunk_size: int
+) -> Iterator[Tuple[Any, Any, np.ndarray]]:
+    """Yield ``(schema, record batch, points)`` for consecutive Parquet batches."""
+    parquet_file = pq.ParquetFile(path)
+    names = parquet_file.schema_arrow.names
+    for column in (lon_column, lat_column):
+        _column_position(names, column, path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        lons = parse_coordinates(batch.column(lon_column).to_numpy(zero_copy_only=False))
+        lats = parse_coordinates(batch.column(lat_column).to_numpy(zero_copy_only=False))
+        yield parquet_file.schema_arrow, batch, np.column_stack([lons, lats])
+
+
+def _init_worker(areas_path: Path) -> None:
+    global _worker_index
+    _worker_index = SpatialIndex.open(areas_path)
+
+
+def _locate_chunk(points: np.ndarray) -> np.ndarray:
+    return _worker_index.locate(points)
+
+
+class AreaAssigner:
+    """Resolve point chunks to area properties, in-process or in a pool."""
+
+    def __init__(self, areas_path: Path, workers: int):
+        write_spatial_index(areas_path)
+        self.index = SpatialIndex.open(areas_path)
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(areas_path,)
+            )
+
+    def submit(self, points: np.ndarray) -> Future:
+        if self.pool is not None:
+            return self.pool.submit(_locate_chunk, points)
+        future: Future = Future()
+        future.set_result(self.index.locate(points))
+        return future
+
+    def columns(self, located: np.ndarray) -> List[List[Any]]:
+        """``OUTPUT_COLUMNS`` values for located feature indices (-1 = none)."""
+        empty: dict = {}
+        records = [self.index.properties[index] if index >= 0 else empty for index in located.tolist()]
+        return [[record.get(name[len("ipc_"):]) for record in records] for name in OUTPUT_COLUMNS]
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def header_names(header: Any) -> List[str]:
+    return list(header.names) if pa is not None and isinstance(header, pa.Schema) else list(header)
+
+
+def chunk_table(header: Any, chunk: Any) -> Any:
+    """Arrow table for a chunk from either reader."""
+    if isinstance(chunk, pa.RecordBatch):
+        return pa.Table.from_batches([chunk])
+    columns = list(zip(*chunk)) if chunk else [()] * len(header)
+    return pa.table({name: list(values) for name, values in zip(header, columns)})
+
+
+def chunk_rows(chunk: Any) -> List[List[Any]]:
+    """CSV rows for a chunk from either reader."""
+    if pa is not None and isinstance(chunk, pa.RecordBatch):
+        return [list(row.values()) for row in chunk.to_pylist()]
+    return chunk
+
+
+def assign(
+    input_path: Path,
+    output_path: Path,
+    areas_path: Path,
+    *,
+    lon_column: str,
+    lat_column: str,
+    chunk_size: int,
+    workers: int,
+) -> dict:
+    if (is_parquet(input_path) or is_parquet(output_path)) and pq is None:
+        raise SystemExit("Parquet input/output requires pyarrow: pip install pyarrow")
+
+    reader = iter_parquet_chunks if is_parquet(input_path) else iter_csv_chunks
+    stats = {"points": 0, "matched": 0, "chunks": 0}
+    assigner = AreaAssigner(areas_path, workers)
+    pending: Deque[Tuple[Any, Any, Future]] = deque()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    csv_handle = None
+    csv_writer = None
+    parquet_writer = None
+
+    def flush_one() -> None:
+        nonlocal csv_handle, csv_writer, parquet_writer
+        header, chunk, future = pending.popleft()
+        located = future.result()
+        values = assigner.columns(located)
+        stats["points"] += len(located)
+        stats["matched"] += int(np.count_nonzero(located >= 0))
+        stats["chunks"] += 1
+
+        if is_parquet(output_path):
+            table = chunk_table(header, chunk)
+            for name, column in zip(OUTPUT_COLUMNS, values):
+                table = table.append_column(name, pa.array(column, type=pa.int64() if name == "ipc_year" else pa.string()))
+            if parquet_writer is None:
+                parquet_writer = pq.ParquetWriter(output_path, table.schema)
+            parquet_writer.write_table(table)
+            return
+
+        if csv_writer is None:
+            csv_handle = open(output_path, "w", encoding="utf-8", newline="")
+            csv_writer = csv.writer(csv_handle)
+            csv_writer.writerow(list(header_names(header)) + list(OUTPUT_COLUMNS))
+        rows = chunk_rows(chunk)
+        csv_writer.writerows(
+            row + ["" if value is None else value for value in extra]
+            for row, extra in zip(rows, zip(*values))
+        )
+
+    try:
+        for header, chunk, points in reader(input_path, lon_column, lat_column, chunk_size):
+            pending.append((header, chunk, assigner.submit(points)))
+            if len(pending) >= 2 * workers:
+                flush_one()
+        while pending:
+            flush_one()
+    finally:
+        assigner.close()
+        if csv_handle is not None:
+            csv_handle.close()
+        if parquet_writer is not None:
+            parquet_writer.close()
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", type=Path, help="CSV or Parquet file with point coordinates")
+    parser.add_argument("--output", type=Path, required=True, help="CSV or Parquet file to write (by extension)")
+    parser.add_argument(
+        "--areas",
+        type=Path,
+        default=DEFAULT_AREAS,
+        help="TopoJSON areas to match against (default: data/global_areas.topojson)",
+    )
+    parser.add_argument("--lon-column", default="lon", help="Longitude column (default: %(default)s)")
+    parser.add_argument("--lat-column", default="lat", help="Latitude column (default: %(default)s)")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows read, resolved and written per chunk (default: %(default)s)",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes resolving chunks (default: 1)")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1 or args.workers < 1:
+        print("Chunk size and worker count must be at least 1.", file=sys.stderr)
+        return 1
+    if not args.areas.exists():
+        print(f"Areas file not found: {args.areas}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    stats = assign(
+        args.input,
+        args.output,
+        args.areas,
+        lon_column=args.lon_column,
+        lat_column=args.lat_column,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"Assigned {stats['matched']:,} of {stats['points']:,} points to IPC areas "
+        f"in {elapsed:.1f}s ({stats['points'] / max(elapsed, 1e-9):,.0f} points/s) -> {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
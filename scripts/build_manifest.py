@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Build manifest used to skip unchanged combined/global rebuilds.
+
+The manifest lives next to ``data/index.json`` and records, for every combined
+country file and for the global dataset, the SHA-256 of each input file, the
+hash of the output that was produced from them and a few facts needed to
+recreate the index entries. Any change to the build parameters (precision,
+simplification tolerance, ...) invalidates every record at once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+MANIFEST_FILENAME = "build_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_inputs(paths: Iterable[Path], base: Path) -> Dict[str, str]:
+    """Map each input path (relative to ``base`` when possible) to its hash."""
+    hashes: Dict[str, str] = {}
+    for path in sorted(paths):
+        try:
+            name = path.relative_to(base).as_posix()
+        except ValueError:
+            name = path.as_posix()
+        hashes[name] = file_sha256(path)
+    return hashes
+
+
+class BuildManifest:
+    """Input/output hashes from the previous run, keyed by build target."""
+
+    def __init__(self, path: Path, params: Mapping[str, Any]):
+        self.path = Path(path)
+        self.params = dict(params)
+        self.targets: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(payload, dict) or payload.get("version") != MANIFEST_VERSION:
+            return
+        if payload.get("params") != self.params:
+            print("Build parameters changed since the last run; rebuilding all outputs")
+            return
+
+        targets = payload.get("targets")
+        if isinstance(targets, dict):
+            self.targets = targets
+
+    def lookup(self, target: str, inputs: Mapping[str, str], output: Path) -> Optional[Dict[str, Any]]:
+        """Return the stored record when inputs and output are unchanged."""
+        record = self.targets.get(target)
+        if not record or record.get("inputs") != dict(inputs):
+            return None
+        if not output.exists() or record.get("output_sha256") != file_sha256(output):
+            return None
+        return record
+
+    def record(
+        self,
+        target: str,
+        inputs: Mapping[str, str],
+        output: Path,
+        **details: Any,
+    ) -> None:
+        self.targets[target] = {
+            "inputs": dict(inputs),
+            "output_sha256": file_sha256(output),
+            **details,
+        }
+
+    def save(self) -> None:
+        payload = {
+            "version": MANIFEST_VERSION,
+            "params": self.params,
+            "targets": dict(sorted(self.targets.items())),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+        os.replace(tmp_path, self.path)
@@ -3,18 +3,17 @@
 
 By default this utility reads the per-country combined outputs produced by the
 downloader (``*_combined_areas.topojson``), converts them to GeoJSON features,
-deduplicates by IPC id (falling back to geometry hash), stores an aggregated
+deduplicates by IPC id (falling back to title and geometry fingerprint), stores an aggregated
 TopoJSON file, and optionally simplifies the result using shared geometry helpers.
 """
 
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
 import sys
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 try:
     import topojson as tp
@@ -24,9 +23,25 @@ except ImportError as exc:  # pragma: no cover - immediate exit path
     ) from exc
 
 try:
-    from .simplify_ipc_global_areas import simplify_topojson
+    from .compression import SIDECAR_FORMATS, write_sidecars
+    from .feature_keys import DEFAULT_KEY_STRATEGY, feature_keys, parse_key_strategy
+    from .geoparquet_export import export_geoparquet, geoparquet_available
+    from .geometry_fingerprint import INDEX_FILENAME as FINGERPRINT_INDEX_FILENAME
+    from .geometry_fingerprint import FingerprintIndex
+    from .lod_variants import DEFAULT_LOD_LADDER, is_lod_path, parse_lod_ladder, write_lod_variants
+    from .simplify_ipc_global_areas import DEFAULT_SIMPLIFY_MODE, SIMPLIFY_MODES, simplify_topojson
+    from .spatial_index import write_spatial_index
+    from .topojson_io import load_topojson_features, quantize_topology
 except ImportError:  # pragma: no cover - fallback for direct script execution
-    from simplify_ipc_global_areas import simplify_topojson
+    from compression import SIDECAR_FORMATS, write_sidecars
+    from feature_keys import DEFAULT_KEY_STRATEGY, feature_keys, parse_key_strategy
+    from geoparquet_export import export_geoparquet, geoparquet_available
+    from geometry_fingerprint import INDEX_FILENAME as FINGERPRINT_INDEX_FILENAME
+    from geometry_fingerprint import FingerprintIndex
+    from lod_variants import DEFAULT_LOD_LADDER, is_lod_path, parse_lod_ladder, write_lod_variants
+    from simplify_ipc_global_areas import DEFAULT_SIMPLIFY_MODE, SIMPLIFY_MODES, simplify_topojson
+    from spatial_index import write_spatial_index
+    from topojson_io import load_topojson_features, quantize_topology
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = REPO_ROOT / "data"
@@ -34,54 +49,22 @@ DEFAULT_OUTPUT_FILENAME = "global_areas.topojson"
 COMBINED_SUFFIX = "_combined_areas.topojson"
 
 
-def normalize_title(title: Optional[str]) -> str:
-    """Normalize titles for consistent deduplication."""
-    if not title:
-        return ""
-    return " ".join(title.split()).strip().lower()
-
-
-def feature_key(feature: Dict[str, Any]) -> str:
-    """Derive a stable deduplication key for a feature."""
-    props = feature.get("properties") or {}
-    iso3 = (props.get("iso3") or "").strip().lower()
-    identifier = props.get("id")
-    if identifier is not None:
-        return f"id::{iso3}::{str(identifier).strip()}"
-
-    title = normalize_title(props.get("title"))
-    if iso3 and title:
-        return f"{iso3}::{title}"
-
-    geometry = feature.get("geometry")
-    if geometry:
-        geometry_json = json.dumps(geometry, sort_keys=True)
-        digest = hashlib.sha1(geometry_json.encode("utf-8")).hexdigest()
-        return f"geometry::{digest}"
-
-    fallback = json.dumps(feature, sort_keys=True)
-    digest = hashlib.sha1(fallback.encode("utf-8")).hexdigest()
-    return f"feature::{digest}"
-
-
 def load_features_from_topojson(path: Path) -> List[Dict[str, Any]]:
     """Convert a TopoJSON file into a list of GeoJSON features."""
-    with open(path, "r", encoding="utf-8") as handle:
-        topo_payload = json.load(handle)
-
-    topology = tp.Topology(topo_payload, topology=True, prequantize=False)
-    geojson_payload = json.loads(topology.to_geojson())
-
-    features = geojson_payload.get("features") if isinstance(geojson_payload, dict) else None
-    if not isinstance(features, list):
-        return []
+    return load_topojson_features(path)
 
-    # Defensive copy to ensure downstream modifications don't affect shared instances.
-    return [feature for feature in features if isinstance(feature, dict)]
 
+def collect_all_features(
+    files: Iterable[Path],
+    fingerprint_index: Optional[FingerprintIndex] = None,
+    key_strategy: Sequence[str] = DEFAULT_KEY_STRATEGY,
+) -> List[Dict[str, Any]]:
+    """Aggregate features from multiple TopoJSON files, deduplicated by key.
 
-def collect_all_features(files: Iterable[Path]) -> List[Dict[str, Any]]:
-    """Aggregate features from multiple TopoJSON files, deduplicated by key."""
+    Keys follow ``key_strategy`` (see ``feature_keys``); per-file geometry
+    fingerprints are read from ``fingerprint_index`` when given (and added
+    to it when missing).
+    """
     aggregate: Dict[str, Dict[str, Any]] = {}
 
     for filepath in files:
@@ -91,8 +74,12 @@ def collect_all_features(files: Iterable[Path]) -> List[Dict[str, Any]]:
             print(f"Warning: failed to read {filepath}: {exc}", file=sys.stderr)
             continue
 
-        for feature in features:
-            key = feature_key(feature)
+        fingerprints = (
+            fingerprint_index.fingerprints(filepath, features)
+            if fingerprint_index is not None and "geometry" in key_strategy
+            else None
+        )
+        for feature, key in zip(features, feature_keys(features, key_strategy, fingerprints=fingerprints)):
             if key not in aggregate:
                 aggregate[key] = feature
 
@@ -110,7 +97,7 @@ def discover_topojson_files(skip_path: Path, *, include_per_year: bool) -> List[
     for path in DATA_DIR.rglob("*.topojson"):
         if path.resolve() == skip_resolved:
             continue
-        if not path.is_file():
+        if not path.is_file() or is_lod_path(path):
             continue
 
         if not include_per_year and not path.name.endswith(COMBINED_SUFFIX):
@@ -120,18 +107,24 @@ def discover_topojson_files(skip_path: Path, *, include_per_year: bool) -> List[
     return sorted(files)
 
 
-def save_topology(features: List[Dict[str, Any]], output_path: Path) -> None:
+def save_topology(
+    features: List[Dict[str, Any]],
+    output_path: Path,
+    quantize: Optional[int] = None,
+) -> None:
     """Persist the combined features back to TopoJSON."""
     collection = {
         "type": "FeatureCollection",
         "features": features,
     }
 
-    topology = tp.Topology(collection, prequantize=False)
+    topology = tp.Topology(collection, prequantize=False).to_dict()
+    if quantize:
+        topology = quantize_topology(topology, quantize)
 
     output_path.parent.mkdir(exist_ok=True, parents=True)
     with open(output_path, "w", encoding="utf-8") as handle:
-        json.dump(topology.to_dict(), handle, separators=(",", ":"))
+        json.dump(topology, handle, separators=(",", ":"))
 
     try:
         display_path = output_path.relative_to(REPO_ROOT)
@@ -161,6 +154,34 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=0.0,
         help="Simplification tolerance applied after combination; set to 0 to disable",
     )
+    parser.add_argument(
+        "--simplify-mode",
+        choices=SIMPLIFY_MODES,
+        default=DEFAULT_SIMPLIFY_MODE,
+        help="Simplify per feature ('features') or on the shared TopoJSON arcs ('arcs') (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--quantize",
+        type=int,
+        default=None,
+        help="Write quantized, delta-encoded arcs on an N x N grid (e.g. 100000)",
+    )
+    parser.add_argument(
+        "--compress",
+        nargs="*",
+        choices=SIDECAR_FORMATS,
+        default=None,
+        help="Also write maximum-compression .gz/.br sidecars; no value means all available formats",
+    )
+    parser.add_argument(
+        "--key-strategy",
+        type=parse_key_strategy,
+        default=DEFAULT_KEY_STRATEGY,
+        help=(
+            "Comma-separated fallback chain of dedup keys from id, admin, title and geometry "
+            f"(default: {','.join(DEFAULT_KEY_STRATEGY)})"
+        ),
+    )
     parser.add_argument(
         "--skip-simplify",
         "--skip-minify",
@@ -168,6 +189,25 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Skip the simplification pass if you plan to process the output separately",
     )
+    parser.add_argument(
+        "--skip-spatial-index",
+        action="store_true",
+        help="Do not write the .sidx point-lookup index sidecar next to the output",
+    )
+    parser.add_argument(
+        "--geoparquet",
+        action="store_true",
+        help="Also export the output as GeoParquet next to it (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--lod",
+        nargs="?",
+        type=parse_lod_ladder,
+        const=DEFAULT_LOD_LADDER,
+        default=(),
+        metavar="NAME=TOL,...",
+        help="Also write progressively simplified level-of-detail variants (X.lod-NAME.topojson) of the output",
+    )
     parser.add_argument(
         "--include-per-year",
         action="store_true",
@@ -193,12 +233,15 @@ def main(argv: Optional[List[str]] = None) -> int:
         print("No TopoJSON files found under data/.", file=sys.stderr)
         return 1
 
-    features = collect_all_features(topo_files)
+    fingerprint_index = FingerprintIndex(DATA_DIR / FINGERPRINT_INDEX_FILENAME, args.precision, base=DATA_DIR)
+    features = collect_all_features(topo_files, fingerprint_index, args.key_strategy)
+    fingerprint_index.save()
     if not features:
         print("No features extracted; aborting.", file=sys.stderr)
         return 1
 
-    save_topology(features, output_path)
+    # The simplification pass re-quantizes its own output.
+    save_topology(features, output_path, args.quantize if args.skip_simplify else None)
 
     if not args.skip_simplify:
         stats = simplify_topojson(
@@ -206,6 +249,8 @@ def main(argv: Optional[List[str]] = None) -> int:
             precision=args.precision,
             simplify_tolerance=args.simplify_tolerance,
             quiet=True,
+            mode=args.simplify_mode,
+            quantize=args.quantize,
         )
         ratio = stats.get("size_ratio", 0.0)
         saved = stats.get("saved_bytes", 0)
@@ -214,6 +259,24 @@ def main(argv: Optional[List[str]] = None) -> int:
             f"{args.simplify_tolerance}; saved {saved:,} bytes ({ratio:.2%} of original)."
         )
 
+    if not args.skip_spatial_index:
+        index_path = write_spatial_index(output_path)
+        print(f"Wrote {index_path.name}: {index_path.stat().st_size:,} bytes")
+
+    if args.geoparquet and geoparquet_available():
+        parquet_path = export_geoparquet(output_path)
+        print(f"Wrote {parquet_path.name}: {parquet_path.stat().st_size:,} bytes")
+
+    if args.lod:
+        levels = write_lod_variants(output_path, args.lod, precision=args.precision, quantize=args.quantize)
+        for level in levels[1:]:
+            print(f"Wrote {level['file_name']}: {level['vertices']:,} vertices, {level['bytes']:,} bytes")
+
+    if args.compress is not None:
+        formats = args.compress or SIDECAR_FORMATS
+        for fmt, info in write_sidecars([output_path], formats)[output_path].items():
+            print(f"Wrote {info['file_name']}: {info['bytes']:,} bytes")
+
     return 0
 
 
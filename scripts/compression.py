@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Precompressed ``.gz``/``.br`` sidecars for generated TopoJSON files.
+
+Each sidecar sits next to its source (``X.topojson`` -> ``X.topojson.gz``) and
+is written at maximum compression so the CDN can serve the smallest variant.
+Gzip output is deterministic (``mtime=0``) so unchanged inputs produce
+byte-identical sidecars. Brotli is optional: ``br`` is skipped with a warning
+when the ``brotli`` package is not installed.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None  # type: ignore[assignment]
+
+SIDECAR_FORMATS = ("gz", "br")
+
+_warned_missing_brotli = False
+
+
+def available_formats(formats: Iterable[str]) -> List[str]:
+    """Validate requested formats and drop ``br`` if brotli is unavailable."""
+    global _warned_missing_brotli
+    selected: List[str] = []
+    for fmt in formats:
+        if fmt not in SIDECAR_FORMATS:
+            raise ValueError(f"Unknown compression format: {fmt}")
+        if fmt == "br" and brotli is None:
+            if not _warned_missing_brotli:
+                print("Warning: brotli is not installed, skipping .br sidecars.", file=sys.stderr)
+                _warned_missing_brotli = True
+            continue
+        if fmt not in selected:
+            selected.append(fmt)
+    return selected
+
+
+def compress_bytes(payload: bytes, fmt: str) -> bytes:
+    if fmt == "gz":
+        return gzip.compress(payload, compresslevel=9, mtime=0)
+    if fmt == "br" and brotli is not None:
+        return brotli.compress(payload, quality=11)
+    raise ValueError(f"Compression format not available: {fmt}")
+
+
+def sidecar_path(path: Path, fmt: str) -> Path:
+    return path.with_name(f"{path.name}.{fmt}")
+
+
+def describe_file(path: Path) -> Dict[str, object]:
+    """Byte size and SHA-256 of a file, as recorded in the index."""
+    payload = path.read_bytes()
+    return {"bytes": len(payload), "sha256": hashlib.sha256(payload).hexdigest()}
+
+
+def write_sidecar(path: Path, fmt: str) -> Dict[str, object]:
+    """Write (or reuse an up-to-date) sidecar and describe it.
+
+    A sidecar whose modification time is not older than its source is assumed
+    current, so unchanged outputs are not recompressed on every run.
+    """
+    target = sidecar_path(path, fmt)
+    if not (target.exists() and target.stat().st_mtime_ns >= path.stat().st_mtime_ns):
+        compressed = compress_bytes(path.read_bytes(), fmt)
+        tmp_path = target.with_name(target.name + ".tmp")
+        tmp_path.write_bytes(compressed)
+        os.replace(tmp_path, target)
+    return {"file_name": target.name, **describe_file(target)}
+
+
+def write_sidecars(
+    paths: Sequence[Path],
+    formats: Iterable[str] = SIDECAR_FORMATS,
+    *,
+    workers: Optional[int] = None,
+) -> Dict[Path, Dict[str, Dict[str, object]]]:
+    """Compress every path in every available format concurrently.
+
+    zlib and brotli release the GIL while compressing, so a thread pool keeps
+    several cores busy. Returns ``{path: {format: description}}``.
+    """
+    selected = available_formats(formats)
+    results: Dict[Path, Dict[str, Dict[str, object]]] = {Path(path): {} for path in paths}
+    jobs = [(Path(path), fmt) for path in paths for fmt in selected]
+    if not jobs:
+        return results
+
+    max_workers = workers or min(len(jobs), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {job: executor.submit(write_sidecar, *job) for job in jobs}
+        for (path, fmt), future in futures.items():
+            results[path][fmt] = future.result()
+    return results
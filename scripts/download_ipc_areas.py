@@ -11,7 +11,6 @@ builds a global aggregate across all countries.
 from __future__ import annotations
 
 import argparse
-import copy
 import hashlib
 import os
 import sys
@@ -19,16 +18,66 @@ import csv
 import json
 import requests
 import subprocess
+import threading
 import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import topojson as tp
 
 try:
-    from .simplify_ipc_global_areas import simplify_topojson
+    from .build_manifest import MANIFEST_FILENAME, BuildManifest, file_sha256, hash_inputs
+    from .compression import SIDECAR_FORMATS, available_formats, describe_file, write_sidecars
+    from .feature_keys import DEFAULT_KEY_STRATEGY, feature_keys, parse_key_strategy
+    from .feature_stream import DEFAULT_CHUNK_SIZE, iter_features, iter_polygon_features
+    from .geoparquet_export import export_geoparquet, geoparquet_available
+    from .geometry_fingerprint import INDEX_FILENAME as FINGERPRINT_INDEX_FILENAME
+    from .geometry_fingerprint import FingerprintIndex, fingerprint_features
+    from .lod_variants import DEFAULT_LOD_LADDER, parse_lod_ladder, write_lod_variants
+    from .response_cache import DEFAULT_MAX_BYTES, ResponseCache
+    from .rate_control import (
+        DEFAULT_MAX_RETRIES,
+        DEFAULT_REQUEST_TIMEOUT,
+        NO_DATA_STATUSES,
+        AdaptiveRateLimiter,
+        LatencyStats,
+        RetryPolicy,
+        format_latency_summary,
+        parse_retry_after,
+    )
+    from .run_profiler import RunProfiler, format_stage_totals, profiled
+    from .simplify_ipc_global_areas import DEFAULT_SIMPLIFY_MODE, SIMPLIFY_MODES, simplify_topojson
+    from .spatial_index import write_spatial_index
+    from .topojson_io import load_topojson_features, quantize_topology, topology_to_features
+    from .topology_merge import MEMBER_SOURCE_KEY, concatenate_topologies, member_features, topology_members
+    from .vector_tiles import DEFAULT_MAX_ZOOM, DEFAULT_MIN_ZOOM, build_tiles, format_stats, tiles_metadata_path
 except ImportError:  # pragma: no cover - script executed directly
-    from simplify_ipc_global_areas import simplify_topojson
+    from build_manifest import MANIFEST_FILENAME, BuildManifest, file_sha256, hash_inputs
+    from compression import SIDECAR_FORMATS, available_formats, describe_file, write_sidecars
+    from feature_keys import DEFAULT_KEY_STRATEGY, feature_keys, parse_key_strategy
+    from feature_stream import DEFAULT_CHUNK_SIZE, iter_features, iter_polygon_features
+    from geoparquet_export import export_geoparquet, geoparquet_available
+    from geometry_fingerprint import INDEX_FILENAME as FINGERPRINT_INDEX_FILENAME
+    from geometry_fingerprint import FingerprintIndex, fingerprint_features
+    from lod_variants import DEFAULT_LOD_LADDER, parse_lod_ladder, write_lod_variants
+    from response_cache import DEFAULT_MAX_BYTES, ResponseCache
+    from rate_control import (
+        DEFAULT_MAX_RETRIES,
+        DEFAULT_REQUEST_TIMEOUT,
+        NO_DATA_STATUSES,
+        AdaptiveRateLimiter,
+        LatencyStats,
+        RetryPolicy,
+        format_latency_summary,
+        parse_retry_after,
+    )
+    from run_profiler import RunProfiler, format_stage_totals, profiled
+    from simplify_ipc_global_areas import DEFAULT_SIMPLIFY_MODE, SIMPLIFY_MODES, simplify_topojson
+    from spatial_index import write_spatial_index
+    from topojson_io import load_topojson_features, quantize_topology, topology_to_features
+    from topology_merge import MEMBER_SOURCE_KEY, concatenate_topologies, member_features, topology_members
+    from vector_tiles import DEFAULT_MAX_ZOOM, DEFAULT_MIN_ZOOM, build_tiles, format_stats, tiles_metadata_path
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = REPO_ROOT / "data"
@@ -36,12 +85,18 @@ COUNTRIES_CSV = REPO_ROOT / "countries.csv"
 COUNTRY_FILENAME_SUFFIX = "_areas.topojson"
 COUNTRY_COMBINED_SUFFIX = "_combined_areas.topojson"
 GLOBAL_FILENAME = "global_areas.topojson"
+GLOBAL_MERGE_MODES = ("features", "topology")
+DEFAULT_GLOBAL_MERGE = "features"
 GLOBAL_OUTPUT_PATH = DATA_DIR / GLOBAL_FILENAME
+REPORT_FILENAME = "run_report.json"
 GLOBAL_INFO = {"name": "Global", "iso2": "GL", "iso3": "GLB"}
 
 # Configuration
 API_BASE_URL = "https://api.ipcinfo.org/areas"
 YEARS_TO_TRY = list(range(2025, 2019, -1))
+AREA_TYPE = "A"
+DEFAULT_WORKERS = 1
+DEFAULT_MAX_RPS = 2.0
 
 
 def normalize_years(years: Optional[List[int]]) -> List[int]:
@@ -122,6 +177,46 @@ def resolve_ipc_key() -> Optional[str]:
 
     return None
 
+
+class MergeCandidate:
+    """A feature competing for its key in ``IPCAreaDownloader.merge_features``.
+
+    Only a reference to the source feature is kept; geometries are shared and
+    treated as read-only. ``emit`` makes the (shallow) copy that ends up in an
+    output, so features that lose a merge are never copied.
+    """
+
+    __slots__ = ("feature", "key", "priority", "source_year", "source_label", "title")
+
+    def __init__(
+        self,
+        feature: Dict[str, Any],
+        key: str,
+        priority: int,
+        source_year: Optional[int],
+        source_label: str,
+        title: Optional[str],
+    ):
+        self.feature = feature
+        self.key = key
+        self.priority = priority
+        self.source_year = source_year
+        self.source_label = source_label
+        self.title = title
+
+    def outranks(self, other: "MergeCandidate") -> bool:
+        """Higher priority wins; ties go to the same or more recent year."""
+        if self.priority != other.priority:
+            return self.priority > other.priority
+        return (self.source_year or 0) >= (other.source_year or 0)
+
+    def emit(self) -> Dict[str, Any]:
+        feature = dict(self.feature)
+        if isinstance(feature.get('properties'), dict):
+            feature['properties'] = dict(feature['properties'])
+        return feature
+
+
 class IPCAreaDownloader:
     def __init__(
         self,
@@ -129,24 +224,78 @@ class IPCAreaDownloader:
         *,
         precision: int = 4,
         simplify_tolerance: float = 0.0,
+        simplify_mode: str = DEFAULT_SIMPLIFY_MODE,
+        quantize: Optional[int] = None,
+        compress_formats: Sequence[str] = (),
+        key_strategy: Sequence[str] = DEFAULT_KEY_STRATEGY,
+        spatial_index: bool = True,
+        geoparquet: bool = False,
+        lod_ladder: Sequence[Tuple[str, float]] = (),
+        global_merge: str = DEFAULT_GLOBAL_MERGE,
+        tiles_path: Optional[Path] = None,
+        tile_min_zoom: int = DEFAULT_MIN_ZOOM,
+        tile_max_zoom: int = DEFAULT_MAX_ZOOM,
+        workers: int = DEFAULT_WORKERS,
+        max_rps: float = DEFAULT_MAX_RPS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        api_base_url: str = API_BASE_URL,
+        data_dir: Optional[Path] = None,
+        cache_dir: Optional[Path] = None,
+        cache_ttl: float = 0.0,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        force_rebuild: bool = False,
+        build_workers: int = 1,
+        stream: bool = False,
+        report_path: Optional[Path] = None,
+        profile_dir: Optional[Path] = None,
     ):
         self.ipc_key = resolve_ipc_key()
         if not self.ipc_key:
             raise ValueError("IPC_KEY environment variable is required")
         
+        self.api_base_url = api_base_url
+        self.workers = int(workers)
+        self.max_rps = float(max_rps)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'IPC-Areas-Downloader/1.0'
         })
+        # One pooled connection per download worker instead of urllib3's 10.
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(self.workers, 1))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.rate_limiter = AdaptiveRateLimiter(self.max_rps)
+        self.retry_policy = RetryPolicy(max_retries)
+        self.request_timeout = float(request_timeout)
+        self.latency_stats = LatencyStats()
+        self.download_failures: Dict[str, Dict[int, str]] = {}
+        self.failures_lock = threading.Lock()
+        self.response_cache: Optional[ResponseCache] = None
+        if cache_dir is not None:
+            self.response_cache = ResponseCache(
+                cache_dir, ttl=cache_ttl, max_bytes=cache_max_bytes
+            )
 
         # Create data directory
-        self.data_dir = DATA_DIR
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+        self.data_dir.mkdir(exist_ok=True, parents=True)
         self.index_entries: List[Dict[str, Any]] = []
         self.cdn_release_tag = CDN_RELEASE_TAG
         self.years_to_try = normalize_years(years_to_try)
         self.precision = int(precision)
         self.simplify_tolerance = float(simplify_tolerance)
+        self.simplify_mode = simplify_mode
+        self.quantize = int(quantize) if quantize else None
+        self.compress_formats = available_formats(compress_formats)
+        self.key_strategy = parse_key_strategy(key_strategy)
+        self.spatial_index = bool(spatial_index)
+        self.geoparquet = bool(geoparquet) and geoparquet_available()
+        self.lod_ladder = parse_lod_ladder(lod_ladder) if lod_ladder else ()
+        self.global_merge = global_merge
+        self.tiles_path = Path(tiles_path) if tiles_path is not None else None
+        self.tile_zooms = (int(tile_min_zoom), int(tile_max_zoom))
+        self.tile_stats: Dict[int, Dict[str, int]] = {}
         self.country_combined_files: List[Path] = []
 
         if not self.years_to_try:
@@ -155,35 +304,62 @@ class IPCAreaDownloader:
             raise ValueError("Precision must be non-negative")
         if self.simplify_tolerance < 0:
             raise ValueError("Simplification tolerance must be non-negative")
+        if self.simplify_mode not in SIMPLIFY_MODES:
+            raise ValueError(f"Unknown simplification mode: {self.simplify_mode}")
+        if self.global_merge not in GLOBAL_MERGE_MODES:
+            raise ValueError(f"Unknown global merge mode: {self.global_merge}")
+        if self.quantize is not None and self.quantize < 2:
+            raise ValueError("Quantization must be at least 2")
+        if self.workers < 1:
+            raise ValueError("Worker count must be at least 1")
+        if self.max_rps < 0:
+            raise ValueError("Request rate limit must be non-negative")
+        if self.request_timeout <= 0:
+            raise ValueError("Request timeout must be positive")
+        if not 0 <= self.tile_zooms[0] <= self.tile_zooms[1] <= 24:
+            raise ValueError("Tile zoom levels must satisfy 0 <= min <= max <= 24")
+
+        self.fingerprint_index = FingerprintIndex(
+            self.data_dir / FINGERPRINT_INDEX_FILENAME, self.precision, base=self.data_dir
+        )
 
-    @staticmethod
-    def normalize_title(title: Optional[str]) -> str:
-        if not title:
-            return ""
-        return " ".join(title.split()).strip().lower()
+        self.stream = bool(stream)
+        self.report_path = Path(report_path) if report_path is not None else None
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else None
+        if self.profile_dir is not None and self.report_path is None:
+            self.report_path = self.profile_dir / REPORT_FILENAME
+        self.profiler = RunProfiler(trace_memory=self.profile_dir is not None, profile_dir=self.profile_dir)
+        self.force_rebuild = bool(force_rebuild)
+        self.build_workers = int(build_workers)
+        if self.build_workers < 1:
+            raise ValueError("Build worker count must be at least 1")
+        self.build_manifest = BuildManifest(
+            self.data_dir / MANIFEST_FILENAME,
+            {
+                "precision": self.precision,
+                "simplify_tolerance": self.simplify_tolerance,
+                "simplify_mode": self.simplify_mode,
+                "quantize": self.quantize,
+                "key_strategy": list(self.key_strategy),
+                **({"lod": [list(level) for level in self.lod_ladder]} if self.lod_ladder else {}),
+                **({"global_merge": self.global_merge} if self.global_merge != DEFAULT_GLOBAL_MERGE else {}),
+            },
+        )
 
-    @staticmethod
-    def feature_key(feature: Dict[str, Any]) -> str:
-        props = feature.get('properties') or {}
-        area_id = props.get('id')
-        if area_id is not None:
-            iso3 = (props.get('iso3') or '').strip().lower()
-            id_value = str(area_id).strip()
-            return f"id::{iso3}::{id_value}"
-
-        title_key = IPCAreaDownloader.normalize_title(props.get('title'))
-        if title_key:
-            return f"title::{title_key}"
-
-        geometry = feature.get('geometry')
-        if geometry:
-            geometry_str = json.dumps(geometry, sort_keys=True)
-            digest = hashlib.sha1(geometry_str.encode('utf-8')).hexdigest()
-            return f"geometry::{digest}"
-
-        fallback_str = json.dumps(feature, sort_keys=True)
-        digest = hashlib.sha1(fallback_str.encode('utf-8')).hexdigest()
-        return f"feature::{digest}"
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes only run ``build_country``; network state and the
+        # accumulated run outputs stay in the parent.
+        state = self.__dict__.copy()
+        state.update(
+            session=None,
+            rate_limiter=None,
+            latency_stats=None,
+            failures_lock=None,
+            download_failures={},
+            index_entries=[],
+            country_combined_files=[],
+        )
+        return state
 
     def load_countries(self) -> Dict[str, Dict]:
         """Load country data from CSV file."""
@@ -221,14 +397,23 @@ class IPCAreaDownloader:
             
         return countries
 
-    def load_existing_features(self, filepath: Path) -> List[Dict[str, Any]]:
+    def indexed_fingerprints(self, path: Path, features: List[Dict[str, Any]]) -> Optional[List[str]]:
+        """Cached fingerprints for a stored file, if the key strategy uses them."""
+        if "geometry" not in self.key_strategy:
+            return None
+        return self.fingerprint_index.fingerprints(path, features)
+
+    def load_existing_topology(self, filepath: Path) -> Optional[Dict[str, Any]]:
         try:
             with open(filepath, 'r', encoding='utf-8') as fh:
-                topo_payload = json.load(fh)
-            topology = tp.Topology(topo_payload, topology=True, prequantize=False)
-            geojson_payload = json.loads(topology.to_geojson())
-            features = geojson_payload.get('features', []) if isinstance(geojson_payload, dict) else []
-            return [feature for feature in features if isinstance(feature, dict)]
+                return json.load(fh)
+        except Exception as exc:
+            print(f"    Warning: unable to read existing dataset {filepath}: {exc}")
+            return None
+
+    def load_existing_features(self, filepath: Path) -> List[Dict[str, Any]]:
+        try:
+            return load_topojson_features(filepath)
         except Exception as exc:
             print(f"    Warning: unable to read existing dataset {filepath}: {exc}")
             return []
@@ -245,26 +430,38 @@ class IPCAreaDownloader:
         except ValueError:
             return None
 
+    @profiled("merge_features")
     def merge_features(self,
-                       aggregate: Dict[str, Dict[str, Any]],
+                       aggregate: Dict[str, MergeCandidate],
                        features: List[Dict[str, Any]],
                        *,
                        priority: int,
                        source_year: Optional[int],
-                       source_label: str) -> Dict[str, int]:
+                       source_label: str,
+                       fingerprints: Optional[List[str]] = None) -> Dict[str, int]:
+        """Merge ``features`` into ``aggregate`` by key without copying them.
+
+        Keys follow ``key_strategy``; ``fingerprints`` (one per feature, e.g.
+        from ``fingerprint_index``) are computed when needed and not supplied.
+        Callers must not mutate the features afterwards; use ``emit_features``
+        to get independent output copies.
+        """
         stats = {"added": 0, "updated": 0, "skipped": 0}
+        self.profiler.count(features_in=len(features))
+        keys = feature_keys(
+            features, self.key_strategy, fingerprints=fingerprints, precision=self.precision
+        )
 
-        for feature in features:
-            feature_copy = copy.deepcopy(feature)
-            props = feature_copy.get('properties') or {}
-            key = self.feature_key(feature_copy)
-            candidate = {
-                "feature": feature_copy,
-                "priority": priority,
-                "source_year": props.get('year') if props.get('year') is not None else source_year,
-                "source_label": source_label,
-                "title": props.get('title')
-            }
+        for feature, key in zip(features, keys):
+            props = feature.get('properties') or {}
+            candidate = MergeCandidate(
+                feature,
+                key,
+                priority,
+                props.get('year') if props.get('year') is not None else source_year,
+                source_label,
+                props.get('title'),
+            )
 
             existing = aggregate.get(key)
             if existing is None:
@@ -272,85 +469,215 @@ class IPCAreaDownloader:
                 stats["added"] += 1
                 continue
 
-            replace = False
-            if priority > existing.get('priority', -1):
-                replace = True
-            elif priority == existing.get('priority', -1):
-                candidate_year = candidate.get('source_year') or 0
-                existing_year = existing.get('source_year') or 0
-                if candidate_year >= existing_year:
-                    replace = True
-
-            if replace:
+            if candidate.outranks(existing):
                 aggregate[key] = candidate
                 stats["updated"] += 1
             else:
                 stats["skipped"] += 1
 
         return stats
+
+    @staticmethod
+    def emit_features(aggregate: Dict[str, MergeCandidate]) -> List[Dict[str, Any]]:
+        """Materialise the winning features, ordered by key."""
+        return [aggregate[key].emit() for key in sorted(aggregate)]
     
+    @profiled("download_areas")
     def download_areas(self, country_code: str, year: int) -> Optional[Dict[str, Any]]:
-        """Download IPC areas data for a specific country and year."""
+        """Download IPC areas data for a specific country and year.
+
+        When a response cache is configured, fresh entries are served from disk
+        and stale ones are revalidated with a conditional request. In streaming
+        mode the body is parsed incrementally and only unique polygon features
+        are kept, so the raw payload is never held in memory.
+        """
         params = {
             'format': 'geojson',
             'country': country_code,
             'year': year,
-            'type': 'A',
+            'type': AREA_TYPE,
             'key': self.ipc_key
         }
+        self.profiler.annotate(country=country_code, year=year)
+        cache = self.response_cache
+        cached = cache.lookup(country_code, year, AREA_TYPE) if cache else None
+        response = None
         
         try:
-            print(f"  Downloading data for {country_code} - {year}...")
-            response = self.session.get(API_BASE_URL, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if (
-                    data
-                    and isinstance(data, dict)
-                    and isinstance(data.get('features'), list)
-                    and data['features']
-                ):
-                    return data
-                print(f"    No data available for {country_code} in {year}")
-                return None
+            if cache and cached and cache.is_fresh(cached):
+                print(f"  Using cached data for {country_code} - {year}")
+                body = cache.record_hit(
+                    country_code, year, AREA_TYPE, cached, load_body=not self.stream
+                )
+                chunks = cache.iter_body(cached) if self.stream else None
             else:
-                print(f"    HTTP {response.status_code} for {country_code} - {year}")
-                return None
+                print(f"  Downloading data for {country_code} - {year}...")
+                response = self.request_areas(
+                    country_code, year, params, ResponseCache.conditional_headers(cached)
+                )
+                if response is None:
+                    return None
+
+                if response.status_code == 304 and cache and cached:
+                    body = cache.record_not_modified(
+                        country_code, year, AREA_TYPE, cached, response.headers,
+                        load_body=not self.stream,
+                    )
+                    chunks = cache.iter_body(cached) if self.stream else None
+                elif response.status_code == 200 and self.stream:
+                    body = b""
+                    chunks = response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE)
+                    if cache:
+                        # Spool to the cache first, then parse from disk.
+                        meta = cache.store_stream(
+                            country_code, year, AREA_TYPE, chunks, response.headers, previous=cached
+                        )
+                        chunks = cache.iter_body(meta)
+                elif response.status_code == 200:
+                    body = response.content
+                    chunks = None
+                    if cache:
+                        cache.store(
+                            country_code, year, AREA_TYPE, body, response.headers, previous=cached
+                        )
+                elif response.status_code in NO_DATA_STATUSES:
+                    print(f"    No data available for {country_code} in {year} (HTTP {response.status_code})")
+                    return None
+                else:
+                    self.record_failure(country_code, year, f"HTTP {response.status_code}")
+                    return None
+
+            if chunks is not None:
+                data = {
+                    'type': 'FeatureCollection',
+                    'features': list(iter_polygon_features(iter_features(self.counted(chunks)), precision=self.precision)),
+                }
+            else:
+                self.profiler.count(bytes_in=len(body))
+                data = json.loads(body)
+            if (
+                data
+                and isinstance(data, dict)
+                and isinstance(data.get('features'), list)
+                and data['features']
+            ):
+                return data
+            print(f"    No data available for {country_code} in {year}")
+            return None
                 
         except requests.exceptions.RequestException as e:
-            print(f"    Request failed for {country_code} - {year}: {e}")
+            self.record_failure(country_code, year, f"request failed: {e}")
             return None
-        except json.JSONDecodeError as e:
-            print(f"    Invalid JSON response for {country_code} - {year}: {e}")
+        except (OSError, ValueError) as e:
+            self.record_failure(country_code, year, f"invalid JSON response: {e}")
             return None
+        finally:
+            if response is not None and self.stream:
+                response.close()
+
+    def request_areas(
+        self,
+        country_code: str,
+        year: int,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+    ) -> Optional[requests.Response]:
+        """GET the areas endpoint, retrying transport errors, 429 and 5xx.
+
+        Returns the first response that is not worth retrying (including
+        404 "no data" and other client errors), or None once every attempt
+        failed; the failure is then recorded by ``record_failure``. Waits
+        use jittered exponential backoff and honour ``Retry-After``, and 429
+        responses slow down the shared rate limiter for every worker.
+        """
+        policy = self.retry_policy
+        reason = ""
+        for attempt in range(policy.max_retries + 1):
+            self.rate_limiter.acquire()
+            started = time.perf_counter()
+            retry_after = None
+            try:
+                response = self.session.get(
+                    self.api_base_url,
+                    params=params,
+                    headers=headers,
+                    timeout=self.request_timeout,
+                    stream=self.stream,
+                )
+            except requests.exceptions.RequestException as exc:
+                self.latency_stats.record(country_code, time.perf_counter() - started)
+                reason = f"request failed: {exc}"
+            else:
+                # Time to the full body, or to the headers when streaming.
+                self.latency_stats.record(country_code, time.perf_counter() - started)
+                if not policy.retryable(response.status_code):
+                    self.rate_limiter.on_success()
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if response.status_code == 429:
+                    self.rate_limiter.on_throttle(retry_after)
+                    self.latency_stats.record(country_code, throttled=1)
+                reason = f"HTTP {response.status_code}"
+                response.close()
+
+            if attempt == policy.max_retries:
+                break
+            delay = policy.delay(attempt, retry_after)
+            self.latency_stats.record(country_code, retries=1)
+            self.profiler.count(retries=1)
+            print(
+                f"    {reason} for {country_code} - {year}; "
+                f"retry {attempt + 1}/{policy.max_retries} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+        self.record_failure(country_code, year, reason)
+        return None
+
+    def record_failure(self, country_code: str, year: int, reason: str) -> None:
+        """Remember a download that failed, as opposed to one without data."""
+        print(f"    Download failed for {country_code} - {year}: {reason}")
+        self.latency_stats.record(country_code, failures=1)
+        with self.failures_lock:
+            self.download_failures.setdefault(country_code, {})[year] = reason
+
+    def counted(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass streamed body chunks through, adding their size to ``bytes_in``."""
+        for chunk in chunks:
+            self.profiler.count(bytes_in=len(chunk))
+            yield chunk
+
+    def download_country_years(self, country_code: str) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Download every configured assessment year for a country sequentially."""
+        return {year: self.download_areas(country_code, year) for year in self.years_to_try}
+
+    def submit_downloads(
+        self,
+        executor: ThreadPoolExecutor,
+        countries: Dict[str, Dict],
+    ) -> Dict[str, Dict[int, Future]]:
+        """Queue every (country, year) download on the worker pool."""
+        pending: Dict[str, Dict[int, Future]] = {}
+        for country_code in countries:
+            pending[country_code] = {
+                year: executor.submit(self.download_areas, country_code, year)
+                for year in self.years_to_try
+            }
+        return pending
+
+    @staticmethod
+    def collect_downloads(futures: Dict[int, Future]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Wait for a country's queued downloads, preserving year order."""
+        return {year: future.result() for year, future in futures.items()}
     
+    @profiled("filter_and_process_areas")
     def filter_and_process_areas(self, areas_data: Dict[str, Any], country_info: Dict[str, str], year: int) -> Optional[Dict[str, Any]]:
         """Filter and process areas data to retain only required fields."""
         features = []
-        seen_geometries = set()
         
-        for feature in areas_data.get('features', []):
+        for feature in iter_polygon_features(areas_data.get('features', []), precision=self.precision):
             try:
-                geometry = feature.get('geometry')
-                if not geometry:
-                    continue
-
-                geometry_type = geometry.get('type')
-                if geometry_type not in {'Polygon', 'MultiPolygon'}:
-                    continue
-
-                coordinates = geometry.get('coordinates')
-                if not coordinates:
-                    continue
-                
-                geometry_str = json.dumps(geometry, sort_keys=True)
-                
-                if geometry_str in seen_geometries:
-                    continue
-                
-                seen_geometries.add(geometry_str)
-                
+                geometry = feature['geometry']
                 source_props = feature.get('properties') or {}
                 properties = {
                     'title': source_props.get('title') or '',
@@ -372,6 +699,7 @@ class IPCAreaDownloader:
                 print(f"    Error processing area: {e}")
                 continue
         
+        self.profiler.count(features_in=len(areas_data.get('features') or []), features_out=len(features))
         if not features:
             return None
             
@@ -382,24 +710,40 @@ class IPCAreaDownloader:
         
         return geojson
     
-    def convert_to_topojson(self, geojson: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Convert GeoJSON to TopoJSON format."""
+    @profiled("convert_to_topojson")
+    def convert_to_topojson(self, geojson: Dict[str, Any], *, quantize: bool = False) -> Optional[Dict[str, Any]]:
+        """Convert GeoJSON to TopoJSON format.
+
+        ``quantize`` applies the configured ``--quantize`` grid; combined and
+        global outputs are quantized by the simplification pass instead.
+        """
+        self.profiler.count(features_in=len(geojson.get('features') or []))
         try:
             # Use topojson library to convert
-            topology = tp.Topology(geojson, prequantize=False)
-            return topology.to_dict()
+            topology = tp.Topology(geojson, prequantize=False).to_dict()
+            if quantize and self.quantize:
+                topology = quantize_topology(topology, self.quantize)
+            self.profiler.count(arcs_out=len(topology.get('arcs') or []))
+            return topology
         except Exception as e:
             print(f"    Error converting to TopoJSON: {e}")
             return None
     
     @staticmethod
-    def save_topojson(topojson_data: Dict[str, Any], filepath: Path) -> Optional[Path]:
+    def topojson_sha256(topojson_data: Dict[str, Any]) -> str:
+        """Hash TopoJSON data exactly as ``save_topojson`` would serialise it."""
+        payload = json.dumps(topojson_data, separators=(',', ':')).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    @profiled("save_topojson")
+    def save_topojson(self, topojson_data: Dict[str, Any], filepath: Path) -> Optional[Path]:
         """Save TopoJSON data to the requested location."""
         filepath.parent.mkdir(exist_ok=True, parents=True)
 
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(topojson_data, f, separators=(',', ':'))
+            self.profiler.count(bytes_out=filepath.stat().st_size)
 
             print(f"    Saved: {filepath}")
             return filepath
@@ -407,15 +751,20 @@ class IPCAreaDownloader:
             print(f"    Error saving {filepath}: {e}")
             return None
 
-    def simplify_output(self, topo_path: Path) -> None:
+    @profiled("simplify_output")
+    def simplify_output(self, topo_path: Path, *, mode: Optional[str] = None) -> None:
         """Apply rounding/simplification to a TopoJSON file."""
         try:
+            self.profiler.count(bytes_in=topo_path.stat().st_size)
             simplify_topojson(
                 topo_path,
                 precision=self.precision,
                 simplify_tolerance=self.simplify_tolerance,
                 quiet=True,
+                mode=mode or self.simplify_mode,
+                quantize=self.quantize,
             )
+            self.profiler.count(bytes_out=topo_path.stat().st_size)
         except Exception as exc:  # noqa: BLE001 - log and continue
             print(f"    Warning: simplification skipped for {topo_path}: {exc}")
 
@@ -430,8 +779,30 @@ class IPCAreaDownloader:
         variant: str = "year"
     ) -> None:
         """Add an entry to the index for future discovery."""
+        self.index_entries.append(
+            self.make_index_entry(
+                country_info,
+                year,
+                filepath,
+                feature_count,
+                updated_at,
+                variant=variant,
+            )
+        )
+
+    def make_index_entry(
+        self,
+        country_info: Dict[str, str],
+        year: Optional[int],
+        filepath: Path,
+        feature_count: Optional[int],
+        updated_at: Optional[str] = None,
+        *,
+        variant: str = "year"
+    ) -> Dict[str, Any]:
+        """Build an index entry without registering it."""
         try:
-            relative_path = filepath.relative_to(REPO_ROOT).as_posix()
+            relative_path = filepath.relative_to(self.data_dir.parent).as_posix()
         except ValueError:
             relative_path = filepath.as_posix()
         file_name = filepath.name
@@ -443,6 +814,29 @@ class IPCAreaDownloader:
         if feature_count is None:
             feature_count = self.infer_feature_count(filepath)
 
+        base_path = relative_path.rsplit('/', 1)[0] + '/' if '/' in relative_path else ''
+        cdn_base = cdn_url.rsplit('/', 1)[0] + '/'
+
+        compressed = {}
+        if self.compress_formats:
+            sidecars = write_sidecars([filepath], self.compress_formats)[filepath]
+            for fmt, info in sidecars.items():
+                compressed[fmt] = {
+                    **info,
+                    "relative_path": base_path + str(info['file_name']),
+                    "cdn_url": cdn_base + str(info['file_name']),
+                }
+
+        spatial_index = None
+        if self.spatial_index and variant in ("combined", "global"):
+            index_path = write_spatial_index(filepath)
+            spatial_index = {
+                "file_name": index_path.name,
+                **describe_file(index_path),
+                "relative_path": base_path + index_path.name,
+                "cdn_url": cdn_base + index_path.name,
+            }
+
         if updated_at is None:
             updated_at = datetime.utcnow().isoformat(timespec='seconds') + 'Z'
 
@@ -456,10 +850,35 @@ class IPCAreaDownloader:
             "feature_count": feature_count,
             "cdn_url": cdn_url,
             "updated_at": updated_at,
-            "variant": variant
+            "variant": variant,
+            **describe_file(filepath),
         }
+        if compressed:
+            entry["compressed"] = compressed
+        if spatial_index:
+            entry["spatial_index"] = spatial_index
+        if self.geoparquet and variant in ("combined", "global"):
+            parquet_path = export_geoparquet(filepath)
+            entry["geoparquet"] = {
+                "file_name": parquet_path.name,
+                **describe_file(parquet_path),
+                "relative_path": base_path + parquet_path.name,
+                "cdn_url": cdn_base + parquet_path.name,
+            }
+        if self.lod_ladder and variant in ("combined", "global"):
+            levels = write_lod_variants(
+                filepath, self.lod_ladder, precision=self.precision, quantize=self.quantize
+            )
+            entry["lod"] = [
+                {
+                    **level,
+                    "relative_path": base_path + level["file_name"],
+                    "cdn_url": cdn_base + level["file_name"],
+                }
+                for level in levels
+            ]
 
-        self.index_entries.append(entry)
+        return entry
 
     @staticmethod
     def infer_feature_count(filepath: Path) -> Optional[int]:
@@ -480,9 +899,75 @@ class IPCAreaDownloader:
 
         return None
     
-    def process_country(self, country_code: str, country_info: Dict[str, str]) -> bool:
-        """Process a single country - download, store per-year, and build combined dataset."""
+    def process_country(
+        self,
+        country_code: str,
+        country_info: Dict[str, str],
+        downloads: Optional[Dict[int, Optional[Dict[str, Any]]]] = None,
+    ) -> bool:
+        """Process a single country - download, store per-year, and build combined dataset.
+
+        ``downloads`` may carry payloads already fetched by the concurrent
+        download pool; otherwise the configured years are fetched here.
+        """
+        if downloads is None:
+            downloads = self.download_country_years(country_code)
+
+        result = self.build_country(country_code, country_info, downloads)
+        return self.apply_country_result(result)
+
+    def apply_country_result(self, result: Dict[str, Any]) -> bool:
+        """Register the outputs reported by ``build_country`` on this instance."""
+        self.index_entries.extend(result['index_entries'])
+        self.fingerprint_index.apply_updates(result.get('fingerprints') or {})
+        self.profiler.extend(result.get('profile') or [])
+        if result['combined_path'] is not None:
+            self.country_combined_files.append(result['combined_path'])
+
+        manifest = result['manifest']
+        if manifest:
+            self.build_manifest.record(
+                manifest['target'],
+                manifest['inputs'],
+                manifest['output'],
+                **manifest['details'],
+            )
+
+        return result['success']
+
+    def build_country(
+        self,
+        country_code: str,
+        country_info: Dict[str, str],
+        downloads: Dict[int, Optional[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Store per-year files and build the combined dataset for one country.
+
+        The instance is not mutated: index entries, the combined path, the
+        manifest record and new fingerprint index entries are returned so the
+        call can run in a worker process and be applied in a deterministic
+        order by ``apply_country_result``.
+        """
+        with self.profiler.stage("build_country", country=country_code):
+            result = self._build_country(country_code, country_info, downloads)
+        result['fingerprints'] = self.fingerprint_index.take_updates()
+        result['profile'] = self.profiler.take_records()
+        return result
+
+    def _build_country(
+        self,
+        country_code: str,
+        country_info: Dict[str, str],
+        downloads: Dict[int, Optional[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
         print(f"\nProcessing {country_info['name']} ({country_code})...")
+        result: Dict[str, Any] = {
+            "success": False,
+            "combined_path": None,
+            "index_entries": [],
+            "manifest": None,
+        }
+        index_entries: List[Dict[str, Any]] = result['index_entries']
 
         iso3 = country_info['iso3']
         country_dir = self.data_dir / iso3
@@ -508,9 +993,76 @@ class IPCAreaDownloader:
             except OSError as exc:  # noqa: BLE001
                 print(f"    Warning: unable to remove legacy dataset {legacy_combined}: {exc}")
 
-        aggregated: Dict[str, Dict[str, Any]] = {}
-        year_feature_counts: Dict[int, Dict[str, Any]] = {}
         combined_path = modern_combined
+        year_paths: Dict[int, Path] = {}
+        for path in sorted(country_dir.glob(f"{iso3}_*{COUNTRY_FILENAME_SUFFIX}")):
+            year = self.extract_year_from_path(path, iso3)
+            if year is not None:
+                year_paths[year] = path
+
+        # Payloads that reproduce the stored per-year file are promoted as-is;
+        # only genuinely new content is written and forces a recombination.
+        unchanged_years = set()
+        pending_years: Dict[int, Dict[str, Any]] = {}
+        for year, areas_data in downloads.items():
+            if not areas_data:
+                continue
+
+            if (
+                self.response_cache
+                and year in year_paths
+                and self.response_cache.is_unchanged(country_code, year, AREA_TYPE)
+            ):
+                unchanged_years.add(year)
+                continue
+
+            geojson = self.filter_and_process_areas(areas_data, country_info, year)
+            if not geojson or not geojson['features']:
+                print(f"    No valid polygon features found for year {year}")
+                continue
+
+            topojson_data = self.convert_to_topojson(geojson, quantize=True)
+            if not topojson_data:
+                print(f"    Failed to convert downloaded features for year {year}")
+                continue
+
+            if year in year_paths and self.topojson_sha256(topojson_data) == file_sha256(year_paths[year]):
+                unchanged_years.add(year)
+                if self.response_cache:
+                    self.response_cache.mark_processed(country_code, year, AREA_TYPE)
+                continue
+
+            pending_years[year] = {"geojson": geojson, "topojson": topojson_data}
+
+        if not pending_years and not self.force_rebuild:
+            inputs = hash_inputs(year_paths.values(), self.data_dir)
+            record = self.build_manifest.lookup(iso3, inputs, combined_path)
+            if record:
+                year_counts = record.get('year_feature_counts') or {}
+                for year, path in year_paths.items():
+                    if str(year) in year_counts:
+                        index_entries.append(self.make_index_entry(
+                            country_info,
+                            year,
+                            path,
+                            year_counts[str(year)],
+                            variant="year"
+                        ))
+                index_entries.append(self.make_index_entry(
+                    country_info,
+                    record.get('representative_year'),
+                    combined_path,
+                    record.get('feature_count'),
+                    variant="combined"
+                ))
+                print("    Per-year inputs unchanged since last build; combined dataset kept")
+                result.update(success=True, combined_path=combined_path)
+                return result
+
+        aggregated: Dict[str, MergeCandidate] = {}
+        year_feature_counts: Dict[int, Dict[str, Any]] = {}
+        existing_year_features: Dict[int, List[Dict[str, Any]]] = {}
+        existing_year_fingerprints: Dict[int, Optional[List[str]]] = {}
 
         if combined_path.exists():
             legacy_features = self.load_existing_features(combined_path)
@@ -521,6 +1073,7 @@ class IPCAreaDownloader:
                     priority=-5,
                     source_year=None,
                     source_label="legacy_combined",
+                    fingerprints=self.indexed_fingerprints(combined_path, legacy_features),
                 )
                 if stats["added"] or stats["updated"]:
                     print(
@@ -529,20 +1082,17 @@ class IPCAreaDownloader:
                     )
 
         # Seed aggregate with any existing per-year datasets
-        existing_year_files = sorted(country_dir.glob(f"{iso3}_*{COUNTRY_FILENAME_SUFFIX}"))
-        for path in existing_year_files:
-            year = self.extract_year_from_path(path, iso3)
-            if year is None:
-                continue
-
+        for year, path in year_paths.items():
             features = self.load_existing_features(path)
             if features:
+                fingerprints = self.indexed_fingerprints(path, features)
                 stats = self.merge_features(
                     aggregated,
                     features,
                     priority=0,
                     source_year=year,
-                    source_label=f"existing:{year}"
+                    source_label=f"existing:{year}",
+                    fingerprints=fingerprints,
                 )
                 if stats["added"] or stats["updated"]:
                     print(
@@ -553,62 +1103,71 @@ class IPCAreaDownloader:
                     "path": path,
                     "feature_count": len(features)
                 }
+                existing_year_features[year] = features
+                existing_year_fingerprints[year] = fingerprints
 
-        # Download requested assessment years
-        for year in self.years_to_try:
-            areas_data = self.download_areas(country_code, year)
-
-            if not areas_data:
-                time.sleep(0.5)
-                continue
-
-            geojson = self.filter_and_process_areas(areas_data, country_info, year)
-            if not geojson or not geojson['features']:
-                print(f"    No valid polygon features found for year {year}")
-                time.sleep(0.5)
+        for year in downloads:
+            if year in unchanged_years and year in existing_year_features:
+                stats = self.merge_features(
+                    aggregated,
+                    existing_year_features[year],
+                    priority=10,
+                    source_year=year,
+                    source_label=f"download:{year}",
+                    fingerprints=existing_year_fingerprints[year],
+                )
+                print(
+                    f"    Year {year}: payload unchanged, reused "
+                    f"{len(existing_year_features[year])} existing features "
+                    f"({stats['updated']} updated)"
+                )
                 continue
 
-            topojson_data = self.convert_to_topojson(geojson)
-            if not topojson_data:
-                print(f"    Failed to convert downloaded features for year {year}")
-                time.sleep(0.5)
+            pending = pending_years.get(year)
+            if not pending:
                 continue
 
+            geojson = pending['geojson']
             year_path = country_dir / f"{iso3}_{year}{COUNTRY_FILENAME_SUFFIX}"
-            saved_year_path = self.save_topojson(topojson_data, year_path)
+            saved_year_path = self.save_topojson(pending['topojson'], year_path)
+            fingerprints = None
+            if "geometry" in self.key_strategy:
+                fingerprints = fingerprint_features(geojson['features'], self.precision)
             if saved_year_path:
+                if fingerprints is not None:
+                    self.fingerprint_index.remember(saved_year_path, fingerprints)
                 year_feature_counts[year] = {
                     "path": saved_year_path,
                     "feature_count": len(geojson['features'])
                 }
+                if self.response_cache:
+                    self.response_cache.mark_processed(country_code, year, AREA_TYPE)
 
             stats = self.merge_features(
                 aggregated,
                 geojson['features'],
                 priority=10,
                 source_year=year,
-                source_label=f"download:{year}"
+                source_label=f"download:{year}",
+                fingerprints=fingerprints,
             )
             print(
                 f"    Year {year}: {len(geojson['features'])} features retrieved "
                 f"({stats['added']} new, {stats['updated']} updated)"
             )
 
-            time.sleep(0.5)
-
         if not aggregated:
             print(f"    No data found for {country_info['name']} in any year")
-            return False
+            return result
 
         years_seen = [
-            entry.get('source_year')
-            for entry in aggregated.values()
-            if entry.get('source_year') is not None
+            candidate.source_year
+            for candidate in aggregated.values()
+            if candidate.source_year is not None
         ]
         representative_year = max(years_seen) if years_seen else None
 
-        sorted_entries = sorted(aggregated.items(), key=lambda item: item[0])
-        final_features = [entry['feature'] for _, entry in sorted_entries]
+        final_features = self.emit_features(aggregated)
         final_geojson = {
             'type': 'FeatureCollection',
             'features': final_features
@@ -617,15 +1176,14 @@ class IPCAreaDownloader:
         topojson_data = self.convert_to_topojson(final_geojson)
         if not topojson_data:
             print(f"    Failed to convert merged features to TopoJSON for {country_info['name']}")
-            return False
+            return result
 
         saved_combined = self.save_topojson(topojson_data, combined_path)
         if not saved_combined:
             print(f"    Failed to save merged dataset for {country_info['name']}")
-            return False
+            return result
 
         self.simplify_output(saved_combined)
-        self.country_combined_files.append(saved_combined)
 
         feature_count = len(final_features)
         available_years = sorted(year_feature_counts.keys())
@@ -633,37 +1191,61 @@ class IPCAreaDownloader:
             available_years = sorted({year for year in years_seen if isinstance(year, int)})
 
         for year in available_years:
-            stats = year_feature_counts[year]
-            self.add_index_entry(
+            stats = year_feature_counts.get(year)
+            if not stats:
+                continue
+            index_entries.append(self.make_index_entry(
                 country_info,
                 year,
                 stats['path'],
                 stats.get('feature_count'),
                 variant="year"
-            )
+            ))
 
-        self.add_index_entry(
+        index_entries.append(self.make_index_entry(
             country_info,
             representative_year,
             saved_combined,
             feature_count,
             variant="combined"
-        )
+        ))
+
+        year_inputs = [
+            path
+            for path in country_dir.glob(f"{iso3}_*{COUNTRY_FILENAME_SUFFIX}")
+            if self.extract_year_from_path(path, iso3) is not None
+        ]
+        result['manifest'] = {
+            "target": iso3,
+            "inputs": hash_inputs(year_inputs, self.data_dir),
+            "output": saved_combined,
+            "details": {
+                "feature_count": feature_count,
+                "representative_year": representative_year,
+                "year_feature_counts": {
+                    str(year): year_feature_counts[year].get('feature_count')
+                    for year in available_years
+                    if year in year_feature_counts
+                },
+            },
+        }
 
         print(
             f"    Combined dataset saved with {feature_count} features "
             f"across {len(available_years)} assessment year(s)"
         )
 
-        return True
+        result.update(success=True, combined_path=saved_combined)
+        return result
 
+    @profiled("build_global_dataset")
     def build_global_dataset(self) -> None:
         """Combine all country-level combined files into a global dataset."""
         print("\nBuilding global dataset...")
 
         combined_files = list(self.country_combined_files)
         if not combined_files:
-            for country_dir in sorted(DATA_DIR.iterdir()):
+            for country_dir in sorted(self.data_dir.iterdir()):
                 if not country_dir.is_dir():
                     continue
                 iso3 = country_dir.name
@@ -675,10 +1257,39 @@ class IPCAreaDownloader:
             print("  Warning: no combined country datasets found – global file not updated")
             return
 
-        aggregated: Dict[str, Dict[str, Any]] = {}
+        global_path = self.data_dir / GLOBAL_FILENAME
+        inputs = hash_inputs(combined_files, self.data_dir)
+        self.profiler.count(bytes_in=sum(path.stat().st_size for path in combined_files))
+        record = None if self.force_rebuild else self.build_manifest.lookup(
+            GLOBAL_INFO['iso3'], inputs, global_path
+        )
+        if record:
+            self.add_index_entry(
+                GLOBAL_INFO,
+                record.get('representative_year'),
+                global_path,
+                record.get('feature_count'),
+                variant="global",
+            )
+            print(f"  Combined datasets unchanged since last build; kept {global_path}")
+            return
+
+        # Topology mode keys lightweight stand-ins that carry their members.
+        aggregated: Dict[str, MergeCandidate] = {}
 
         for path in sorted(combined_files):
-            features = self.load_existing_features(path)
+            if self.global_merge == "topology":
+                topology = self.load_existing_topology(path)
+                members = topology_members(topology) if topology else []
+                features = member_features(members, topology)
+                fingerprints = None
+                if "geometry" in self.key_strategy and features:
+                    fingerprints = self.fingerprint_index.cached(path, len(features))
+                    if fingerprints is None:
+                        fingerprints = self.fingerprint_index.fingerprints(path, topology_to_features(topology))
+            else:
+                features = self.load_existing_features(path)
+                fingerprints = self.indexed_fingerprints(path, features) if features else None
             if not features:
                 continue
 
@@ -688,35 +1299,47 @@ class IPCAreaDownloader:
                 priority=0,
                 source_year=None,
                 source_label=path.name,
+                fingerprints=fingerprints,
             )
 
         if not aggregated:
             print("  Warning: no features discovered while building the global dataset")
             return
 
-        sorted_entries = sorted(aggregated.items(), key=lambda item: item[0])
-        final_features = [entry['feature'] for _, entry in sorted_entries]
-        final_geojson = {
-            'type': 'FeatureCollection',
-            'features': final_features,
-        }
-
-        topojson_data = self.convert_to_topojson(final_geojson)
+        if self.global_merge == "topology":
+            # Country files are topologies already: concatenate them instead of
+            # rebuilding one over the whole world. Simplifying the arcs keeps it.
+            parts = [aggregated[key].feature[MEMBER_SOURCE_KEY] for key in sorted(aggregated)]
+            topojson_data, merge_stats = concatenate_topologies(parts)
+            feature_count = len(parts)
+            print(
+                f"  Concatenated {merge_stats['sources']} topologies: {merge_stats['arcs']} arcs, "
+                f"{merge_stats['shared_arcs']} border arcs shared"
+            )
+        else:
+            final_features = self.emit_features(aggregated)
+            final_geojson = {
+                'type': 'FeatureCollection',
+                'features': final_features,
+            }
+            topojson_data = self.convert_to_topojson(final_geojson)
+            feature_count = len(final_features)
         if not topojson_data:
             print("  Warning: failed to convert combined global features to TopoJSON")
             return
 
-        saved_global = self.save_topojson(topojson_data, GLOBAL_OUTPUT_PATH)
+        saved_global = self.save_topojson(topojson_data, global_path)
         if not saved_global:
             print("  Warning: unable to save global dataset")
             return
 
-        self.simplify_output(saved_global)
+        self.simplify_output(saved_global, mode="arcs" if self.global_merge == "topology" else None)
+        self.profiler.count(bytes_out=saved_global.stat().st_size)
 
         years_seen = [
-            entry.get('source_year')
-            for entry in aggregated.values()
-            if entry.get('source_year') is not None
+            candidate.source_year
+            for candidate in aggregated.values()
+            if candidate.source_year is not None
         ]
         representative_year = max(years_seen) if years_seen else None
 
@@ -724,11 +1347,18 @@ class IPCAreaDownloader:
             GLOBAL_INFO,
             representative_year,
             saved_global,
-            len(final_features),
+            feature_count,
             variant="global",
         )
+        self.build_manifest.record(
+            GLOBAL_INFO['iso3'],
+            inputs,
+            saved_global,
+            feature_count=feature_count,
+            representative_year=representative_year,
+        )
 
-        legacy_path = DATA_DIR / "ipc_global_areas.topojson"
+        legacy_path = self.data_dir / "ipc_global_areas.topojson"
         if legacy_path.exists() and legacy_path != saved_global:
             try:
                 legacy_path.unlink()
@@ -736,7 +1366,8 @@ class IPCAreaDownloader:
             except OSError as exc:  # noqa: BLE001
                 print(f"  Warning: unable to remove legacy global dataset {legacy_path}: {exc}")
 
-        print(f"  Global dataset saved to {saved_global} with {len(final_features)} features")
+        print(f"  Global dataset saved to {saved_global} with {feature_count} features")
+
     def write_index_file(self) -> None:
         """Write or update the TopoJSON index file."""
         index_path = self.data_dir / "index.json"
@@ -745,6 +1376,7 @@ class IPCAreaDownloader:
             "generated_at": datetime.utcnow().isoformat(timespec='seconds') + 'Z',
             "cdn_release_tag": self.cdn_release_tag,
             "total_files": len(self.index_entries),
+            "compression_formats": self.compress_formats,
             "items": sorted(
                 self.index_entries,
                 key=lambda entry: (
@@ -763,6 +1395,36 @@ class IPCAreaDownloader:
         except Exception as exc:
             print(f"Error writing index file: {exc}")
     
+    @profiled("build_vector_tiles")
+    def build_vector_tiles(self) -> None:
+        """Render the global dataset into the ``--tiles`` MVT pyramid."""
+        global_path = self.data_dir / GLOBAL_FILENAME
+        if self.tiles_path is None or not global_path.exists():
+            return
+        print(f"\nBuilding vector tiles z{self.tile_zooms[0]}-z{self.tile_zooms[1]}...")
+
+        target = f"tiles:{self.tiles_path.as_posix()}"
+        inputs = hash_inputs([global_path], self.data_dir)
+        inputs["zooms"] = "{}-{}".format(*self.tile_zooms)
+        marker = tiles_metadata_path(self.tiles_path)
+        record = None if self.force_rebuild else self.build_manifest.lookup(target, inputs, marker)
+        if record:
+            self.tile_stats = {int(zoom): entry for zoom, entry in record.get("stats", {}).items()}
+            print(f"  Global dataset unchanged since last build; kept {self.tiles_path}")
+            return
+
+        self.tile_stats = build_tiles(
+            global_path,
+            self.tiles_path,
+            min_zoom=self.tile_zooms[0],
+            max_zoom=self.tile_zooms[1],
+            workers=self.build_workers,
+        )
+        self.build_manifest.record(
+            target, inputs, marker, stats={str(zoom): entry for zoom, entry in self.tile_stats.items()}
+        )
+        print(f"  Vector tiles saved to {self.tiles_path}")
+
     def run(self):
         """Main execution method."""
         print("IPC Areas Download Script")
@@ -776,32 +1438,125 @@ class IPCAreaDownloader:
             "Assessment years: "
             + ", ".join(str(year) for year in self.years_to_try)
         )
+        print(f"Download workers: {self.workers} (max {self.max_rps:g} requests/s)")
+        print(f"Build workers: {self.build_workers}")
         
         # Process each country
         successful = 0
         failed = 0
-        
-        for country_code, country_info in countries.items():
-            try:
-                if self.process_country(country_code, country_info):
-                    successful += 1
-                else:
+
+        executor: Optional[ThreadPoolExecutor] = None
+        pending: Dict[str, Dict[int, Future]] = {}
+        if self.workers > 1:
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ipc-download")
+            pending = self.submit_downloads(executor, countries)
+
+        build_pool: Optional[ProcessPoolExecutor] = None
+        builds: List[Tuple[Dict[str, str], Future]] = []
+        if self.build_workers > 1:
+            build_pool = ProcessPoolExecutor(max_workers=self.build_workers)
+
+        try:
+            for country_code, country_info in countries.items():
+                try:
+                    downloads = None
+                    if executor is not None:
+                        downloads = self.collect_downloads(pending.pop(country_code))
+                    if build_pool is not None:
+                        if downloads is None:
+                            downloads = self.download_country_years(country_code)
+                        future = build_pool.submit(
+                            self.build_country, country_code, country_info, downloads
+                        )
+                        builds.append((country_info, future))
+                        continue
+                    if self.process_country(country_code, country_info, downloads):
+                        successful += 1
+                    else:
+                        failed += 1
+                except Exception as e:
+                    print(f"Error processing {country_info['name']}: {e}")
                     failed += 1
-            except Exception as e:
-                print(f"Error processing {country_info['name']}: {e}")
-                failed += 1
-            
-            # Rate limiting
-            time.sleep(1)
+
+            # Apply worker results in country order so outputs match the serial path.
+            for country_info, future in builds:
+                try:
+                    if self.apply_country_result(future.result()):
+                        successful += 1
+                    else:
+                        failed += 1
+                except Exception as e:
+                    print(f"Error processing {country_info['name']}: {e}")
+                    failed += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            if build_pool is not None:
+                build_pool.shutdown(cancel_futures=True)
 
         self.build_global_dataset()
+        self.build_vector_tiles()
         self.write_index_file()
+        self.build_manifest.save()
+        self.fingerprint_index.save()
+        print(
+            f"Geometry fingerprints: {self.fingerprint_index.stats['reused']} file(s) reused, "
+            f"{self.fingerprint_index.stats['computed']} computed"
+        )
+
+        if self.response_cache:
+            self.response_cache.evict()
+            print(f"Response cache: {self.response_cache.summary()}")
+
+        downloads = self.latency_stats.summary()
+        failures = {
+            country: {str(year): reason for year, reason in sorted(years.items())}
+            for country, years in sorted(self.download_failures.items())
+        }
+        report = self.profiler.report()
+        if self.report_path is not None:
+            report = self.profiler.write_report(
+                self.report_path,
+                settings=self.build_manifest.params,
+                workers=self.workers,
+                build_workers=self.build_workers,
+                successful=successful,
+                failed=failed,
+                downloads=downloads,
+                download_failures=failures,
+                rate_limiter={**self.rate_limiter.stats, "final_rate": self.rate_limiter.rate},
+            )
+            print(f"Run report written to {self.report_path}")
 
         print(f"\n" + "=" * 50)
         print(f"Processing complete!")
         print(f"Successful: {successful}")
         print(f"Failed: {failed}")
         print(f"Data saved in: {self.data_dir.absolute()}")
+        if failures:
+            print(
+                f"Download failures ({sum(len(years) for years in failures.values())}; "
+                "stored files were kept for these years):"
+            )
+            for country, years in failures.items():
+                for year, reason in years.items():
+                    print(f"  {country} {year}: {reason}")
+        if self.rate_limiter.stats['throttled']:
+            print(
+                f"Throttled {self.rate_limiter.stats['throttled']} time(s); request rate went down to "
+                f"{self.rate_limiter.stats['min_rate']:.2f}/s and ended at {self.rate_limiter.rate:.2f}/s"
+            )
+        if downloads:
+            print("Download latency per country:")
+            for line in format_latency_summary(downloads):
+                print(line)
+        if self.tile_stats:
+            print(f"Vector tiles ({self.tiles_path}):")
+            for line in format_stats(self.tile_stats):
+                print(line)
+        print(f"Stage timings ({report['wall_s']:.1f}s wall, {report['cpu_s']:.1f}s CPU in this process):")
+        for line in format_stage_totals(report['stages']):
+            print(line)
 
 def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Download and consolidate IPC area datasets")
@@ -823,6 +1578,205 @@ def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=0.0,
         help="Simplification tolerance applied to combined outputs (default: 0)",
     )
+    parser.add_argument(
+        "--simplify-mode",
+        choices=SIMPLIFY_MODES,
+        default=DEFAULT_SIMPLIFY_MODE,
+        help=(
+            "Simplify per feature and rebuild the topology, or simplify the shared TopoJSON "
+            "arcs directly so borders stay watertight (default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--quantize",
+        type=int,
+        default=None,
+        help=(
+            "Write per-year, combined and global outputs with quantized, delta-encoded arcs "
+            "on an N x N grid (e.g. 100000); omitted keeps absolute coordinates"
+        ),
+    )
+    parser.add_argument(
+        "--compress",
+        nargs="*",
+        choices=SIDECAR_FORMATS,
+        default=None,
+        help=(
+            "Write maximum-compression sidecars (.gz, and .br when brotli is installed) next to "
+            "every output and record their sizes/hashes in index.json; no value means all formats"
+        ),
+    )
+    parser.add_argument(
+        "--key-strategy",
+        type=parse_key_strategy,
+        default=DEFAULT_KEY_STRATEGY,
+        help=(
+            "Comma-separated fallback chain of merge keys from id, admin, title and geometry "
+            f"(default: {','.join(DEFAULT_KEY_STRATEGY)})"
+        ),
+    )
+    parser.add_argument(
+        "--skip-spatial-index",
+        action="store_true",
+        help="Do not write .sidx point-lookup index sidecars for combined and global outputs",
+    )
+    parser.add_argument(
+        "--geoparquet",
+        action="store_true",
+        help=(
+            "Also export combined and global outputs as GeoParquet (.parquet, needs pyarrow) "
+            "and list them in index.json"
+        ),
+    )
+    parser.add_argument(
+        "--global-merge",
+        choices=GLOBAL_MERGE_MODES,
+        default=DEFAULT_GLOBAL_MERGE,
+        help=(
+            "Build the global file from decoded features with a full topology rebuild, or by "
+            "concatenating the country topologies and sharing only identical border arcs, "
+            "which scales linearly with the number of countries (default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--lod",
+        nargs="?",
+        type=parse_lod_ladder,
+        const=DEFAULT_LOD_LADDER,
+        default=(),
+        metavar="NAME=TOL,...",
+        help=(
+            "Write level-of-detail variants (X.lod-NAME.topojson) of every combined and global file, "
+            "simplified progressively with increasing tolerances in degrees, and list them under "
+            "'lod' in index.json (default ladder: "
+            + ",".join(f"{name}={tolerance:g}" for name, tolerance in DEFAULT_LOD_LADDER)
+            + ")"
+        ),
+    )
+    parser.add_argument(
+        "--tiles",
+        type=Path,
+        default=None,
+        help=(
+            "Render the global dataset as a Mapbox Vector Tile pyramid into this directory "
+            "({z}/{x}/{y}.pbf), or into a single MBTiles file when the path ends in .mbtiles"
+        ),
+    )
+    parser.add_argument(
+        "--tile-min-zoom",
+        type=int,
+        default=DEFAULT_MIN_ZOOM,
+        help="Lowest vector tile zoom level (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--tile-max-zoom",
+        type=int,
+        default=DEFAULT_MAX_ZOOM,
+        help="Highest vector tile zoom level; tiles are simplified to one pixel per zoom (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of concurrent (country, year) downloads (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=DEFAULT_MAX_RPS,
+        help=(
+            "Global request rate limit shared by all download workers; "
+            f"set to 0 to disable (default: {DEFAULT_MAX_RPS:g})"
+        ),
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=(
+            "Retries per request after timeouts, connection errors, 429 and 5xx responses, "
+            "with jittered exponential backoff that honours Retry-After (default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=DEFAULT_REQUEST_TIMEOUT,
+        help="Seconds to wait for the API before an attempt counts as failed (default: %(default)g)",
+    )
+    parser.add_argument(
+        "--api-url",
+        default=API_BASE_URL,
+        help="IPC areas endpoint, e.g. a local stand-in server for testing (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=None,
+        help="Output directory for generated datasets (default: data/)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory for the on-disk API response cache; caching is disabled when omitted",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=0.0,
+        help=(
+            "Hours a cached response is reused without contacting the API; "
+            "expired entries are revalidated with conditional requests (default: 0)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / (1024 * 1024),
+        help="Size limit for cached response bodies before LRU eviction (default: %(default)g)",
+    )
+    parser.add_argument(
+        "--force-rebuild",
+        action="store_true",
+        help="Rebuild combined and global datasets even when the build manifest shows no input changes",
+    )
+    parser.add_argument(
+        "--build-workers",
+        type=int,
+        default=1,
+        help=(
+            "Worker processes for the per-country merge/TopoJSON/simplify stage; "
+            "outputs are identical to the serial build (default: 1)"
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Parse API responses incrementally, keeping only unique polygon features, "
+            "so memory does not grow with the raw payload size"
+        ),
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help=(
+            "Write a JSON run report with wall time, CPU time, bytes in/out and peak RSS per "
+            "stage and per country, for diffing across runs"
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help=(
+            "Write cProfile dumps of every top-level stage to DIR, add tracemalloc peaks to the "
+            f"run report and write it to DIR/{REPORT_FILENAME} unless --report is given"
+        ),
+    )
     return parser.parse_args(argv)
 
 
@@ -834,6 +1788,31 @@ def main(argv: Optional[List[str]] = None) -> int:
             years_to_try=args.years,
             precision=args.precision,
             simplify_tolerance=args.simplify_tolerance,
+            simplify_mode=args.simplify_mode,
+            quantize=args.quantize,
+            compress_formats=SIDECAR_FORMATS if args.compress == [] else (args.compress or ()),
+            key_strategy=args.key_strategy,
+            spatial_index=not args.skip_spatial_index,
+            geoparquet=args.geoparquet,
+            lod_ladder=args.lod,
+            global_merge=args.global_merge,
+            tiles_path=args.tiles,
+            tile_min_zoom=args.tile_min_zoom,
+            tile_max_zoom=args.tile_max_zoom,
+            workers=args.workers,
+            max_rps=args.max_rps,
+            max_retries=args.max_retries,
+            request_timeout=args.request_timeout,
+            api_base_url=args.api_url,
+            data_dir=args.data_dir,
+            cache_dir=args.cache_dir,
+            cache_ttl=args.cache_ttl * 3600,
+            cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            force_rebuild=args.force_rebuild,
+            build_workers=args.build_workers,
+            stream=args.stream,
+            report_path=args.report,
+            profile_dir=args.profile,
         )
         downloader.run()
     except KeyboardInterrupt:
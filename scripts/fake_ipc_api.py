@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""Local stand-in for the IPC areas API, replaying the committed data.
+
+Answers ``GET /areas?format=geojson&country=AO&year=2021&type=A&key=...``
+like ``api.ipcinfo.org`` does for the downloader: the per-year file
+``data/AGO/AGO_2021_areas.topojson`` is decoded and sent back as a GeoJSON
+FeatureCollection (an empty collection when no file exists or the area type
+is not ``A``). Responses carry an ETag and honour ``If-None-Match``, so the
+response cache's conditional requests work too. ``GET /stats`` returns the
+request counters as JSON.
+
+Faults for load and replay testing, all off by default:
+
+* ``--latency``/``--jitter``: fixed plus uniformly random delay per request;
+  ``--tail-rate``/``--tail-latency`` add a long tail on a fraction of them
+* ``--error-rate``: fraction of requests answered with one of ``--error-status``
+* ``--throttle-rps``/``--burst``: token bucket per server; requests beyond it
+  get ``429 Too Many Requests`` with a ``Retry-After`` header
+* ``--inflate N``: repeat every feature N times (the downloader drops the
+  duplicates, so outputs are unchanged while payloads grow N-fold)
+
+``running_api`` runs the server on a background thread for benchmarks and
+scripted runs. Faults are drawn from a seeded generator, so a replay with the
+same settings and request order injects the same faults.
+
+Usage example:
+
+    python scripts/fake_ipc_api.py --port 8080 --latency 0.2 --error-rate 0.05 --throttle-rps 5
+    IPC_KEY=test python scripts/download_ipc_areas.py --api-url http://127.0.0.1:8080/areas --data-dir /tmp/replay
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from .serve_ipc_areas import MAX_HEADER_BYTES, HTTPApp, LRUCache, Response, accepted_encodings
+    from .topojson_io import load_topojson_features
+except ImportError:  # pragma: no cover - script executed directly
+    from serve_ipc_areas import MAX_HEADER_BYTES, HTTPApp, LRUCache, Response, accepted_encodings
+    from topojson_io import load_topojson_features
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_ROOT / "data"
+COUNTRIES_CSV = REPO_ROOT / "countries.csv"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_CACHE_MB = 512
+DEFAULT_ERROR_STATUSES = (500, 502, 503)
+AREAS_PATH = "/areas"
+RECORDED_TYPE = "A"
+EMPTY_COLLECTION = b'{"type":"FeatureCollection","features":[]}'
+
+
+class FaultSettings:
+    """Latency, error and throttling behaviour of the fake API."""
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = DEFAULT_ERROR_STATUSES,
+        throttle_rps: float = 0.0,
+        burst: Optional[float] = None,
+        inflate: int = 1,
+        seed: int = 0,
+    ):
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.tail_rate = float(tail_rate)
+        self.tail_latency = float(tail_latency)
+        self.error_rate = float(error_rate)
+        self.error_statuses = tuple(HTTPStatus(int(status)) for status in error_statuses)
+        self.throttle_rps = float(throttle_rps)
+        self.burst = float(burst) if burst is not None else max(1.0, self.throttle_rps)
+        self.inflate = int(inflate)
+        self.seed = int(seed)
+
+        if min(self.latency, self.jitter, self.tail_latency, self.throttle_rps) < 0:
+            raise ValueError("Latencies and the throttle rate must be non-negative")
+        if not 0 <= self.tail_rate <= 1 or not 0 <= self.error_rate <= 1:
+            raise ValueError("Tail and error rates must be between 0 and 1")
+        if self.error_rate and not self.error_statuses:
+            raise ValueError("At least one error status is required")
+        if self.burst < 1:
+            raise ValueError("Burst must be at least 1")
+        if self.inflate < 1:
+            raise ValueError("Inflation factor must be at least 1")
+
+
+class Throttle:
+    """Token bucket that rejects instead of waiting; returns the retry delay."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Consume a token and return 0, or the seconds until one is available."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def load_country_codes(path: Path = COUNTRIES_CSV) -> Dict[str, str]:
+    """ISO2 -> ISO3 from ``countries.csv`` (the API is queried by ISO2)."""
+    codes = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as handle:
+        for row in csv.DictReader(handle):
+            row = {(name or "").strip(): value for name, value in row.items()}
+            alpha_2 = (row.get("Alpha_2_Code") or "").strip()
+            alpha_3 = (row.get("Alpha_3_Code") or "").strip()
+            if alpha_2 and alpha_3:
+                codes[alpha_2] = alpha_3
+    return codes
+
+
+class FakeIPCApi(HTTPApp):
+    """Serve recorded per-year files as IPC API responses, with injected faults."""
+
+    def __init__(
+        self,
+        data_dir: Path = DATA_DIR,
+        faults: Optional[FaultSettings] = None,
+        *,
+        cache_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024,
+        api_key: Optional[str] = None,
+    ):
+        self.data_dir = Path(data_dir)
+        self.faults = faults or FaultSettings()
+        self.api_key = api_key
+        self.country_codes = load_country_codes()
+        self.bodies = LRUCache(cache_bytes)
+        self.bodies_lock = threading.Lock()
+        self.random = random.Random(self.faults.seed)
+        self.throttle = Throttle(self.faults.throttle_rps, self.faults.burst)
+        self.url: Optional[str] = None
+        self.connections: set = set()
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "statuses": {},
+            "bytes_sent": 0,
+            "throttled": 0,
+            "injected_errors": 0,
+            "injected_latency_s": 0.0,
+        }
+
+    def recorded_path(self, country: str, year: str) -> Optional[Path]:
+        iso3 = self.country_codes.get(country.upper())
+        if not iso3 or not year.isdigit():
+            return None
+        path = self.data_dir / iso3 / f"{iso3}_{int(year)}_areas.topojson"
+        return path if path.is_file() else None
+
+    def build_response(self, path: Optional[Path]) -> Response:
+        if path is None:
+            return Response(EMPTY_COLLECTION, "application/json")
+        features = load_topojson_features(path)
+        if self.faults.inflate > 1:
+            features = [feature for feature in features for _ in range(self.faults.inflate)]
+        body = json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":"))
+        return Response(body.encode("utf-8"), "application/json")
+
+    def response_for(self, path: Optional[Path]) -> Response:
+        key = (path, path.stat().st_mtime_ns) if path is not None else None
+        with self.bodies_lock:
+            response = self.bodies.get(key)
+        if response is None:
+            response = self.build_response(path)
+            with self.bodies_lock:
+                self.bodies.put(key, response, response.size)
+        return response
+
+    def preload(self, countries: Sequence[str] = ()) -> int:
+        """Encode the responses of the given ISO3 codes (default: all) up front."""
+        wanted = {code.upper() for code in countries}
+        loaded = 0
+        for iso2, iso3 in sorted(self.country_codes.items()):
+            if wanted and iso3 not in wanted:
+                continue
+            for path in sorted((self.data_dir / iso3).glob(f"{iso3}_*_areas.topojson")):
+                year = path.name[len(iso3) + 1 : -len("_areas.topojson")]
+                if year.isdigit():
+                    self.response_for(self.recorded_path(iso2, year))
+                    loaded += 1
+        return loaded
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections.add(writer)
+        try:
+            await super().serve_client(reader, writer)
+        finally:
+            self.connections.discard(writer)
+
+    def record(self, status: HTTPStatus, sent: int) -> None:
+        statuses = self.stats["statuses"]
+        statuses[str(status.value)] = statuses.get(str(status.value), 0) + 1
+        self.stats["bytes_sent"] += sent
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, method: str, target: str, headers: Dict[str, str], keep_alive: bool
+    ) -> None:
+        extra = {"Connection": "keep-alive" if keep_alive else "close"}
+
+        def send(status: HTTPStatus, body: bytes = b"", **fields: str) -> None:
+            self.write(writer, status, body, {**extra, **fields}, method)
+            self.record(status, len(body) if method != "HEAD" else 0)
+
+        if method not in ("GET", "HEAD"):
+            send(HTTPStatus.METHOD_NOT_ALLOWED, Allow="GET, HEAD")
+            return
+        url = urlsplit(target)
+        if url.path.rstrip("/") == "/stats":
+            send(HTTPStatus.OK, json.dumps(self.stats, indent=2).encode("utf-8"), **{"Content-Type": "application/json"})
+            return
+        if url.path.rstrip("/") != AREAS_PATH:
+            send(HTTPStatus.NOT_FOUND)
+            return
+
+        self.stats["requests"] += 1
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if self.api_key is not None and params.get("key") != self.api_key:
+            send(HTTPStatus.UNAUTHORIZED)
+            return
+
+        retry_after = self.throttle.take()
+        if retry_after:
+            self.stats["throttled"] += 1
+            send(HTTPStatus.TOO_MANY_REQUESTS, **{"Retry-After": str(max(1, math.ceil(retry_after)))})
+            return
+
+        faults = self.faults
+        delay = faults.latency + self.random.uniform(0, faults.jitter)
+        if faults.tail_rate and self.random.random() < faults.tail_rate:
+            delay += faults.tail_latency
+        if delay > 0:
+            self.stats["injected_latency_s"] = round(self.stats["injected_latency_s"] + delay, 6)
+            await asyncio.sleep(delay)
+
+        if faults.error_rate and self.random.random() < faults.error_rate:
+            self.stats["injected_errors"] += 1
+            send(self.random.choice(faults.error_statuses))
+            return
+
+        recorded = None
+        if params.get("type", RECORDED_TYPE).upper() == RECORDED_TYPE:
+            recorded = self.recorded_path(params.get("country", ""), params.get("year", ""))
+        response = await asyncio.get_running_loop().run_in_executor(None, self.response_for, recorded)
+
+        extra.update({"ETag": response.etag, "Content-Type": response.content_type})
+        if response.etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            send(HTTPStatus.NOT_MODIFIED)
+            return
+        encoding, body = response.encoded(accepted_encodings(headers.get("accept-encoding", "")))
+        if encoding:
+            extra["Content-Encoding"] = {"gz": "gzip"}.get(encoding, encoding)
+        send(HTTPStatus.OK, body)
+
+
+async def start(app: FakeIPCApi, host: str, port: int) -> asyncio.AbstractServer:
+    server = await asyncio.start_server(app.serve_client, host, port, limit=MAX_HEADER_BYTES)
+    bound_port = server.sockets[0].getsockname()[1]
+    app.url = f"http://{host}:{bound_port}{AREAS_PATH}"
+    return server
+
+
+@contextmanager
+def running_api(
+    app: Optional[FakeIPCApi] = None, *, host: str = DEFAULT_HOST, port: int = 0
+) -> Iterator[FakeIPCApi]:
+    """Run ``app`` (default: fault-free over ``data/``) on a background thread.
+
+    ``app.url`` is the endpoint; the port is picked by the OS unless given.
+    """
+    app = app if app is not None else FakeIPCApi()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="fake-ipc-api", daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(start(app, host, port), loop).result()
+    try:
+        yield app
+    finally:
+        async def stop() -> None:
+            server.close()
+            await server.wait_closed()
+            # Close idle keep-alive connections before the loop goes away.
+            for writer in list(app.connections):
+                writer.close()
+            clients = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            await asyncio.gather(*clients, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+async def serve(app: FakeIPCApi, host: str, port: int) -> None:
+    server = await start(app, host, port)
+    print(f"Replaying {app.data_dir} on {app.url}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory with the per-year files (default: data/)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniformly random seconds per response (default: 0)")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Fraction of responses that get --tail-latency on top (default: 0)")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="Seconds added to tail responses (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error (default: 0)")
+    parser.add_argument(
+        "--error-status",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_ERROR_STATUSES),
+        help="Statuses used for injected errors (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--throttle-rps",
+        type=float,
+        default=0.0,
+        help="Requests per second allowed before answering 429 with Retry-After; 0 disables (default: 0)",
+    )
+    parser.add_argument("--burst", type=float, default=None, help="Token bucket capacity (default: max(1, --throttle-rps))")
+    parser.add_argument("--inflate", type=int, default=1, help="Repeat every feature N times in responses (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for injected latency and errors (default: 0)")
+    parser.add_argument("--api-key", default=None, help="Answer 401 unless requests carry this key (default: accept any)")
+    parser.add_argument(
+        "--cache-mb",
+        type=float,
+        default=DEFAULT_CACHE_MB,
+        help="Memory budget for encoded responses (default: %(default)g)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        faults = FaultSettings(
+            latency=args.latency,
+            jitter=args.jitter,
+            tail_rate=args.tail_rate,
+            tail_latency=args.tail_latency,
+            error_rate=args.error_rate,
+            error_statuses=args.error_status,
+            throttle_rps=args.throttle_rps,
+            burst=args.burst,
+            inflate=args.inflate,
+            seed=args.seed,
+        )
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if not args.data_dir.is_dir():
+        print(f"Data directory not found: {args.data_dir}", file=sys.stderr)
+        return 1
+
+    app = FakeIPCApi(args.data_dir, faults, cache_bytes=int(args.cache_mb * 1024 * 1024), api_key=args.api_key)
+    try:
+        asyncio.run(serve(app, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(app.stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Deduplication keys shared by the downloader and the combiner.
+
+A key strategy is an ordered fallback chain of key kinds. Each feature gets
+the key of the first kind it has a value for:
+
+* ``id``: IPC area id, scoped by ISO3 (``id::{iso3}::{id}``)
+* ``admin``: administrative code property, scoped by ISO3
+  (``admin::{iso3}::{code}``)
+* ``title``: normalised area title, scoped by ISO3 (``title::{iso3}::{title}``)
+* ``geometry``: canonical geometry fingerprint (``geometry::{fingerprint}``)
+
+Features matched by no kind are keyed by a digest of their serialised form.
+Keys for a whole feature list are computed one kind at a time, so geometry
+fingerprints are batched and only computed for features still unkeyed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    from .geometry_fingerprint import DEFAULT_PRECISION, fingerprint_features
+except ImportError:  # pragma: no cover - script executed directly
+    from geometry_fingerprint import DEFAULT_PRECISION, fingerprint_features
+
+KEY_KINDS = ("id", "admin", "title", "geometry")
+DEFAULT_KEY_STRATEGY: Tuple[str, ...] = ("id", "title", "geometry")
+ADMIN_CODE_PROPERTIES = ("admin_code", "pcode")
+
+
+def parse_key_strategy(value: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    """Parse ``"id,title,geometry"`` (or a sequence) into a validated chain."""
+    kinds = value.split(",") if isinstance(value, str) else list(value)
+    strategy: List[str] = []
+    for kind in (item.strip().lower() for item in kinds):
+        if not kind:
+            continue
+        if kind not in KEY_KINDS:
+            raise ValueError(f"Unknown key kind: {kind} (expected one of {', '.join(KEY_KINDS)})")
+        if kind not in strategy:
+            strategy.append(kind)
+    if not strategy:
+        raise ValueError("Key strategy must name at least one key kind")
+    return tuple(strategy)
+
+
+def normalize_title(title: Optional[str]) -> str:
+    if not title:
+        return ""
+    return " ".join(title.split()).strip().lower()
+
+
+def _admin_code(props: Dict[str, Any]) -> str:
+    for name in ADMIN_CODE_PROPERTIES:
+        value = props.get(name)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return ""
+
+
+def _fallback_key(feature: Dict[str, Any]) -> str:
+    digest = hashlib.sha1(json.dumps(feature, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"feature::{digest}"
+
+
+def feature_keys(
+    features: Sequence[Dict[str, Any]],
+    strategy: Sequence[str] = DEFAULT_KEY_STRATEGY,
+    *,
+    fingerprints: Optional[Sequence[str]] = None,
+    precision: int = DEFAULT_PRECISION,
+) -> List[str]:
+    """Keys for ``features`` under ``strategy``, in input order.
+
+    ``fingerprints`` (one per feature, e.g. from a ``FingerprintIndex``) are
+    used for the geometry kind; otherwise they are computed in one batch for
+    the features that reach it.
+    """
+    keys: List[Optional[str]] = [None] * len(features)
+    props = [feature.get("properties") or {} for feature in features]
+    pending = list(range(len(features)))
+
+    for kind in strategy:
+        if not pending:
+            break
+        if kind == "geometry":
+            indices = [index for index in pending if features[index].get("geometry")]
+            if fingerprints is None:
+                values = fingerprint_features([features[index] for index in indices], precision)
+            else:
+                values = [fingerprints[index] for index in indices]
+            for index, fingerprint in zip(indices, values):
+                keys[index] = f"geometry::{fingerprint}"
+        else:
+            for index in pending:
+                record = props[index]
+                if kind == "id":
+                    value = "" if record.get("id") is None else str(record["id"]).strip()
+                elif kind == "admin":
+                    value = _admin_code(record)
+                else:
+                    value = normalize_title(record.get("title"))
+                if value:
+                    iso3 = (record.get("iso3") or "").strip().lower()
+                    keys[index] = f"{kind}::{iso3}::{value}"
+        pending = [index for index in pending if keys[index] is None]
+
+    for index in pending:
+        keys[index] = _fallback_key(features[index])
+    return keys  # type: ignore[return-value]
+
+
+def feature_key(
+    feature: Dict[str, Any],
+    strategy: Sequence[str] = DEFAULT_KEY_STRATEGY,
+    *,
+    fingerprint: Optional[str] = None,
+    precision: int = DEFAULT_PRECISION,
+) -> str:
+    return feature_keys(
+        [feature],
+        strategy,
+        fingerprints=None if fingerprint is None else [fingerprint],
+        precision=precision,
+    )[0]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Incremental GeoJSON ``FeatureCollection`` parsing.
+
+``iter_features`` consumes an iterable of byte chunks (a streamed HTTP body or
+a file read in blocks) and yields each member of the top-level ``features``
+array as soon as it has been received, so only one feature and the unread
+tail of the current chunk are held in memory at a time.
+``iter_polygon_features`` keeps unique Polygon/MultiPolygon features,
+comparing geometries by their canonical fingerprint (see
+``geometry_fingerprint``) instead of their serialised form; features with an
+IPC id are only duplicates of features with the same id.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+try:
+    from .geometry_fingerprint import DEFAULT_PRECISION, geometry_fingerprint
+except ImportError:  # pragma: no cover - script executed directly
+    from geometry_fingerprint import DEFAULT_PRECISION, geometry_fingerprint
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+POLYGON_TYPES = {"Polygon", "MultiPolygon"}
+WHITESPACE = " \t\n\r"
+
+_decoder = json.JSONDecoder()
+
+
+def iter_file_chunks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        yield from iter(lambda: handle.read(chunk_size), b"")
+
+
+class _ChunkReader:
+    """Text buffer over decoded chunks with amortised trimming."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        """Append the next chunk; returns False once the stream is finished."""
+        if self.exhausted:
+            return False
+        if self.pos > len(self.buffer) // 2:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self.decoder.decode(b"", final=True)
+        self.exhausted = True
+        return False
+
+    def peek(self) -> Optional[str]:
+        """Next non-whitespace character (not consumed), or None at EOF."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expected {char!r}", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more chunks as needed."""
+        self.peek()
+        retry_at = 0
+        while True:
+            if len(self.buffer) >= retry_at:
+                try:
+                    value, end = _decoder.raw_decode(self.buffer, self.pos)
+                except json.JSONDecodeError:
+                    # Incomplete value: wait until the unread part has doubled
+                    # before retrying so large values are decoded in O(n).
+                    retry_at = len(self.buffer) + max(len(self.buffer) - self.pos, DEFAULT_CHUNK_SIZE)
+                else:
+                    if end < len(self.buffer) or self.exhausted or not self._is_number_at(self.pos):
+                        self.pos = end
+                        return value
+            if not self.fill():
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                self.pos = end
+                return value
+
+    def _is_number_at(self, index: int) -> bool:
+        # A number at the very end of the buffer may continue in the next chunk.
+        return self.buffer[index] in "-0123456789"
+
+
+def iter_features(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Yield the members of a streamed document's top-level ``features`` array.
+
+    Other top-level members are parsed and discarded. Raises
+    ``json.JSONDecodeError`` for malformed or truncated input.
+    """
+    reader = _ChunkReader(chunks)
+    if reader.peek() is None:
+        raise json.JSONDecodeError("Empty document", "", 0)
+    if reader.peek() != "{":
+        reader.value()
+        return
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "features" and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    feature = reader.value()
+                    if isinstance(feature, dict):
+                        yield feature
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                        continue
+                    reader.expect("]")
+                    break
+        else:
+            reader.value()
+
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        return
+
+
+def iter_polygon_features(
+    features: Iterable[Dict[str, Any]],
+    seen: Optional[Set[Tuple[Optional[str], str]]] = None,
+    *,
+    precision: int = DEFAULT_PRECISION,
+) -> Iterator[Dict[str, Any]]:
+    """Yield features with a non-empty polygonal geometry not seen before.
+
+    Geometries equal at ``precision`` decimal places count as duplicates when
+    the features share their ``id`` property or both have none: different
+    areas are published with identical boundaries under different ids.
+    """
+    seen = set() if seen is None else seen
+    for feature in features:
+        geometry = feature.get("geometry") if isinstance(feature, dict) else None
+        if not isinstance(geometry, dict) or geometry.get("type") not in POLYGON_TYPES:
+            continue
+        if not geometry.get("coordinates"):
+            continue
+        area_id = (feature.get("properties") or {}).get("id")
+        key = (None if area_id is None else str(area_id), geometry_fingerprint(geometry, precision))
+        if key in seen:
+            continue
+        seen.add(key)
+        yield feature
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Pack Polygon/MultiPolygon coordinates into contiguous NumPy arrays.
+
+Every geometry is stored as a multipolygon in the layout used by
+``shapely.to_ragged_array``/``from_ragged_array``: one ``(N, 2)`` float64
+coordinate buffer plus ring, part and geometry offset arrays. Bulk operations
+(rounding, simplification, fingerprinting) then run over whole collections
+instead of walking nested Python lists point by point.
+"""
+
+from __future__ import annotations
+
+import gc
+from contextlib import contextmanager
+from itertools import chain
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+try:
+    import shapely
+    from shapely import GeometryType
+except ImportError:  # pragma: no cover - shapely ships with topojson
+    shapely = None  # type: ignore[assignment]
+    GeometryType = None  # type: ignore[assignment]
+
+POLYGON_TYPES = {"Polygon", "MultiPolygon"}
+
+
+class PackedPolygons(NamedTuple):
+    coords: np.ndarray
+    ring_offsets: np.ndarray
+    part_offsets: np.ndarray
+    geometry_offsets: np.ndarray
+    multi: np.ndarray
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Suspend the cyclic GC while building or tearing down many small lists.
+
+    Packing and unpacking create hundreds of thousands of point lists that can
+    never form cycles; letting the collector rescan them on every allocation
+    threshold costs more than the conversion itself.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def is_packable(geometry: Optional[Dict[str, Any]]) -> bool:
+    """True for 2D polygonal geometries whose rings are valid LinearRings."""
+    if not isinstance(geometry, dict) or geometry.get("type") not in POLYGON_TYPES:
+        return False
+    coordinates = geometry.get("coordinates")
+    if not coordinates:
+        return False
+    polygons = coordinates if geometry["type"] == "MultiPolygon" else [coordinates]
+    for polygon in polygons:
+        if not polygon:
+            return False
+        for ring in polygon:
+            if len(ring) < 4 or any(len(point) != 2 for point in ring):
+                return False
+    return True
+
+
+def pack_polygons(geometries: Sequence[Dict[str, Any]]) -> PackedPolygons:
+    """Pack polygonal GeoJSON geometries (see ``is_packable``) into arrays."""
+    rings: List[Sequence[Sequence[float]]] = []
+    ring_offsets = [0]
+    part_offsets = [0]
+    geometry_offsets = [0]
+    multi = []
+
+    for geometry in geometries:
+        is_multi = geometry["type"] == "MultiPolygon"
+        polygons = geometry["coordinates"] if is_multi else [geometry["coordinates"]]
+        for polygon in polygons:
+            for ring in polygon:
+                rings.append(ring)
+                ring_offsets.append(ring_offsets[-1] + len(ring))
+            part_offsets.append(part_offsets[-1] + len(polygon))
+        geometry_offsets.append(geometry_offsets[-1] + len(polygons))
+        multi.append(is_multi)
+
+    coords = np.fromiter(
+        chain.from_iterable(chain.from_iterable(rings)),
+        dtype=np.float64,
+        count=2 * ring_offsets[-1],
+    ).reshape(-1, 2)
+    return PackedPolygons(
+        coords,
+        np.asarray(ring_offsets, dtype=np.int64),
+        np.asarray(part_offsets, dtype=np.int64),
+        np.asarray(geometry_offsets, dtype=np.int64),
+        np.asarray(multi, dtype=bool),
+    )
+
+
+def unpack_polygons(packed: PackedPolygons) -> List[Dict[str, Any]]:
+    """Rebuild GeoJSON geometry dicts, restoring each original geometry type."""
+    with gc_paused():
+        points = packed.coords.tolist()
+        ring_offsets = packed.ring_offsets.tolist()
+        rings = [points[start:end] for start, end in zip(ring_offsets, ring_offsets[1:])]
+        part_offsets = packed.part_offsets.tolist()
+        polygons = [rings[start:end] for start, end in zip(part_offsets, part_offsets[1:])]
+
+        geometries: List[Dict[str, Any]] = []
+        geometry_offsets = packed.geometry_offsets.tolist()
+        for index, (start, end) in enumerate(zip(geometry_offsets, geometry_offsets[1:])):
+            if packed.multi[index]:
+                geometries.append({"type": "MultiPolygon", "coordinates": polygons[start:end]})
+            else:
+                geometries.append({"type": "Polygon", "coordinates": polygons[start]})
+    return geometries
+
+
+def round_coords(coords: np.ndarray, digits: int) -> np.ndarray:
+    """Round like Python's ``round`` (which is exact) at NumPy speed.
+
+    ``np.round`` scales, rounds and unscales in floating point, so values close
+    to a rounding tie can land on the other side of it. Those few values are
+    re-rounded with the builtin to keep output identical to the list path.
+    """
+    rounded = np.round(coords, digits)
+    scaled = coords * (10.0**digits)
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, digits) for value in coords[near_tie].tolist()]
+    return rounded
+
+
+def round_packed(packed: PackedPolygons, digits: int) -> PackedPolygons:
+    return packed._replace(coords=round_coords(packed.coords, digits))
+
+
+def to_shapely(packed: PackedPolygons) -> np.ndarray:
+    """Build an array of Shapely MultiPolygons from packed coordinates."""
+    if shapely is None:
+        raise RuntimeError("shapely is required for geometry operations")
+    return shapely.from_ragged_array(
+        GeometryType.MULTIPOLYGON,
+        packed.coords,
+        (packed.ring_offsets, packed.part_offsets, packed.geometry_offsets),
+    )
+
+
+def from_shapely(geometries: np.ndarray, multi: np.ndarray) -> PackedPolygons:
+    """Pack non-empty Shapely (Multi)Polygons, keeping the original type flags."""
+    if shapely is None:
+        raise RuntimeError("shapely is required for geometry operations")
+    geometry_type, coords, offsets = shapely.to_ragged_array(geometries)
+    if geometry_type == GeometryType.POLYGON:
+        # Every geometry is a single polygon: one part per geometry.
+        ring_offsets, part_offsets = offsets
+        geometry_offsets = np.arange(len(part_offsets), dtype=np.int64)
+    else:
+        ring_offsets, part_offsets, geometry_offsets = offsets
+    return PackedPolygons(
+        np.ascontiguousarray(coords, dtype=np.float64),
+        ring_offsets.astype(np.int64),
+        part_offsets.astype(np.int64),
+        geometry_offsets.astype(np.int64),
+        np.asarray(multi, dtype=bool),
+    )
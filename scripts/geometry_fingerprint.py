@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Canonical geometry fingerprints shared by every deduplication path.
+
+A fingerprint identifies a polygonal geometry independently of how it was
+serialised: coordinates are snapped to the configured precision, repeated
+and closing points are dropped, every ring is rotated to start at its
+smallest vertex and oriented counter-clockwise, holes and polygon parts are
+sorted, and a Polygon matches a single-part MultiPolygon. Geometries that
+only differ by float noise between assessment years therefore share a
+fingerprint.
+
+``FingerprintIndex`` persists fingerprints per TopoJSON file (validated by
+the file's SHA-256) so unchanged files are never re-fingerprinted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .build_manifest import file_sha256
+    from .geometry_arrays import is_packable, pack_polygons
+except ImportError:  # pragma: no cover - script executed directly
+    from build_manifest import file_sha256
+    from geometry_arrays import is_packable, pack_polygons
+
+DEFAULT_PRECISION = 4
+INDEX_FILENAME = "geometry_fingerprints.json"
+INDEX_VERSION = 1
+
+
+def _canonical_ring(ring: np.ndarray) -> bytes:
+    keep = np.ones(len(ring), dtype=bool)
+    keep[1:] = np.any(ring[1:] != ring[:-1], axis=1)
+    ring = ring[keep]
+    if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    if len(ring) < 3:
+        return ring.tobytes()
+
+    x = ring[:, 0].astype(np.float64)
+    y = ring[:, 1].astype(np.float64)
+    area = np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)
+    candidates = [ring] if area > 0 else [ring[::-1]] if area < 0 else [ring, ring[::-1]]
+
+    rotated = []
+    for candidate in candidates:
+        start = int(np.lexsort((candidate[:, 1], candidate[:, 0]))[0])
+        rotated.append(np.roll(candidate, -start, axis=0).tobytes())
+    return min(rotated)
+
+
+def _fallback_fingerprint(geometry: Optional[Dict[str, Any]]) -> str:
+    payload = json.dumps(
+        [geometry.get("type"), geometry.get("coordinates")] if isinstance(geometry, dict) else geometry
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def fingerprint_geometries(
+    geometries: Sequence[Optional[Dict[str, Any]]],
+    precision: int = DEFAULT_PRECISION,
+) -> List[str]:
+    """Fingerprint many geometries from one packed coordinate array.
+
+    Non-polygonal or malformed geometries fall back to a digest of their
+    serialised type and coordinates.
+    """
+    fingerprints: List[Optional[str]] = [None] * len(geometries)
+    batch: List[int] = []
+    for index, geometry in enumerate(geometries):
+        if is_packable(geometry):
+            batch.append(index)
+        else:
+            fingerprints[index] = _fallback_fingerprint(geometry)
+    if not batch:
+        return fingerprints  # type: ignore[return-value]
+
+    packed = pack_polygons([geometries[index] for index in batch])
+    snapped = np.rint(packed.coords * (10.0**precision)).astype(np.int64)
+    ring_offsets = packed.ring_offsets.tolist()
+    part_offsets = packed.part_offsets.tolist()
+    geometry_offsets = packed.geometry_offsets.tolist()
+
+    for position, index in enumerate(batch):
+        parts = []
+        for part in range(geometry_offsets[position], geometry_offsets[position + 1]):
+            rings = [
+                _canonical_ring(snapped[ring_offsets[ring]:ring_offsets[ring + 1]])
+                for ring in range(part_offsets[part], part_offsets[part + 1])
+            ]
+            parts.append(b"R".join([rings[0], *sorted(rings[1:])]))
+        digest = hashlib.blake2b(b"P".join(sorted(parts)), digest_size=16)
+        fingerprints[index] = digest.hexdigest()
+    return fingerprints  # type: ignore[return-value]
+
+
+def geometry_fingerprint(geometry: Optional[Dict[str, Any]], precision: int = DEFAULT_PRECISION) -> str:
+    return fingerprint_geometries([geometry], precision)[0]
+
+
+def fingerprint_features(features: Sequence[Dict[str, Any]], precision: int = DEFAULT_PRECISION) -> List[str]:
+    return fingerprint_geometries([feature.get("geometry") for feature in features], precision)
+
+
+class FingerprintIndex:
+    """Per-file fingerprint cache persisted next to the data tree.
+
+    Entries are keyed by path and only reused while the file's SHA-256 still
+    matches. A different precision discards the whole index. ``updates``
+    collects entries computed since the last ``take_updates`` so results from
+    worker processes can be merged back into the parent's index.
+    """
+
+    def __init__(self, path: Path, precision: int = DEFAULT_PRECISION, base: Optional[Path] = None):
+        self.path = Path(path)
+        self.precision = int(precision)
+        self.base = Path(base) if base is not None else self.path.parent
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.updates: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"reused": 0, "computed": 0}
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if (
+            isinstance(payload, dict)
+            and payload.get("version") == INDEX_VERSION
+            and payload.get("precision") == self.precision
+            and isinstance(payload.get("files"), dict)
+        ):
+            self.files = payload["files"]
+
+    def _name(self, path: Path) -> str:
+        try:
+            return Path(path).resolve().relative_to(self.base.resolve()).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+
+    def cached(self, path: Path, count: int, *, digest: Optional[str] = None) -> Optional[List[str]]:
+        """Stored fingerprints of the ``count`` features in ``path``, if current."""
+        entry = self.files.get(self._name(path))
+        digest = digest or file_sha256(path)
+        if entry and entry.get("sha256") == digest and len(entry.get("fingerprints") or []) == count:
+            self.stats["reused"] += 1
+            return list(entry["fingerprints"])
+        return None
+
+    def fingerprints(self, path: Path, features: Sequence[Dict[str, Any]]) -> List[str]:
+        """Fingerprints of ``features`` as loaded from ``path``."""
+        digest = file_sha256(path)
+        cached = self.cached(path, len(features), digest=digest)
+        if cached is not None:
+            return cached
+
+        fingerprints = fingerprint_features(features, self.precision)
+        self.remember(path, fingerprints, digest=digest)
+        self.stats["computed"] += 1
+        return fingerprints
+
+    def remember(self, path: Path, fingerprints: Sequence[str], *, digest: Optional[str] = None) -> None:
+        entry = {"sha256": digest or file_sha256(path), "fingerprints": list(fingerprints)}
+        name = self._name(path)
+        self.files[name] = entry
+        self.updates[name] = entry
+
+    def take_updates(self) -> Dict[str, Dict[str, Any]]:
+        updates, self.updates = self.updates, {}
+        return updates
+
+    def apply_updates(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        self.files.update(updates)
+
+    def save(self) -> None:
+        live = {name: entry for name, entry in self.files.items() if (self.base / name).exists()}
+        payload = {"version": INDEX_VERSION, "precision": self.precision, "files": dict(sorted(live.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Export TopoJSON datasets as GeoParquet.
+
+``export_geoparquet`` writes ``X.topojson`` as ``X.parquet``: one row per
+feature with its properties as columns, the geometry as WKB and a
+``bbox`` struct column declared as the GeoParquet 1.1 bbox covering. Rows are
+written in Sort-Tile-Recursive order (see ``scripts/spatial_index.py``) so
+each row group covers a compact area and readers can skip row groups from
+their ``bbox`` statistics instead of loading the whole file.
+
+``pyarrow`` is optional: without it exports are skipped with a warning.
+
+Usage example:
+
+    python scripts/geoparquet_export.py data/global_areas.topojson
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+try:
+    import shapely
+except ImportError:  # pragma: no cover - shapely ships with topojson
+    shapely = None  # type: ignore[assignment]
+
+try:
+    from .spatial_index import build_tree, default_targets, feature_geometries
+    from .topojson_io import load_topojson_features
+except ImportError:  # pragma: no cover - script executed directly
+    from spatial_index import build_tree, default_targets, feature_geometries
+    from topojson_io import load_topojson_features
+
+GEOPARQUET_SUFFIX = ".parquet"
+GEOPARQUET_VERSION = "1.1.0"
+DEFAULT_ROW_GROUP_SIZE = 1024
+
+_warned_missing_pyarrow = False
+
+
+def geoparquet_available() -> bool:
+    """True when pyarrow is installed; warns once otherwise."""
+    global _warned_missing_pyarrow
+    if pa is not None:
+        return True
+    if not _warned_missing_pyarrow:
+        print("Warning: pyarrow is not installed, skipping GeoParquet export.", file=sys.stderr)
+        _warned_missing_pyarrow = True
+    return False
+
+
+def geoparquet_path(path: Path) -> Path:
+    return path.with_suffix(GEOPARQUET_SUFFIX)
+
+
+def _property_column(values: List[Any]) -> Any:
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def features_table(features: Sequence[Dict[str, Any]], row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> Any:
+    """Arrow table with GeoParquet metadata for ``features``.
+
+    Rows follow the STR leaf order for tiles of ``row_group_size`` features.
+    """
+    geometries = feature_geometries(features)
+    # Packed geometries come back as MultiPolygons; restore single polygons.
+    single = np.array([(feature.get("geometry") or {}).get("type") == "Polygon" for feature in features], dtype=bool)
+    single &= shapely.get_type_id(geometries) == shapely.GeometryType.MULTIPOLYGON
+    geometries[single] = shapely.get_geometry(geometries[single], 0)
+    bounds = shapely.bounds(geometries)
+    order, _ = build_tree(bounds, max(row_group_size, 2))
+    geometries, bounds = geometries[order], bounds[order]
+    properties = [features[index].get("properties") or {} for index in order]
+
+    names: List[str] = []
+    for record in properties:
+        names.extend(name for name in record if name not in names)
+    columns = {name: _property_column([record.get(name) for record in properties]) for name in names}
+    if "geometry" in columns or "bbox" in columns:
+        raise ValueError("Feature properties must not be named 'geometry' or 'bbox'")
+
+    present = geometries != None  # noqa: E711
+    wkb = np.full(len(geometries), None, dtype=object)
+    wkb[present] = shapely.to_wkb(geometries[present])
+    columns["geometry"] = pa.array(wkb, type=pa.binary())
+    columns["bbox"] = pa.StructArray.from_arrays(
+        [pa.array(bounds[:, axis], mask=~present) for axis in range(4)],
+        names=["xmin", "ymin", "xmax", "ymax"],
+    )
+
+    geometry_types = sorted({geometry.geom_type for geometry in geometries[present]})
+    total = shapely.total_bounds(geometries[present]) if present.any() else [np.nan] * 4
+    metadata = {
+        "version": GEOPARQUET_VERSION,
+        "primary_column": "geometry",
+        "columns": {
+            "geometry": {
+                "encoding": "WKB",
+                "geometry_types": geometry_types,
+                "bbox": [float(value) for value in total],
+                "covering": {
+                    "bbox": {axis: ["bbox", axis] for axis in ("xmin", "ymin", "xmax", "ymax")}
+                },
+            }
+        },
+    }
+    table = pa.table(columns)
+    return table.replace_schema_metadata({b"geo": json.dumps(metadata).encode("utf-8")})
+
+
+def export_geoparquet(
+    path: Path,
+    output: Optional[Path] = None,
+    *,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> Path:
+    """Write (or keep an up-to-date) GeoParquet copy of ``path``.
+
+    An output whose modification time is not older than its source is
+    assumed current.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is required for GeoParquet export")
+    path = Path(path)
+    target = Path(output) if output is not None else geoparquet_path(path)
+    if target.exists() and target.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return target
+
+    table = features_table(load_topojson_features(path), row_group_size)
+    tmp_path = target.with_name(target.name + ".tmp")
+    pq.write_table(
+        table,
+        tmp_path,
+        row_group_size=row_group_size,
+        compression="zstd",
+        write_statistics=True,
+    )
+    os.replace(tmp_path, target)
+    return target
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="TopoJSON files to export (default: every combined file and the global file under data/)",
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=DEFAULT_ROW_GROUP_SIZE,
+        help="Features per Parquet row group (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    if pa is None:
+        print("GeoParquet export requires pyarrow: pip install pyarrow", file=sys.stderr)
+        return 1
+
+    paths = args.paths or default_targets()
+    if not paths:
+        print("No TopoJSON files to export.", file=sys.stderr)
+        return 1
+
+    for path in paths:
+        target = export_geoparquet(path, row_group_size=args.row_group_size)
+        print(f"Exported {path} -> {target.name} ({target.stat().st_size:,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
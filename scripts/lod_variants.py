@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Level-of-detail variants of combined and global TopoJSON files.
+
+``write_lod_variants`` turns ``X_combined_areas.topojson`` into a ladder of
+lighter copies such as ``X_combined_areas.lod-medium.topojson``. The source is
+parsed once and every level simplifies the shared arcs of the previous one
+(``simplify_topology_arcs``), so each border is simplified once per level,
+neighbouring areas stay watertight and no topology is rebuilt. Tolerances are
+in degrees and must increase along the ladder; the source itself is the
+``full`` level.
+
+Every variant records the settings it was built with (source SHA-256, the
+ladder up to its level, precision and quantization) in a top-level ``lod``
+member; variants whose recorded settings match the current ones are only
+described, anything else rebuilds the whole ladder.
+
+Usage example:
+
+    python scripts/lod_variants.py data/global_areas.topojson --ladder medium=0.001,low=0.005,overview=0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .compression import describe_file
+    from .simplify_ipc_global_areas import simplify_topology_arcs
+    from .spatial_index import default_targets
+    from .topojson_io import quantize_topology
+except ImportError:  # pragma: no cover - script executed directly
+    from compression import describe_file
+    from simplify_ipc_global_areas import simplify_topology_arcs
+    from spatial_index import default_targets
+    from topojson_io import quantize_topology
+
+LOD_MARKER = ".lod-"
+FULL_LEVEL = "full"
+DEFAULT_LOD_LADDER: Tuple[Tuple[str, float], ...] = (
+    ("medium", 0.001),
+    ("low", 0.005),
+    ("overview", 0.02),
+)
+
+_NAME_PATTERN = re.compile(r"^[a-z0-9_]+$")
+
+Ladder = Sequence[Tuple[str, float]]
+
+
+def parse_lod_ladder(value: Any) -> Tuple[Tuple[str, float], ...]:
+    """Parse ``"medium=0.001,low=0.005"`` (or pairs) into a validated ladder."""
+    if isinstance(value, str):
+        pairs = []
+        for item in value.split(","):
+            name, separator, tolerance = item.strip().partition("=")
+            if not separator:
+                raise argparse.ArgumentTypeError(f"LOD level must be NAME=TOLERANCE: {item!r}")
+            try:
+                pairs.append((name.strip().lower(), float(tolerance)))
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"Invalid LOD tolerance: {item!r}") from None
+    else:
+        pairs = [(str(name), float(tolerance)) for name, tolerance in value]
+
+    names = [name for name, _ in pairs]
+    tolerances = [tolerance for _, tolerance in pairs]
+    if not pairs:
+        raise argparse.ArgumentTypeError("At least one LOD level is required")
+    if any(not _NAME_PATTERN.match(name) or name == FULL_LEVEL for name in names) or len(set(names)) != len(names):
+        raise argparse.ArgumentTypeError(
+            f"LOD names must be unique, lowercase [a-z0-9_] and not {FULL_LEVEL!r}: {', '.join(names)}"
+        )
+    if tolerances[0] <= 0 or any(later <= earlier for earlier, later in zip(tolerances, tolerances[1:])):
+        raise argparse.ArgumentTypeError("LOD tolerances must be positive and strictly increasing")
+    return tuple(pairs)
+
+
+def lod_path(path: Path, name: str) -> Path:
+    """``X.topojson`` -> ``X.lod-{name}.topojson``."""
+    return path.with_name(f"{path.stem}{LOD_MARKER}{name}{path.suffix}")
+
+
+def is_lod_path(path: Path) -> bool:
+    return LOD_MARKER in path.name
+
+
+def count_vertices(topology: Dict[str, Any]) -> int:
+    return sum(len(arc) for arc in topology.get("arcs") or [])
+
+
+def _load_variant(target: Path, settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The stored variant at ``target`` if it was built with ``settings``."""
+    try:
+        with open(target, "r", encoding="utf-8") as handle:
+            variant = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return variant if variant.get("lod") == settings else None
+
+
+def _write(target: Path, topology: Dict[str, Any]) -> None:
+    tmp_path = target.with_name(target.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(topology, handle, separators=(",", ":"))
+    os.replace(tmp_path, target)
+
+
+def write_lod_variants(
+    path: Path,
+    ladder: Ladder = DEFAULT_LOD_LADDER,
+    *,
+    precision: int = 4,
+    quantize: Optional[int] = None,
+    force: bool = False,
+) -> List[Dict[str, Any]]:
+    """Write every level of ``ladder`` for ``path`` and describe all levels.
+
+    Returns one dict per level, ``full`` (the source) first, with ``name``,
+    ``file_name``, ``tolerance``, ``vertices``, ``bytes`` and ``sha256``.
+    """
+    path = Path(path)
+    targets = [(name, tolerance, lod_path(path, name)) for name, tolerance in ladder]
+
+    payload = path.read_bytes()
+    topology = json.loads(payload)
+    source_sha256 = hashlib.sha256(payload).hexdigest()
+    # Each level simplifies the previous one, so it depends on the ladder up to itself.
+    settings = [
+        {
+            "source_sha256": source_sha256,
+            "ladder": [[name, tolerance] for name, tolerance, _ in targets[: position + 1]],
+            "precision": precision,
+            "quantize": quantize,
+        }
+        for position in range(len(targets))
+    ]
+    stored = [
+        None if force else _load_variant(target, level_settings)
+        for (_, _, target), level_settings in zip(targets, settings)
+    ]
+    stale = any(variant is None for variant in stored)
+
+    levels = [{"name": FULL_LEVEL, "file_name": path.name, "tolerance": 0.0, "vertices": count_vertices(topology)}]
+
+    current = topology
+    for (name, tolerance, target), level_settings, variant in zip(targets, settings, stored):
+        if stale:
+            current = simplify_topology_arcs(current, precision=precision, simplify_tolerance=tolerance)
+            output = quantize_topology(current, quantize) if quantize else current
+            _write(target, {**output, "lod": level_settings})
+            vertices = count_vertices(current)
+        else:
+            vertices = count_vertices(variant)
+        levels.append({"name": name, "file_name": target.name, "tolerance": tolerance, "vertices": vertices})
+
+    for level, level_path in zip(levels, [path] + [target for _, _, target in targets]):
+        level.update(describe_file(level_path))
+    return levels
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="TopoJSON files (default: every combined file and the global file under data/)",
+    )
+    parser.add_argument(
+        "--ladder",
+        type=parse_lod_ladder,
+        default=DEFAULT_LOD_LADDER,
+        help="Comma-separated NAME=TOLERANCE levels in degrees (default: medium=0.001,low=0.005,overview=0.02)",
+    )
+    parser.add_argument("--precision", type=int, default=4, help="Decimal places kept in every level (default: 4)")
+    parser.add_argument("--quantize", type=int, default=None, help="Write quantized arcs on an N x N grid")
+    parser.add_argument("--force", action="store_true", help="Rewrite variants even when their recorded settings match")
+    args = parser.parse_args(argv)
+
+    paths = [path for path in (args.paths or default_targets()) if not is_lod_path(path)]
+    if not paths:
+        print("No TopoJSON files to process.", file=sys.stderr)
+        return 1
+
+    for path in paths:
+        levels = write_lod_variants(
+            path, args.ladder, precision=args.precision, quantize=args.quantize, force=args.force
+        )
+        print(path)
+        for level in levels:
+            print(
+                f"  {level['name']:>10}: tolerance {level['tolerance']:g}, "
+                f"{level['vertices']:,} vertices, {level['bytes']:,} bytes"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
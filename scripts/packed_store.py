@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""Memory-mapped packed store of every per-year and combined IPC area.
+
+``build_store`` converts the TopoJSON files under ``data/`` into one directory
+of ``.npy`` arrays in the ``geometry_arrays`` layout:
+
+* ``coords.npy``: ``(N, 2)`` float64 coordinates, or int32 grid coordinates
+  when built with a precision (see ``transform`` in ``store.json``)
+* ``ring_offsets.npy``, ``part_offsets.npy``, ``geometry_offsets.npy``,
+  ``multi.npy``: the packed polygon structure, one geometry per feature
+* ``bboxes.npy``: ``(F, 4)`` float64 feature bounding boxes
+* ``properties.jsonl`` + ``property_offsets.npy``: one JSON object per feature
+* ``keys.npy`` + ``key_rows.npy``: sorted ``ISO3|VARIANT|YEAR|ID`` byte keys
+  (``VARIANT`` is ``year`` or ``combined``) and the feature row each one
+  points to
+
+``PackedStore`` opens the arrays with ``numpy.memmap`` (nothing is parsed
+up front), finds a feature by binary search on the keys and only touches the
+pages of the requested feature, so worker processes share the page cache.
+Per-year and combined copies of a feature are both kept, since the combined
+file holds the rounded and simplified geometry; within one variant the first
+file wins.
+
+Usage example:
+
+    python scripts/packed_store.py --precision 6
+    python scripts/packed_store.py --lookup ZMB 2020 19345669 --variant combined
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .build_manifest import file_sha256
+    from .geometry_arrays import PackedPolygons, is_packable, pack_polygons, unpack_polygons
+    from .topojson_io import load_topojson_features
+except ImportError:  # pragma: no cover - script executed directly
+    from build_manifest import file_sha256
+    from geometry_arrays import PackedPolygons, is_packable, pack_polygons, unpack_polygons
+    from topojson_io import load_topojson_features
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_ROOT / "data"
+DEFAULT_STORE_DIR = REPO_ROOT / "build" / "ipc_store"
+STORE_VERSION = 2
+METADATA_FILENAME = "store.json"
+VARIANTS = ("year", "combined")
+
+_INT32_LIMIT = 2**31 - 1
+
+
+def store_key(iso3: Optional[str], year: Optional[int], area_id: Any, variant: str = "year") -> bytes:
+    return (
+        f"{(iso3 or '').upper()}|{variant}|{'' if year is None else year}|{'' if area_id is None else area_id}"
+    ).encode("utf-8")
+
+
+def file_variant(path: Path) -> str:
+    """``combined`` for ``X_combined_areas.topojson``, ``year`` otherwise."""
+    return "combined" if path.name.endswith("_combined_areas.topojson") else "year"
+
+
+def source_files(data_dir: Path = DATA_DIR) -> List[Path]:
+    """Per-year files, then the combined file, of every country directory."""
+    paths: List[Path] = []
+    for country_dir in sorted(path for path in data_dir.iterdir() if path.is_dir()):
+        iso3 = country_dir.name
+        combined = country_dir / f"{iso3}_combined_areas.topojson"
+        paths.extend(
+            path for path in sorted(country_dir.glob(f"{iso3}_*_areas.topojson")) if path != combined
+        )
+        if combined.exists():
+            paths.append(combined)
+    return paths
+
+
+class _ArrayWriter:
+    """Append-only raw array file turned into ``.npy`` once its length is known."""
+
+    def __init__(self, path: Path, dtype: str, width: int = 0):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self.rows = 0
+        self.raw_path = path.with_suffix(".raw")
+        self.handle: BinaryIO = open(self.raw_path, "wb")
+
+    def append(self, values: np.ndarray) -> None:
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self.handle.write(values.tobytes())
+        self.rows += len(values)
+
+    def finish(self) -> None:
+        self.handle.close()
+        shape = (self.rows, self.width) if self.width else (self.rows,)
+        with open(self.path, "wb") as target, open(self.raw_path, "rb") as raw:
+            np.lib.format.write_array_header_1_0(
+                target, {"descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": shape}
+            )
+            shutil.copyfileobj(raw, target)
+        self.raw_path.unlink()
+
+
+def build_store(
+    paths: Sequence[Path],
+    store_dir: Path = DEFAULT_STORE_DIR,
+    *,
+    precision: Optional[int] = None,
+    base: Path = DATA_DIR,
+) -> Dict[str, int]:
+    """Pack ``paths`` into ``store_dir``, replacing any previous store.
+
+    Files are processed one at a time, so memory is bounded by the largest
+    file. With ``precision`` coordinates are stored as int32 on a
+    ``10**-precision`` grid anchored at (-180, -90).
+    """
+    stats = {"files": 0, "features": 0, "duplicates": 0, "skipped": 0}
+    transform = None
+    if precision is not None:
+        scale = 10.0 ** -precision
+        if round(360 / scale) > _INT32_LIMIT:
+            raise ValueError(f"Precision {precision} does not fit int32 grid coordinates")
+        transform = {"scale": [scale, scale], "translate": [-180.0, -90.0]}
+
+    tmp_dir = store_dir.with_name(store_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    writers = {
+        "coords": _ArrayWriter(tmp_dir / "coords.npy", "<f8" if transform is None else "<i4", 2),
+        "ring_offsets": _ArrayWriter(tmp_dir / "ring_offsets.npy", "<i8"),
+        "part_offsets": _ArrayWriter(tmp_dir / "part_offsets.npy", "<i8"),
+        "geometry_offsets": _ArrayWriter(tmp_dir / "geometry_offsets.npy", "<i8"),
+        "multi": _ArrayWriter(tmp_dir / "multi.npy", "|b1"),
+        "bboxes": _ArrayWriter(tmp_dir / "bboxes.npy", "<f8", 4),
+        "property_offsets": _ArrayWriter(tmp_dir / "property_offsets.npy", "<i8"),
+    }
+    for name in ("ring_offsets", "part_offsets", "geometry_offsets", "property_offsets"):
+        writers[name].append(np.zeros(1))
+
+    keys: Dict[bytes, int] = {}
+    sources = []
+    totals = {"coords": 0, "rings": 0, "parts": 0, "properties": 0}
+    with open(tmp_dir / "properties.jsonl", "wb") as properties_handle:
+        for path in paths:
+            variant = file_variant(path)
+            features = []
+            for feature in load_topojson_features(path):
+                props = feature.get("properties") or {}
+                key = store_key(props.get("iso3"), props.get("year"), props.get("id"), variant)
+                if props.get("id") is None:
+                    key += f"#{len(keys)}".encode("utf-8")
+                if key in keys:
+                    stats["duplicates"] += 1
+                elif not is_packable(feature.get("geometry")):
+                    stats["skipped"] += 1
+                else:
+                    keys[key] = len(keys)
+                    features.append(feature)
+
+            try:
+                relative = path.resolve().relative_to(base.resolve()).as_posix()
+            except ValueError:
+                relative = path.as_posix()
+            sources.append(
+                {"path": relative, "variant": variant, "sha256": file_sha256(path), "features": len(features)}
+            )
+            stats["files"] += 1
+            if not features:
+                continue
+
+            packed = pack_polygons([feature["geometry"] for feature in features])
+            coords = packed.coords
+            starts = packed.ring_offsets[packed.part_offsets[packed.geometry_offsets[:-1]]]
+            writers["bboxes"].append(np.column_stack([
+                np.minimum.reduceat(coords[:, 0], starts),
+                np.minimum.reduceat(coords[:, 1], starts),
+                np.maximum.reduceat(coords[:, 0], starts),
+                np.maximum.reduceat(coords[:, 1], starts),
+            ]))
+            if transform is not None:
+                coords = np.rint((coords - transform["translate"]) / transform["scale"])
+            writers["coords"].append(coords)
+            writers["ring_offsets"].append(packed.ring_offsets[1:] + totals["coords"])
+            writers["part_offsets"].append(packed.part_offsets[1:] + totals["rings"])
+            writers["geometry_offsets"].append(packed.geometry_offsets[1:] + totals["parts"])
+            writers["multi"].append(packed.multi)
+            totals["coords"] += len(packed.coords)
+            totals["rings"] += len(packed.ring_offsets) - 1
+            totals["parts"] += len(packed.part_offsets) - 1
+
+            lengths = []
+            for feature in features:
+                line = json.dumps(feature.get("properties") or {}, ensure_ascii=False).encode("utf-8") + b"\n"
+                properties_handle.write(line)
+                lengths.append(len(line))
+            writers["property_offsets"].append(np.cumsum(lengths) + totals["properties"])
+            totals["properties"] += sum(lengths)
+            stats["features"] += len(features)
+
+    for writer in writers.values():
+        writer.finish()
+
+    sorted_keys = sorted(keys)
+    width = max((len(key) for key in sorted_keys), default=1)
+    np.save(tmp_dir / "keys.npy", np.array(sorted_keys, dtype=f"S{width}"))
+    np.save(tmp_dir / "key_rows.npy", np.array([keys[key] for key in sorted_keys], dtype=np.int64))
+
+    with open(tmp_dir / METADATA_FILENAME, "w", encoding="utf-8") as handle:
+        json.dump(
+            {
+                "version": STORE_VERSION,
+                "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                "feature_count": stats["features"],
+                "transform": transform,
+                "sources": sources,
+            },
+            handle,
+            indent=2,
+        )
+
+    old_dir = store_dir.with_name(store_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if store_dir.exists():
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return stats
+
+
+class PackedStore:
+    """Read-only, memory-mapped view of a store written by ``build_store``."""
+
+    def __init__(self, store_dir: Path = DEFAULT_STORE_DIR):
+        self.path = Path(store_dir)
+        with open(self.path / METADATA_FILENAME, "r", encoding="utf-8") as handle:
+            self.metadata = json.load(handle)
+        if self.metadata.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported packed store version: {self.metadata.get('version')}")
+        self.transform = self.metadata.get("transform")
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.path / f"{name}.npy", mmap_mode="r")
+
+        self.coords = load("coords")
+        self.ring_offsets = load("ring_offsets")
+        self.part_offsets = load("part_offsets")
+        self.geometry_offsets = load("geometry_offsets")
+        self.multi = load("multi")
+        self.bboxes = load("bboxes")
+        self.property_offsets = load("property_offsets")
+        self.keys = load("keys")
+        self.key_rows = load("key_rows")
+        properties_path = self.path / "properties.jsonl"
+        self.properties_blob = (
+            np.memmap(properties_path, dtype=np.uint8, mode="r") if properties_path.stat().st_size else np.empty(0, np.uint8)
+        )
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+    def row(self, iso3: str, year: Optional[int], area_id: Any, variant: str = "year") -> Optional[int]:
+        """Feature row for ``(iso3, year, id)`` in the per-year or combined ``variant``, or None."""
+        key = store_key(iso3, year, area_id, variant)
+        position = int(np.searchsorted(self.keys, key))
+        if position < len(self.keys) and self.keys[position] == key:
+            return int(self.key_rows[position])
+        return None
+
+    def rows(self, iso3: Optional[str] = None, variant: Optional[str] = None) -> Iterator[int]:
+        """Feature rows in key order, optionally limited to one country (and variant)."""
+        if iso3 is None:
+            start, end = 0, len(self.keys)
+        else:
+            prefix = f"{iso3.upper()}|{variant + '|' if variant else ''}".encode("utf-8")
+            start = int(np.searchsorted(self.keys, prefix))
+            end = int(np.searchsorted(self.keys, prefix[:-1] + b"}"))
+        for position in range(start, end):
+            yield int(self.key_rows[position])
+
+    def properties(self, row: int) -> Dict[str, Any]:
+        start, end = int(self.property_offsets[row]), int(self.property_offsets[row + 1])
+        return json.loads(bytes(self.properties_blob[start:end]))
+
+    def bbox(self, row: int) -> Tuple[float, float, float, float]:
+        return tuple(float(value) for value in self.bboxes[row])  # type: ignore[return-value]
+
+    def geometry(self, row: int) -> Dict[str, Any]:
+        first, last = int(self.geometry_offsets[row]), int(self.geometry_offsets[row + 1])
+        parts = np.asarray(self.part_offsets[first:last + 1])
+        rings = np.asarray(self.ring_offsets[parts[0]:parts[-1] + 1])
+        coords = np.asarray(self.coords[rings[0]:rings[-1]], dtype=np.float64)
+        if self.transform is not None:
+            coords = coords * self.transform["scale"] + self.transform["translate"]
+        packed = PackedPolygons(
+            coords,
+            rings - rings[0],
+            parts - parts[0],
+            np.array([0, last - first], dtype=np.int64),
+            np.asarray(self.multi[row:row + 1]),
+        )
+        return unpack_polygons(packed)[0]
+
+    def feature(self, row: int) -> Dict[str, Any]:
+        return {"type": "Feature", "geometry": self.geometry(row), "properties": self.properties(row)}
+
+    def lookup(self, iso3: str, year: Optional[int], area_id: Any, variant: str = "year") -> Optional[Dict[str, Any]]:
+        """GeoJSON feature for ``(iso3, year, id)`` in ``variant``, or None."""
+        row = self.row(iso3, year, area_id, variant)
+        return None if row is None else self.feature(row)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory with country datasets (default: data/)")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_STORE_DIR,
+        help="Store directory to (re)build (default: build/ipc_store)",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=None,
+        help="Store int32 coordinates snapped to this many decimal places instead of float64",
+    )
+    parser.add_argument(
+        "--lookup",
+        nargs=3,
+        metavar=("ISO3", "YEAR", "ID"),
+        help="Print one feature's bbox and properties from an existing store instead of building",
+    )
+    parser.add_argument(
+        "--variant",
+        choices=VARIANTS,
+        default="year",
+        help="Copy printed by --lookup: per-year or combined file (default: year)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.lookup:
+        store = PackedStore(args.output)
+        iso3, year, area_id = args.lookup
+        row = store.row(iso3, int(year) if year else None, area_id, args.variant)
+        if row is None:
+            print(f"No {args.variant} feature {iso3}/{year}/{area_id} in {args.output}", file=sys.stderr)
+            return 1
+        print(json.dumps({"bbox": store.bbox(row), "properties": store.properties(row)}))
+        return 0
+
+    paths = source_files(args.data_dir)
+    if not paths:
+        print(f"No TopoJSON files found under {args.data_dir}.", file=sys.stderr)
+        return 1
+    try:
+        stats = build_store(paths, args.output, precision=args.precision, base=args.data_dir)
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+    print(
+        f"Packed {stats['features']:,} features from {stats['files']} files into {args.output} "
+        f"({stats['duplicates']:,} duplicates, {stats['skipped']:,} non-polygonal skipped)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
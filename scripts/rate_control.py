@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Request pacing, retries and latency accounting for the API downloader.
+
+* ``TokenBucket`` spaces requests out to a fixed rate shared by all workers.
+* ``AdaptiveRateLimiter`` adjusts that rate AIMD-style: every ``429`` halves
+  it (at most once per second, so one burst of rejections counts once) and
+  every successful response adds a small step back, up to the configured
+  ceiling. A ``Retry-After`` pauses all workers until the given time.
+  Without a ceiling the limiter stays out of the way until the first
+  ``429`` and then starts from half the request rate observed just before.
+* ``RetryPolicy`` decides which failures are retried and how long to wait:
+  exponential backoff with full jitter, never shorter than ``Retry-After``.
+* ``LatencyStats`` collects per-country request latencies, retries and
+  failures and summarises them as percentiles.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, List, Optional
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+NO_DATA_STATUSES = frozenset({204, 404})
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_CAP = 30.0
+DEFAULT_REQUEST_TIMEOUT = 30.0
+PERCENTILES = (50, 90, 99)
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all download workers.
+
+    ``rate`` tokens are added per second up to ``capacity``; each request
+    consumes one token and blocks until one is available. A non-positive
+    rate disables limiting entirely.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket whose rate follows the server's throttling (AIMD).
+
+    ``ceiling`` is the configured maximum rate (non-positive: unlimited).
+    """
+
+    def __init__(
+        self,
+        ceiling: float,
+        *,
+        floor: float = 0.1,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        window: float = 5.0,
+    ):
+        super().__init__(ceiling)
+        self.ceiling = float(ceiling)
+        self.floor = float(floor)
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.window = float(window)
+        self.paused_until = 0.0
+        self.last_decrease = float("-inf")
+        self.recent: Deque[float] = deque()
+        self.stats = {"throttled": 0, "decreases": 0, "min_rate": self.rate}
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                wait = self.paused_until - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        super().acquire()
+        with self.lock:
+            now = time.monotonic()
+            self.recent.append(now)
+            while self.recent and self.recent[0] < now - self.window:
+                self.recent.popleft()
+
+    def on_success(self) -> None:
+        with self.lock:
+            if self.rate <= 0:
+                return
+            rate = self.rate + self.increase
+            self.rate = min(rate, self.ceiling) if self.ceiling > 0 else rate
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        with self.lock:
+            now = time.monotonic()
+            self.stats["throttled"] += 1
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            if now - self.last_decrease < 1.0:
+                return
+            if self.rate > 0:
+                rate = self.rate * self.decrease
+            else:
+                span = max(now - self.recent[0], 1.0) if self.recent else 1.0
+                observed = len(self.recent) / span if self.recent else 1.0
+                rate = observed * self.decrease
+            self.rate = max(self.floor, rate)
+            self.tokens = min(self.tokens, 1.0)
+            self.last_decrease = now
+            self.stats["decreases"] += 1
+            self.stats["min_rate"] = self.rate if self.stats["min_rate"] <= 0 else min(self.stats["min_rate"], self.rate)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by ``max_retries``."""
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        *,
+        base: float = DEFAULT_BACKOFF_BASE,
+        cap: float = DEFAULT_BACKOFF_CAP,
+        seed: Optional[int] = None,
+    ):
+        self.max_retries = int(max_retries)
+        self.base = float(base)
+        self.cap = float(cap)
+        self.random = random.Random(seed)
+        if self.max_retries < 0:
+            raise ValueError("Retry count must be non-negative")
+
+    @staticmethod
+    def retryable(status: Optional[int]) -> bool:
+        """Retry transport errors (``None``), throttling and transient 5xx."""
+        return status is None or status in RETRY_STATUSES
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to sleep before retry number ``attempt + 1``."""
+        backoff = self.random.uniform(0, min(self.cap, self.base * (2 ** attempt)))
+        return max(backoff, retry_after or 0.0)
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LatencyStats:
+    """Per-country request latencies and retry outcomes; thread-safe."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def record(self, country: str, seconds: Optional[float] = None, **counters: int) -> None:
+        with self.lock:
+            if seconds is not None:
+                self.latencies.setdefault(country, []).append(seconds)
+            totals = self.counters.setdefault(country, {"retries": 0, "throttled": 0, "failures": 0})
+            for key, value in counters.items():
+                totals[key] = totals.get(key, 0) + value
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            countries = sorted(set(self.latencies) | set(self.counters))
+            result = {}
+            for country in countries:
+                values = sorted(self.latencies.get(country, []))
+                entry: Dict[str, Any] = {"requests": len(values), **self.counters.get(country, {})}
+                if values:
+                    for percent in PERCENTILES:
+                        entry[f"p{percent}_s"] = round(percentile(values, percent), 4)
+                    entry["max_s"] = round(values[-1], 4)
+                result[country] = entry
+            return result
+
+
+def format_latency_summary(summary: Dict[str, Dict[str, Any]]) -> List[str]:
+    lines = []
+    for country, entry in summary.items():
+        line = f"  {country:>4}: {entry['requests']:4d} request(s)"
+        if entry["requests"]:
+            line += "".join(f", p{percent} {entry[f'p{percent}_s']:.2f}s" for percent in PERCENTILES)
+        extras = [f"{entry[key]} {key}" for key in ("retries", "throttled", "failures") if entry.get(key)]
+        if extras:
+            line += f" ({', '.join(extras)})"
+        lines.append(line)
+    return lines
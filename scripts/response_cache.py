@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""On-disk cache for raw IPC API responses.
+
+Bodies are stored content-addressed (``objects/<sha256>.json``) and each
+(country, year, type) request has a small metadata record under ``entries/``
+holding the body hash, the ``ETag``/``Last-Modified`` validators returned by
+the API and the hash of the payload that was last turned into a per-year file.
+The downloader uses the validators for conditional requests and the hashes to
+skip re-processing payloads that have not changed since the previous run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Set, Tuple
+
+DEFAULT_TTL_SECONDS = 0.0
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def sha256_bytes(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed response store with TTL and size-bounded LRU eviction.
+
+    ``ttl`` is the number of seconds a cached response is served without
+    contacting the API at all; once it expires the entry is revalidated with
+    ``If-None-Match``/``If-Modified-Since``. ``max_bytes`` bounds the total size
+    of stored bodies, evicting the least recently used entries first.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        *,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / "entries"
+        self.objects_dir = self.cache_dir / "objects"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = float(ttl)
+        self.max_bytes = int(max_bytes)
+        self.lock = threading.Lock()
+        self.unchanged: Set[Tuple[str, int, str]] = set()
+        self.stats = {
+            "hits": 0,
+            "revalidated": 0,
+            "misses": 0,
+            "unchanged": 0,
+            "bytes_saved": 0,
+            "evicted": 0,
+        }
+
+        if self.ttl < 0:
+            raise ValueError("Cache TTL must be non-negative")
+        if self.max_bytes <= 0:
+            raise ValueError("Cache size limit must be positive")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def entry_name(country: str, year: int, area_type: str) -> str:
+        return f"{country.upper()}_{int(year)}_{area_type}"
+
+    def entry_path(self, country: str, year: int, area_type: str) -> Path:
+        return self.entries_dir / f"{self.entry_name(country, year, area_type)}.json"
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / f"{digest}.json"
+
+    def lookup(self, country: str, year: int, area_type: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata record for a request, if its body is still stored."""
+        path = self.entry_path(country, year, area_type)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(meta, dict) or not self.object_path(str(meta.get("sha256"))).exists():
+            return None
+        return meta
+
+    def is_fresh(self, meta: Mapping[str, Any]) -> bool:
+        if self.ttl <= 0:
+            return False
+        fetched_at = meta.get("fetched_at") or 0
+        return (time.time() - float(fetched_at)) < self.ttl
+
+    @staticmethod
+    def conditional_headers(meta: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if not meta:
+            return headers
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def read_body(self, meta: Mapping[str, Any]) -> bytes:
+        return self.object_path(str(meta["sha256"])).read_bytes()
+
+    def iter_body(self, meta: Mapping[str, Any], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """Read a stored body in chunks instead of loading it at once."""
+        with open(self.object_path(str(meta["sha256"])), "rb") as handle:
+            yield from iter(lambda: handle.read(chunk_size), b"")
+
+    def _write_entry(self, country: str, year: int, area_type: str, meta: Dict[str, Any]) -> None:
+        path = self.entry_path(country, year, area_type)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _record_reuse(
+        self,
+        country: str,
+        year: int,
+        area_type: str,
+        meta: Dict[str, Any],
+        stat: str,
+        load_body: bool,
+    ) -> bytes:
+        body = self.read_body(meta) if load_body else b""
+        size = len(body) if load_body else self.object_path(str(meta["sha256"])).stat().st_size
+        meta["last_access"] = time.time()
+        self._write_entry(country, year, area_type, meta)
+        with self.lock:
+            self.stats[stat] += 1
+            self.stats["bytes_saved"] += size
+        self._note_unchanged(country, year, area_type, meta, str(meta["sha256"]))
+        return body
+
+    def record_hit(
+        self,
+        country: str,
+        year: int,
+        area_type: str,
+        meta: Dict[str, Any],
+        *,
+        load_body: bool = True,
+    ) -> bytes:
+        """Serve a fresh entry without contacting the API.
+
+        With ``load_body=False`` the body is not read (``b""`` is returned);
+        use ``iter_body`` to stream it instead.
+        """
+        return self._record_reuse(country, year, area_type, meta, "hits", load_body)
+
+    def record_not_modified(
+        self,
+        country: str,
+        year: int,
+        area_type: str,
+        meta: Dict[str, Any],
+        headers: Mapping[str, str],
+        *,
+        load_body: bool = True,
+    ) -> bytes:
+        """Handle a ``304 Not Modified`` response for a cached entry."""
+        meta["fetched_at"] = time.time()
+        meta["etag"] = headers.get("ETag") or meta.get("etag")
+        meta["last_modified"] = headers.get("Last-Modified") or meta.get("last_modified")
+        return self._record_reuse(country, year, area_type, meta, "revalidated", load_body)
+
+    def store(
+        self,
+        country: str,
+        year: int,
+        area_type: str,
+        body: bytes,
+        headers: Mapping[str, str],
+        previous: Optional[Mapping[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Persist a freshly downloaded body and its validators."""
+        digest = sha256_bytes(body)
+        object_path = self.object_path(digest)
+        if not object_path.exists():
+            tmp_path = object_path.with_suffix(".tmp")
+            tmp_path.write_bytes(body)
+            os.replace(tmp_path, object_path)
+        return self._record_store(country, year, area_type, digest, len(body), headers, previous)
+
+    def store_stream(
+        self,
+        country: str,
+        year: int,
+        area_type: str,
+        chunks: Iterable[bytes],
+        headers: Mapping[str, str],
+        previous: Optional[Mapping[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Like ``store`` but writes the body chunk by chunk while hashing it."""
+        hasher = hashlib.sha256()
+        size = 0
+        tmp_path = self.objects_dir / f"incoming-{threading.get_ident()}-{time.time_ns()}.tmp"
+        try:
+            with open(tmp_path, "wb") as handle:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    handle.write(chunk)
+                    size += len(chunk)
+            digest = hasher.hexdigest()
+            os.replace(tmp_path, self.object_path(digest))
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return self._record_store(country, year, area_type, digest, size, headers, previous)
+
+    def _record_store(
+        self,
+        country: str,
+        year: int,
+        area_type: str,
+        digest: str,
+        size: int,
+        headers: Mapping[str, str],
+        previous: Optional[Mapping[str, Any]],
+    ) -> Dict[str, Any]:
+        now = time.time()
+        meta = {
+            "country": country.upper(),
+            "year": int(year),
+            "type": area_type,
+            "sha256": digest,
+            "size": size,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": now,
+            "last_access": now,
+            "processed_sha256": (previous or {}).get("processed_sha256"),
+        }
+        self._write_entry(country, year, area_type, meta)
+
+        with self.lock:
+            self.stats["misses"] += 1
+        self._note_unchanged(country, year, area_type, meta, digest)
+        return meta
+
+    def _note_unchanged(
+        self,
+        country: str,
+        year: int,
+        area_type: str,
+        meta: Mapping[str, Any],
+        digest: str,
+    ) -> None:
+        if meta.get("processed_sha256") != digest:
+            return
+        with self.lock:
+            self.unchanged.add((country.upper(), int(year), area_type))
+            self.stats["unchanged"] += 1
+
+    def is_unchanged(self, country: str, year: int, area_type: str) -> bool:
+        """True when this run fetched the same payload that was last processed."""
+        with self.lock:
+            return (country.upper(), int(year), area_type) in self.unchanged
+
+    def mark_processed(self, country: str, year: int, area_type: str) -> None:
+        """Record that the current body for a request has been written to disk."""
+        meta = self.lookup(country, year, area_type)
+        if not meta:
+            return
+        meta["processed_sha256"] = meta.get("sha256")
+        self._write_entry(country, year, area_type, meta)
+
+    def evict(self) -> int:
+        """Drop least recently used entries until stored bodies fit ``max_bytes``."""
+        entries = []
+        for path in self.entries_dir.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as handle:
+                    meta = json.load(handle)
+            except (OSError, ValueError):
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((float(meta.get("last_access") or 0), path, meta.get("sha256")))
+
+        referenced = {digest for _, _, digest in entries}
+        for object_path in self.objects_dir.glob("*.json"):
+            if object_path.stem not in referenced:
+                object_path.unlink(missing_ok=True)
+
+        sizes = {path.stem: path.stat().st_size for path in self.objects_dir.glob("*.json")}
+        total = sum(sizes.values())
+        removed = 0
+
+        entries.sort(key=lambda item: item[0])
+        remaining = [digest for _, _, digest in entries]
+        for _, path, digest in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            remaining.remove(digest)
+            removed += 1
+            if digest in sizes and digest not in remaining:
+                self.object_path(digest).unlink(missing_ok=True)
+                total -= sizes.pop(digest)
+
+        with self.lock:
+            self.stats["evicted"] += removed
+        return removed
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (
+            f"{stats['hits']} hit(s), {stats['revalidated']} revalidated (304), "
+            f"{stats['misses']} miss(es), {stats['unchanged']} unchanged payload(s), "
+            f"{stats['bytes_saved']:,} bytes saved, {stats['evicted']} evicted"
+        )
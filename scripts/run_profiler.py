@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Stage timing and memory instrumentation for pipeline runs.
+
+``RunProfiler.stage`` (or the ``profiled`` method decorator) wraps one unit of
+work such as a download or a TopoJSON conversion and records its wall time,
+the CPU time of the calling thread, the process's peak RSS when the stage
+ended and any counters the stage reports through ``count`` (``bytes_in``,
+``bytes_out``, ``features_in``, ...). Stages nest; a stage inherits the
+country of the stage it runs in, so per-country totals need one ``annotate``
+call at the top.
+
+Optional extras:
+
+* ``trace_memory`` starts ``tracemalloc`` and records the traced peak above
+  each stage's starting allocation (stages running concurrently on other
+  threads are included in that peak, so treat it as an upper bound).
+* ``profile_dir`` runs ``cProfile`` around every outermost stage of the main
+  thread of each process and writes ``{stage}[-{country}].prof`` dumps there,
+  merging repeated calls of the same stage and country (inspect them with
+  ``python -m pstats``). Only one profiler can be active per process, so
+  stages on download threads are timed but not profiled.
+
+Records made in worker processes are shipped back with ``take_records`` and
+merged with ``extend``; ``report`` aggregates everything into a JSON-ready
+dict that can be diffed across runs.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+REPORT_VERSION = 1
+SUMMED_FIELDS = ("wall_s", "cpu_s")
+PEAK_FIELDS = ("peak_rss_bytes", "traced_peak_bytes")
+
+Record = Dict[str, Any]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """High-water resident set size of this process, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _profile_name(stage: str, country: Optional[str]) -> str:
+    name = f"{stage}-{country}" if country else stage
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name) + ".prof"
+
+
+class RunProfiler:
+    """Collects one record per stage call; safe to share between threads."""
+
+    def __init__(self, *, trace_memory: bool = False, profile_dir: Optional[Path] = None):
+        self.trace_memory = bool(trace_memory)
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else None
+        self._setup()
+        self.started_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        self.started = time.time()
+        self.cpu_started = time.process_time()
+
+    def _setup(self) -> None:
+        self.records: List[Record] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active: List[Record] = []
+        self._dumped: set = set()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes start with an empty record list of their own.
+        return {
+            "trace_memory": self.trace_memory,
+            "profile_dir": self.profile_dir,
+            "started_at": self.started_at,
+            "started": self.started,
+            "cpu_started": self.cpu_started,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._setup()
+
+    def _stack(self) -> List[Record]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _fold_traced_peak(self) -> None:
+        """Credit the peak since the last reset to every active stage (lock held)."""
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for record in self._active:
+            record["_traced_peak"] = max(record["_traced_peak"], peak)
+
+    @contextmanager
+    def stage(self, name: str, *, country: Optional[str] = None) -> Iterator[Record]:
+        """Time the enclosed block as stage ``name`` and record it on exit."""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        record: Record = {
+            "stage": name,
+            "country": country if country is not None else (parent or {}).get("country"),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "start_s": round(time.time() - self.started, 6),
+            "counters": {},
+        }
+        profile = None
+        on_main_thread = threading.current_thread() is threading.main_thread()
+        if self.profile_dir is not None and parent is None and on_main_thread:
+            profile = cProfile.Profile()
+        if self.trace_memory:
+            with self._lock:
+                self._fold_traced_peak()
+                record["_traced_start"] = record["_traced_peak"] = tracemalloc.get_traced_memory()[0]
+                self._active.append(record)
+
+        stack.append(record)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Another profiler (or tracer) owns this process; time the stage only.
+                    profile = None
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record["wall_s"] = round(time.perf_counter() - wall_start, 6)
+            record["cpu_s"] = round(time.thread_time() - cpu_start, 6)
+            record["peak_rss_bytes"] = peak_rss_bytes()
+            stack.pop()
+            with self._lock:
+                if self.trace_memory:
+                    self._fold_traced_peak()
+                    self._active.remove(record)
+                    record["traced_peak_bytes"] = record.pop("_traced_peak") - record.pop("_traced_start")
+                self.records.append(record)
+                if profile is not None:
+                    self._dump_profile(profile, record)
+
+    def _dump_profile(self, profile: cProfile.Profile, record: Record) -> None:
+        path = self.profile_dir / _profile_name(record["stage"], record["country"])
+        stats = pstats.Stats(profile)
+        if path in self._dumped:
+            stats.add(str(path))
+        stats.dump_stats(str(path))
+        self._dumped.add(path)
+
+    def current(self) -> Optional[Record]:
+        """Innermost stage running on this thread."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def annotate(self, **fields: Any) -> None:
+        """Set labels (``country``, ``year``, ...) on the current stage."""
+        record = self.current()
+        if record is not None:
+            record.update(fields)
+
+    def count(self, **counters: float) -> None:
+        """Add to the numeric counters of the current stage."""
+        record = self.current()
+        if record is None:
+            return
+        totals = record["counters"]
+        for key, value in counters.items():
+            if value is not None:
+                totals[key] = totals.get(key, 0) + value
+
+    def take_records(self) -> List[Record]:
+        """Remove and return the records collected so far."""
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    def extend(self, records: List[Record]) -> None:
+        """Merge records returned by a worker process."""
+        with self._lock:
+            self.records.extend(records)
+
+    @staticmethod
+    def _totals(records: List[Record]) -> Dict[str, Dict[str, Any]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            entry = totals.setdefault(record["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            entry["calls"] += 1
+            for field in SUMMED_FIELDS:
+                entry[field] = round(entry[field] + record[field], 6)
+            for field in PEAK_FIELDS:
+                if record.get(field) is not None:
+                    entry[field] = max(entry.get(field, 0), record[field])
+            for key, value in record["counters"].items():
+                entry[key] = entry.get(key, 0) + value
+        return dict(sorted(totals.items()))
+
+    def report(self, **metadata: Any) -> Dict[str, Any]:
+        """Aggregate the records by stage and by country."""
+        with self._lock:
+            records = sorted(self.records, key=lambda record: record["start_s"])
+        by_country: Dict[str, List[Record]] = {}
+        for record in records:
+            if record.get("country"):
+                by_country.setdefault(record["country"], []).append(record)
+        return {
+            "version": REPORT_VERSION,
+            "started_at": self.started_at,
+            **metadata,
+            "wall_s": round(time.time() - self.started, 6),
+            "cpu_s": round(time.process_time() - self.cpu_started, 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "trace_memory": self.trace_memory,
+            "stages": self._totals(records),
+            "countries": {country: self._totals(items) for country, items in sorted(by_country.items())},
+            "records": records,
+        }
+
+    def write_report(self, path: Path, **metadata: Any) -> Dict[str, Any]:
+        report = self.report(**metadata)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        os.replace(tmp_path, path)
+        return report
+
+
+def profiled(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Run a method of an object with a ``profiler`` attribute as stage ``name``."""
+
+    def decorate(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            with self.profiler.stage(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def format_stage_totals(stages: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Human-readable lines for the per-stage totals of a report."""
+    lines = []
+    for name, entry in sorted(stages.items(), key=lambda item: -item[1]["wall_s"]):
+        line = f"  {name:>26}: {entry['calls']:>5} call(s), {entry['wall_s']:9.2f}s wall, {entry['cpu_s']:9.2f}s CPU"
+        if entry.get("bytes_in") or entry.get("bytes_out"):
+            line += f", {entry.get('bytes_in', 0):,} bytes in, {entry.get('bytes_out', 0):,} bytes out"
+        lines.append(line)
+    return lines
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Serve the generated IPC datasets over HTTP.
+
+A small asyncio HTTP/1.1 server over the data directory, laid out like the
+CDN URLs in ``index.json``:
+
+* ``/index.json`` and any ``.topojson`` file, e.g. ``/KEN/KEN_2024_areas.topojson``
+* ``/query?bbox=minx,miny,maxx,maxy[&iso3=KEN][&year=2024][&file=...]`` -
+  GeoJSON FeatureCollection of the areas intersecting the box (default file:
+  ``global_areas.topojson``)
+* ``/tiles/{z}/{x}/{y}.pbf[?file=...]`` - Mapbox Vector Tiles rendered on the
+  fly by ``scripts/vector_tiles.py`` (204 for empty tiles)
+
+Decoded topologies (features, STR-tree, tile levels) and encoded responses
+live in byte-bounded LRU caches keyed by the source file's modification time,
+so rebuilt files are picked up without a restart. Responses carry a strong
+ETag (``If-None-Match`` answers 304) and are sent gzip/brotli encoded when the
+client accepts it, preferring the precompressed ``.gz``/``.br`` sidecars.
+Geometry work runs in a thread pool so the event loop keeps serving.
+
+Usage example:
+
+    python scripts/serve_ipc_areas.py --data-dir data --port 8000 --cache-mb 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+try:
+    import shapely
+except ImportError:  # pragma: no cover - shapely ships with topojson
+    shapely = None  # type: ignore[assignment]
+
+try:
+    from .compression import SIDECAR_FORMATS, compress_bytes, sidecar_path
+    from .spatial_index import feature_geometries, geometry_nbytes
+    from .topojson_io import load_topojson_features
+    from .vector_tiles import TileSource
+except ImportError:  # pragma: no cover - script executed directly
+    from compression import SIDECAR_FORMATS, compress_bytes, sidecar_path
+    from spatial_index import feature_geometries, geometry_nbytes
+    from topojson_io import load_topojson_features
+    from vector_tiles import TileSource
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_ROOT / "data"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_MB = 256
+DEFAULT_QUERY_FILE = "global_areas.topojson"
+MIN_COMPRESS_BYTES = 1024
+MAX_HEADER_BYTES = 64 * 1024
+
+CONTENT_TYPES = {
+    ".json": "application/json",
+    ".topojson": "application/json",
+    ".geojson": "application/geo+json",
+    ".pbf": "application/vnd.mapbox-vector-tile",
+}
+
+
+class LRUCache:
+    """Least-recently-used mapping bounded by the total ``size`` of its values."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self.entries: "OrderedDict[Any, Tuple[Any, int]]" = OrderedDict()
+        self.bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def put(self, key: Any, value: Any, size: int) -> Any:
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        if size > self.max_bytes:
+            return value
+        self.entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.bytes -= evicted
+            self.stats["evictions"] += 1
+        return value
+
+
+class Response:
+    """An encoded response body with its ETag and compressed variants.
+
+    ``variants`` holds precompressed bodies (e.g. sidecars); a gzip variant is
+    added for bodies worth compressing.
+    """
+
+    def __init__(self, body: bytes, content_type: str, variants: Optional[Dict[str, bytes]] = None):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.variants: Dict[str, bytes] = dict(variants or {})
+        if "gz" not in self.variants and len(body) >= MIN_COMPRESS_BYTES:
+            self.variants["gz"] = compress_bytes(body, "gz")
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(payload) for payload in self.variants.values())
+
+    def encoded(self, accepted: List[str]) -> Tuple[Optional[str], bytes]:
+        """Smallest acceptable ``(content-encoding, body)``."""
+        options = [(len(self.variants[fmt]), fmt) for fmt in accepted if fmt in self.variants]
+        if options:
+            _, fmt = min(options)
+            return fmt, self.variants[fmt]
+        return None, self.body
+
+
+class Dataset:
+    """Decoded features of one TopoJSON file plus lazily built query helpers.
+
+    ``nbytes`` estimates the memory held, including the helpers built so far.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.features = load_topojson_features(path)
+        # Decoded features are several times larger than their file.
+        self._features_nbytes = 4 * path.stat().st_size
+        self._tree: Any = None
+        self._tree_nbytes = 0
+        self._tiles: Optional[TileSource] = None
+
+    @property
+    def nbytes(self) -> int:
+        tiles = self._tiles.nbytes if self._tiles is not None else 0
+        return self._features_nbytes + self._tree_nbytes + tiles
+
+    def query(self, bbox: Tuple[float, float, float, float], iso3: Optional[str], year: Optional[int]) -> List[Dict[str, Any]]:
+        if self._tree is None:
+            geometries = feature_geometries(self.features)
+            geometries[geometries == None] = shapely.Polygon()  # noqa: E711
+            self._tree = shapely.STRtree(geometries)
+            self._tree_nbytes = geometry_nbytes(geometries)
+        matches = np.sort(self._tree.query(shapely.box(*bbox), predicate="intersects"))
+        selected = []
+        for index in matches.tolist():
+            feature = self.features[index]
+            properties = feature.get("properties") or {}
+            if iso3 and str(properties.get("iso3") or "").upper() != iso3:
+                continue
+            if year is not None and properties.get("year") != year:
+                continue
+            selected.append(feature)
+        return selected
+
+    def tiles(self) -> TileSource:
+        if self._tiles is None:
+            self._tiles = TileSource(self.features)
+        return self._tiles
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """Sidecar formats named in ``Accept-Encoding`` (``q=0`` excluded)."""
+    offered = []
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip().replace(" ", "")
+        if quality.startswith("q=") and not quality[2:].strip("0.") and quality[2:]:
+            continue
+        fmt = {"gzip": "gz"}.get(name.strip().lower(), name.strip().lower())
+        if fmt in SIDECAR_FORMATS:
+            offered.append(fmt)
+    return offered
+
+
+class HTTPApp:
+    """Keep-alive HTTP/1.1 connection handling; subclasses implement ``respond``."""
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = (lines[0].split(" ") + ["", "", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    if version == "HTTP/1.1"
+                    else headers.get("connection", "").lower() == "keep-alive"
+                )
+                await self.respond(writer, method, target, headers, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, method: str, target: str, headers: Dict[str, str], keep_alive: bool
+    ) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def write(writer: asyncio.StreamWriter, status: HTTPStatus, body: bytes, headers: Dict[str, str], method: str) -> None:
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        if status not in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED):
+            lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if method != "HEAD" and status not in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED):
+            writer.write(body)
+
+
+class AreaServer(HTTPApp):
+    """Route requests for a data directory, caching datasets and responses."""
+
+    def __init__(self, data_dir: Path, cache_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.data_dir = Path(data_dir).resolve()
+        # Decoded datasets (charged by ``Dataset.nbytes``) get half the budget
+        # and the encoded responses the other half.
+        self.datasets = LRUCache(cache_bytes // 2)
+        self.responses = LRUCache(cache_bytes // 2)
+        self.locks: Dict[Any, asyncio.Lock] = {}
+
+    def resolve(self, relative: str) -> Path:
+        path = (self.data_dir / unquote(relative).lstrip("/")).resolve()
+        if self.data_dir not in path.parents or not path.is_file():
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        return path
+
+    async def cached(self, cache: LRUCache, key: Any, size: Callable[[Any], int], build: Callable[[], Any]) -> Any:
+        """Return ``cache[key]``, building it once in a worker thread on a miss."""
+        value = cache.get(key)
+        if value is not None:
+            return value
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                value = cache.get(key)
+                if value is None:
+                    value = await asyncio.get_running_loop().run_in_executor(None, build)
+                    cache.put(key, value, size(value))
+        finally:
+            self.locks.pop(key, None)
+        return value
+
+    async def dataset(self, path: Path) -> Dataset:
+        key = (path, path.stat().st_mtime_ns)
+        return await self.cached(self.datasets, key, lambda dataset: dataset.nbytes, lambda: Dataset(path))
+
+    def recharge(self, path: Path, dataset: Dataset) -> None:
+        """Re-account ``dataset`` after a query tree or tile level was built for it."""
+        key = (path, path.stat().st_mtime_ns)
+        if key in self.datasets.entries:
+            self.datasets.put(key, dataset, dataset.nbytes)
+
+    async def handle(self, target: str) -> Response:
+        url = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        route = url.path.rstrip("/") or "/index.json"
+
+        if route == "/query":
+            path = self.resolve(params.get("file", DEFAULT_QUERY_FILE))
+            return await self.query(path, params)
+        if route.startswith("/tiles/"):
+            path = self.resolve(params.get("file", DEFAULT_QUERY_FILE))
+            return await self.tile(path, route)
+        if route.endswith((".json", ".topojson", ".geojson")):
+            return await self.static(self.resolve(route))
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    async def static(self, path: Path) -> Response:
+        key = ("file", path, path.stat().st_mtime_ns)
+
+        def build() -> Response:
+            variants = {}
+            for fmt in SIDECAR_FORMATS:
+                sidecar = sidecar_path(path, fmt)
+                if sidecar.exists() and sidecar.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+                    variants[fmt] = sidecar.read_bytes()
+            return Response(path.read_bytes(), CONTENT_TYPES[path.suffix], variants)
+
+        return await self.cached(self.responses, key, lambda response: response.size, build)
+
+    async def query(self, path: Path, params: Dict[str, str]) -> Response:
+        try:
+            bbox = tuple(float(value) for value in params["bbox"].split(","))
+            year = int(params["year"]) if "year" in params else None
+        except (KeyError, ValueError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "bbox=minx,miny,maxx,maxy is required") from None
+        if len(bbox) != 4 or not all(np.isfinite(bbox)):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "bbox=minx,miny,maxx,maxy is required")
+        iso3 = params.get("iso3", "").upper() or None
+        dataset = await self.dataset(path)
+        key = ("query", path, path.stat().st_mtime_ns, bbox, iso3, year)
+
+        def build() -> Response:
+            features = dataset.query(bbox, iso3, year)
+            body = json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":"))
+            return Response(body.encode("utf-8"), CONTENT_TYPES[".geojson"])
+
+        response = await self.cached(self.responses, key, lambda response: response.size, build)
+        self.recharge(path, dataset)
+        return response
+
+    async def tile(self, path: Path, route: str) -> Response:
+        parts = route[len("/tiles/"):].split("/")
+        try:
+            if len(parts) != 3 or not parts[2].endswith((".pbf", ".mvt")):
+                raise ValueError
+            zoom, x, y = int(parts[0]), int(parts[1]), int(parts[2].rsplit(".", 1)[0])
+        except ValueError:
+            raise HTTPError(HTTPStatus.NOT_FOUND) from None
+        dataset = await self.dataset(path)
+        key = ("tile", path, path.stat().st_mtime_ns, zoom, x, y)
+
+        def build() -> Response:
+            try:
+                return Response(dataset.tiles().tile(zoom, x, y), CONTENT_TYPES[".pbf"])
+            except ValueError as exc:
+                raise HTTPError(HTTPStatus.NOT_FOUND, str(exc)) from None
+
+        response = await self.cached(self.responses, key, lambda response: response.size, build)
+        self.recharge(path, dataset)
+        return response
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, method: str, target: str, headers: Dict[str, str], keep_alive: bool
+    ) -> None:
+        extra = {"Connection": "keep-alive" if keep_alive else "close"}
+        if method not in ("GET", "HEAD"):
+            self.write(writer, HTTPStatus.METHOD_NOT_ALLOWED, b"", {**extra, "Allow": "GET, HEAD"}, method)
+            return
+        try:
+            response = await self.handle(target)
+        except HTTPError as exc:
+            self.write(writer, exc.status, f"{exc}\n".encode("utf-8"), {**extra, "Content-Type": "text/plain"}, method)
+            return
+        except Exception as exc:  # pragma: no cover - reported to the client
+            print(f"Error serving {target}: {exc}", file=sys.stderr)
+            self.write(writer, HTTPStatus.INTERNAL_SERVER_ERROR, b"", extra, method)
+            return
+
+        extra.update({"ETag": response.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+        if response.etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            self.write(writer, HTTPStatus.NOT_MODIFIED, b"", extra, method)
+            return
+        if not response.body:
+            self.write(writer, HTTPStatus.NO_CONTENT, b"", extra, method)
+            return
+        encoding, body = response.encoded(accepted_encodings(headers.get("accept-encoding", "")))
+        extra["Content-Type"] = response.content_type
+        if encoding:
+            extra["Content-Encoding"] = {"gz": "gzip"}.get(encoding, encoding)
+        self.write(writer, HTTPStatus.OK, body, extra, method)
+
+
+async def serve(data_dir: Path, host: str, port: int, cache_bytes: int) -> None:
+    app = AreaServer(data_dir, cache_bytes)
+    server = await asyncio.start_server(app.serve_client, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Serving {app.data_dir} on http://{host}:{port}/ (cache {cache_bytes / (1024 * 1024):g} MB)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory with index.json and the datasets (default: data/)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (default: %(default)s)")
+    parser.add_argument(
+        "--cache-mb",
+        type=float,
+        default=DEFAULT_CACHE_MB,
+        help="Memory budget for decoded datasets and encoded responses (default: %(default)g)",
+    )
+    args = parser.parse_args(argv)
+
+    if shapely is None:
+        print("The server requires shapely.", file=sys.stderr)
+        return 1
+    if not args.data_dir.is_dir():
+        print(f"Data directory not found: {args.data_dir}", file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(serve(args.data_dir, args.host, args.port, int(args.cache_mb * 1024 * 1024)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,7 +13,9 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
 
 try:
     import topojson as tp
@@ -23,15 +25,44 @@ except ImportError as exc:  # pragma: no cover - the script exits immediately
     ) from exc
 
 try:
+    import shapely
     from shapely.geometry import shape
     from shapely.geometry.base import BaseGeometry
 except ImportError:  # pragma: no cover - simplification is optional
+    shapely = None  # type: ignore[assignment]
     shape = None  # type: ignore[assignment]
     BaseGeometry = object  # type: ignore[assignment]
 
+try:
+    from .compression import SIDECAR_FORMATS, write_sidecars
+    from .geometry_arrays import (
+        from_shapely,
+        is_packable,
+        pack_polygons,
+        round_coords,
+        round_packed,
+        to_shapely,
+        unpack_polygons,
+    )
+    from .topojson_io import decode_arcs, load_topojson_features, quantize_topology
+except ImportError:  # pragma: no cover - script executed directly
+    from compression import SIDECAR_FORMATS, write_sidecars
+    from geometry_arrays import (
+        from_shapely,
+        is_packable,
+        pack_polygons,
+        round_coords,
+        round_packed,
+        to_shapely,
+        unpack_polygons,
+    )
+    from topojson_io import decode_arcs, load_topojson_features, quantize_topology
+
 REPO_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = REPO_ROOT / "data"
 DEFAULT_SOURCE_NAME = "ipc_global_areas.topojson"
+SIMPLIFY_MODES = ("features", "arcs")
+DEFAULT_SIMPLIFY_MODE = "features"
 
 
 def ensure_source(path: Path) -> None:
@@ -40,17 +71,7 @@ def ensure_source(path: Path) -> None:
 
 
 def load_global_features(source: Path) -> List[Dict[str, Any]]:
-    with open(source, "r", encoding="utf-8") as handle:
-        topo_payload = json.load(handle)
-
-    topology = tp.Topology(topo_payload, topology=True, prequantize=False)
-    geojson_payload = json.loads(topology.to_geojson())
-
-    features = geojson_payload.get("features") if isinstance(geojson_payload, dict) else None
-    if not isinstance(features, list):
-        return []
-
-    return [feature for feature in features if isinstance(feature, dict)]
+    return load_topojson_features(source)
 
 
 def round_nested(value: Any, digits: int) -> Any:
@@ -84,17 +105,53 @@ def simplify_geometry(geometry: Dict[str, Any], tolerance: float) -> Dict[str, A
 
 
 def simplify_feature(feature: Dict[str, Any], digits: int, tolerance: float) -> Dict[str, Any]:
-    feature_copy = json.loads(json.dumps(feature))  # deep copy to avoid mutating original
+    return simplify_features([feature], precision=digits, simplify_tolerance=tolerance)[0]
+
+
+def _simplify_feature_slow(feature: Dict[str, Any], digits: int, tolerance: float) -> Dict[str, Any]:
+    """Per-feature path for geometries the packed arrays cannot represent."""
+    feature_copy = dict(feature)
     geometry = feature_copy.get("geometry")
     if isinstance(geometry, dict):
         if tolerance > 0:
             geometry = simplify_geometry(geometry, tolerance)
-            feature_copy["geometry"] = geometry
         if "coordinates" in geometry:
-            geometry["coordinates"] = round_nested(geometry["coordinates"], digits)
+            geometry = {**geometry, "coordinates": round_nested(geometry["coordinates"], digits)}
+        feature_copy["geometry"] = geometry
     return feature_copy
 
 
+def simplify_shapely(geometries: np.ndarray, tolerance: float) -> np.ndarray:
+    """Vectorised topology-preserving simplify; empty results keep the input."""
+    simplified = shapely.simplify(geometries, tolerance, preserve_topology=True)
+    empty = shapely.is_empty(simplified)
+    simplified[empty] = geometries[empty]
+    return simplified
+
+
+def simplify_polygons(geometries: List[Dict[str, Any]], digits: int, tolerance: float) -> List[Dict[str, Any]]:
+    """Simplify and round polygonal geometries as one packed array.
+
+    Coordinates are packed into a single NumPy buffer, simplified with Shapely's
+    vectorised ``simplify`` (empty results keep the original geometry, as in
+    ``simplify_geometry``) and rounded in bulk before being unpacked into new
+    GeoJSON dicts. The input geometries are never modified.
+    """
+    packed = pack_polygons(geometries)
+    if tolerance > 0:
+        if shapely is None:
+            print(
+                "Warning: shapely is not installed, skipping simplification step.",
+                file=sys.stderr,
+            )
+        else:
+            simplified = simplify_shapely(to_shapely(packed), tolerance)
+            # GEOS may return a Polygon for a single-part MultiPolygon; keep its type.
+            multi = shapely.get_type_id(simplified) == shapely.GeometryType.MULTIPOLYGON
+            packed = from_shapely(simplified, multi)
+    return unpack_polygons(round_packed(packed, digits))
+
+
 def build_topology(features: List[Dict[str, Any]]) -> Dict[str, Any]:
     feature_collection = {
         "type": "FeatureCollection",
@@ -116,7 +173,148 @@ def simplify_features(
     precision: int,
     simplify_tolerance: float,
 ) -> List[Dict[str, Any]]:
-    return [simplify_feature(feature, precision, simplify_tolerance) for feature in features]
+    """Round (and optionally simplify) features without mutating the input.
+
+    Polygon and MultiPolygon features go through ``simplify_polygons`` in a
+    single batch; anything else falls back to the per-feature path.
+    """
+    processed: List[Dict[str, Any] | None] = [None] * len(features)
+    batch_indices: List[int] = []
+    for index, feature in enumerate(features):
+        if is_packable(feature.get("geometry")):
+            batch_indices.append(index)
+        else:
+            processed[index] = _simplify_feature_slow(feature, precision, simplify_tolerance)
+
+    if batch_indices:
+        geometries = simplify_polygons(
+            [features[index]["geometry"] for index in batch_indices],
+            precision,
+            simplify_tolerance,
+        )
+        for index, geometry in zip(batch_indices, geometries):
+            processed[index] = {**features[index], "geometry": geometry}
+
+    return processed  # type: ignore[return-value]
+
+
+def _finish_arcs(coords: np.ndarray, offsets: np.ndarray, digits: int) -> List[List[List[float]]]:
+    """Round packed arcs and drop points that collapse onto their predecessor.
+
+    Every arc keeps at least two points; its first point and the value of its
+    last point are preserved so arcs still meet at shared junctions.
+    """
+    coords = round_coords(coords, digits)
+    keep = np.ones(len(coords), dtype=bool)
+    keep[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+    keep[offsets[:-1]] = True
+    kept_offsets = np.concatenate(([0], np.cumsum(keep)))[offsets]
+
+    points = coords[keep].tolist()
+    arcs = []
+    for start, end in zip(kept_offsets[:-1].tolist(), kept_offsets[1:].tolist()):
+        arc = points[start:end]
+        if len(arc) < 2:
+            arc.append(list(arc[0]))
+        arcs.append(arc)
+    return arcs
+
+
+def _polygon_rings(obj: Dict[str, Any]) -> Iterator[Sequence[int]]:
+    geometry_type = obj.get("type")
+    if geometry_type == "GeometryCollection":
+        for child in obj.get("geometries") or []:
+            yield from _polygon_rings(child)
+    elif geometry_type == "Polygon":
+        yield from obj.get("arcs") or []
+    elif geometry_type == "MultiPolygon":
+        for polygon in obj.get("arcs") or []:
+            yield from polygon
+
+
+def _round_points(obj: Dict[str, Any], digits: int) -> None:
+    geometry_type = obj.get("type")
+    if geometry_type == "GeometryCollection":
+        for child in obj.get("geometries") or []:
+            _round_points(child, digits)
+    elif geometry_type in {"Point", "MultiPoint"} and "coordinates" in obj:
+        obj["coordinates"] = round_nested(obj["coordinates"], digits)
+
+
+def simplify_arcs(
+    arcs: List[List[List[float]]],
+    *,
+    precision: int,
+    simplify_tolerance: float,
+    rings: Sequence[Sequence[int]] = (),
+) -> List[List[List[float]]]:
+    """Round and Douglas-Peucker simplify absolute TopoJSON arcs.
+
+    Each shared border is simplified exactly once and its endpoints are kept,
+    so neighbouring areas stay watertight. ``rings`` lists the arc indices of
+    every polygon ring; arcs of rings that would collapse below four points
+    are only rounded, not simplified.
+    """
+    if not arcs:
+        return []
+    lengths = np.fromiter((len(arc) for arc in arcs), dtype=np.int64, count=len(arcs))
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    coords = np.fromiter(
+        (value for arc in arcs for point in arc for value in point[:2]),
+        dtype=np.float64,
+        count=2 * int(offsets[-1]),
+    ).reshape(-1, 2)
+
+    if simplify_tolerance <= 0 or shapely is None or lengths.min() < 2:
+        if simplify_tolerance > 0:
+            print("Warning: arc simplification unavailable; coordinates only rounded.", file=sys.stderr)
+        return _finish_arcs(coords, offsets, precision)
+
+    lines = shapely.from_ragged_array(shapely.GeometryType.LINESTRING, coords, (offsets,))
+    simplified = shapely.simplify(lines, simplify_tolerance, preserve_topology=False)
+    _, simplified_coords, (simplified_offsets,) = shapely.to_ragged_array(simplified)
+    result = _finish_arcs(simplified_coords, simplified_offsets.astype(np.int64), precision)
+
+    collapsed = set()
+    for ring in rings:
+        size = 1 + sum(len(result[index if index >= 0 else ~index]) - 1 for index in ring)
+        if size < 4:
+            collapsed.update(index if index >= 0 else ~index for index in ring)
+    if collapsed:
+        rounded = _finish_arcs(coords, offsets, precision)
+        for index in collapsed:
+            result[index] = rounded[index]
+    return result
+
+
+def simplify_topology_arcs(
+    topology: Dict[str, Any],
+    *,
+    precision: int,
+    simplify_tolerance: float,
+) -> Dict[str, Any]:
+    """Simplify a TopoJSON topology in place of its features.
+
+    Arcs are decoded to absolute coordinates, rounded and simplified, and the
+    geometry objects are reused untouched, so no topology has to be rebuilt.
+    """
+    objects = topology.get("objects") or {}
+    rings = [ring for obj in objects.values() for ring in _polygon_rings(obj)]
+    arcs = simplify_arcs(
+        decode_arcs(topology),
+        precision=precision,
+        simplify_tolerance=simplify_tolerance,
+        rings=rings,
+    )
+    for obj in objects.values():
+        _round_points(obj, precision)
+
+    result = {key: value for key, value in topology.items() if key != "transform"}
+    result["arcs"] = arcs
+    if "bbox" in result and arcs:
+        points = np.array([point for arc in arcs for point in arc], dtype=np.float64)
+        result["bbox"] = [*points.min(axis=0).tolist(), *points.max(axis=0).tolist()]
+    return result
 
 
 def simplify_topojson(
@@ -126,19 +324,37 @@ def simplify_topojson(
     precision: int = 4,
     simplify_tolerance: float = 0.0,
     quiet: bool = False,
+    mode: str = DEFAULT_SIMPLIFY_MODE,
+    quantize: int | None = None,
+    compress: Sequence[str] = (),
 ) -> Dict[str, int | float]:
     ensure_source(source)
+    if mode not in SIMPLIFY_MODES:
+        raise ValueError(f"Unknown simplification mode: {mode}")
+
+    if mode == "arcs":
+        with open(source, "r", encoding="utf-8") as handle:
+            topology = simplify_topology_arcs(
+                json.load(handle),
+                precision=precision,
+                simplify_tolerance=simplify_tolerance,
+            )
+        if not topology.get("objects"):
+            raise ValueError("No features available to simplify")
+    else:
+        features = load_global_features(source)
+        if not features:
+            raise ValueError("No features available to simplify")
+
+        processed = simplify_features(
+            features,
+            precision=precision,
+            simplify_tolerance=simplify_tolerance,
+        )
+        topology = build_topology(processed)
 
-    features = load_global_features(source)
-    if not features:
-        raise ValueError("No features available to simplify")
-
-    processed = simplify_features(
-        features,
-        precision=precision,
-        simplify_tolerance=simplify_tolerance,
-    )
-    topology = build_topology(processed)
+    if quantize:
+        topology = quantize_topology(topology, quantize)
 
     target = output or source
     write_output(target, topology)
@@ -155,8 +371,13 @@ def simplify_topojson(
         "size_ratio": ratio,
         "precision": precision,
         "simplify_tolerance": simplify_tolerance,
+        "mode": mode,
+        "quantize": quantize,
         "output_path": str(target),
     }
+    if compress:
+        sidecars = write_sidecars([target], compress)[target]
+        stats["compressed"] = sidecars
 
     if not quiet:
         print(
@@ -164,10 +385,14 @@ def simplify_topojson(
         )
         if simplify_tolerance > 0:
             print(f"Simplification tolerance applied: {simplify_tolerance}")
+        if quantize:
+            print(f"Arcs quantized to a {quantize}x{quantize} grid and delta-encoded")
         print(
             f"Size reduced from {original_size:,} bytes to {new_size:,} bytes "
             f"({ratio:.2%} of original, saved {saved:,} bytes)"
         )
+        for fmt, info in stats.get("compressed", {}).items():
+            print(f"Wrote {info['file_name']}: {info['bytes']:,} bytes")
 
     return stats
 
@@ -179,6 +404,9 @@ def minify_topojson(
     precision: int = 4,
     simplify_tolerance: float = 0.0,
     quiet: bool = False,
+    mode: str = DEFAULT_SIMPLIFY_MODE,
+    quantize: int | None = None,
+    compress: Sequence[str] = (),
 ) -> Dict[str, int | float]:
     """Backward compatible alias for the previous function name."""
 
@@ -188,6 +416,9 @@ def minify_topojson(
         precision=precision,
         simplify_tolerance=simplify_tolerance,
         quiet=quiet,
+        mode=mode,
+        quantize=quantize,
+        compress=compress,
     )
 
 
@@ -217,6 +448,28 @@ def main(argv: List[str] | None = None) -> int:
         default=0.0,
         help="Simplification tolerance in coordinate units; set to 0 to disable",
     )
+    parser.add_argument(
+        "--mode",
+        choices=SIMPLIFY_MODES,
+        default=DEFAULT_SIMPLIFY_MODE,
+        help=(
+            "'features' simplifies each feature and rebuilds the topology; 'arcs' simplifies "
+            "the shared arcs directly, keeping borders watertight (default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--quantize",
+        type=int,
+        default=None,
+        help="Write quantized, delta-encoded arcs on an N x N grid (e.g. 100000); omitted keeps absolute coordinates",
+    )
+    parser.add_argument(
+        "--compress",
+        nargs="*",
+        choices=SIDECAR_FORMATS,
+        default=None,
+        help="Also write maximum-compression .gz/.br sidecars; no value means all available formats",
+    )
     args = parser.parse_args(argv)
 
     try:
@@ -226,6 +479,9 @@ def main(argv: List[str] | None = None) -> int:
             precision=args.precision,
             simplify_tolerance=args.simplify_tolerance,
             quiet=False,
+            mode=args.mode,
+            quantize=args.quantize,
+            compress=SIDECAR_FORMATS if args.compress == [] else (args.compress or ()),
         )
     except FileNotFoundError as exc:
         print(str(exc), file=sys.stderr)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Packed R-tree sidecars for point-in-area lookups.
+
+``write_spatial_index`` stores an STR-packed R-tree over the feature bounding
+boxes of a TopoJSON file next to it (``X.topojson`` -> ``X.topojson.sidx``):
+
+* a fixed header (magic, version, node capacity, level count, SHA-256 of the
+  source file) followed by the node count of every level, leaves first;
+* the leaf order as ``uint32`` feature offsets into the file's features;
+* the ``float64`` ``(minx, miny, maxx, maxy)`` boxes of every level.
+
+Leaves are sorted with Sort-Tile-Recursive and every parent covers
+``capacity`` consecutive children, so the tree needs no child pointers.
+
+``SpatialIndex.open(path)`` loads the sidecar (or builds the tree in memory
+when it is missing or stale) together with the feature geometries.
+``lookup(points)`` then walks the tree for a whole ``(N, 2)`` lon/lat array at
+once and confirms candidates with Shapely's vectorised ``contains_xy``.
+
+Usage example:
+
+    python scripts/spatial_index.py data/global_areas.topojson --point 28.3 -15.4
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import shapely
+    from shapely.geometry import shape
+except ImportError:  # pragma: no cover - shapely ships with topojson
+    shapely = None  # type: ignore[assignment]
+    shape = None  # type: ignore[assignment]
+
+try:
+    from .build_manifest import file_sha256
+    from .geometry_arrays import is_packable, pack_polygons, to_shapely
+    from .topojson_io import load_topojson_features
+except ImportError:  # pragma: no cover - script executed directly
+    from build_manifest import file_sha256
+    from geometry_arrays import is_packable, pack_polygons, to_shapely
+    from topojson_io import load_topojson_features
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_ROOT / "data"
+
+SIDECAR_SUFFIX = ".sidx"
+MAGIC = b"IPCSIDX\0"
+VERSION = 1
+DEFAULT_NODE_CAPACITY = 16
+DEFAULT_BATCH_SIZE = 65536
+# Rough per-geometry cost of a shapely object plus its STR-tree slot.
+GEOMETRY_OVERHEAD_BYTES = 256
+
+_HEADER = struct.Struct("<8sHHI32s")
+
+
+def spatial_index_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}{SIDECAR_SUFFIX}")
+
+
+def feature_geometries(features: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Shapely geometries for ``features`` (``None`` where a feature has none)."""
+    if shapely is None:
+        raise RuntimeError("shapely is required for spatial indexing")
+    geometries = np.empty(len(features), dtype=object)
+    batch = [index for index, feature in enumerate(features) if is_packable(feature.get("geometry"))]
+    if batch:
+        geometries[batch] = to_shapely(pack_polygons([features[index]["geometry"] for index in batch]))
+    packed = set(batch)
+    for index, feature in enumerate(features):
+        if index not in packed and feature.get("geometry"):
+            geometries[index] = shape(feature["geometry"])
+    return geometries
+
+
+def geometry_nbytes(geometries: np.ndarray) -> int:
+    """Approximate memory held by shapely ``geometries`` and an STR-tree over them."""
+    present = geometries[geometries != None]  # noqa: E711
+    coordinates = int(shapely.get_num_coordinates(present).sum()) if len(present) else 0
+    return 16 * coordinates + GEOMETRY_OVERHEAD_BYTES * len(geometries)
+
+
+def _str_order(boxes: np.ndarray, capacity: int) -> np.ndarray:
+    """Sort-Tile-Recursive order: vertical slices by x centre, then by y."""
+    count = len(boxes)
+    centres_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    centres_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    slices = max(1, math.ceil(math.sqrt(math.ceil(count / capacity))))
+    slice_size = slices * capacity
+
+    by_x = np.argsort(centres_x, kind="stable")
+    order = np.empty(count, dtype=np.int64)
+    for start in range(0, count, slice_size):
+        members = by_x[start:start + slice_size]
+        order[start:start + len(members)] = members[np.argsort(centres_y[members], kind="stable")]
+    return order
+
+
+def _parent_boxes(boxes: np.ndarray, capacity: int) -> np.ndarray:
+    starts = np.arange(0, len(boxes), capacity)
+    return np.column_stack([
+        np.fmin.reduceat(boxes[:, 0], starts),
+        np.fmin.reduceat(boxes[:, 1], starts),
+        np.fmax.reduceat(boxes[:, 2], starts),
+        np.fmax.reduceat(boxes[:, 3], starts),
+    ])
+
+
+def build_tree(boxes: np.ndarray, capacity: int = DEFAULT_NODE_CAPACITY) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Pack ``(N, 4)`` boxes into an R-tree.
+
+    Returns the leaf order and the node boxes of every level, leaves first
+    and a single root last. Empty boxes (NaN bounds) never match a query.
+    """
+    if capacity < 2:
+        raise ValueError("Node capacity must be at least 2")
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    order = _str_order(boxes, capacity)
+    levels = [boxes[order]]
+    while len(levels[-1]) > 1:
+        levels.append(_parent_boxes(levels[-1], capacity))
+    return order, levels
+
+
+class SpatialIndex:
+    """Packed R-tree over a feature collection plus its geometries."""
+
+    def __init__(
+        self,
+        order: np.ndarray,
+        levels: List[np.ndarray],
+        capacity: int,
+        geometries: np.ndarray,
+        properties: Sequence[Dict[str, Any]],
+    ):
+        self.order = order
+        self.levels = levels
+        self.capacity = capacity
+        self.geometries = geometries
+        self.properties = list(properties)
+        self.ids = np.empty(len(self.properties), dtype=object)
+        self.ids[:] = [record.get("id") for record in self.properties]
+        years = np.array(
+            [record.get("year") if isinstance(record.get("year"), int) else -1 for record in self.properties],
+            dtype=np.int64,
+        )
+        # Overlapping areas (the same area in several assessment years) resolve
+        # to the most recent year, then to the earlier feature.
+        self.rank = np.lexsort((np.arange(len(years)), -years))
+        self.rank_of = np.empty(len(years), dtype=np.int64)
+        self.rank_of[self.rank] = np.arange(len(years))
+        if shapely is not None:
+            shapely.prepare(geometries[geometries != None])  # noqa: E711
+
+    @classmethod
+    def from_features(
+        cls,
+        features: Sequence[Dict[str, Any]],
+        capacity: int = DEFAULT_NODE_CAPACITY,
+        tree: Optional[Tuple[np.ndarray, List[np.ndarray]]] = None,
+    ) -> "SpatialIndex":
+        geometries = feature_geometries(features)
+        if tree is None:
+            tree = build_tree(shapely.bounds(geometries), capacity)
+        properties = [feature.get("properties") or {} for feature in features]
+        return cls(tree[0], tree[1], capacity, geometries, properties)
+
+    @classmethod
+    def open(cls, path: Path) -> "SpatialIndex":
+        """Load ``path`` and its sidecar, building the tree if the sidecar is stale."""
+        path = Path(path)
+        features = load_topojson_features(path)
+        tree = read_spatial_index(path)
+        if tree is not None and len(tree[0]) != len(features):
+            tree = None
+        capacity = tree[2] if tree is not None else DEFAULT_NODE_CAPACITY
+        return cls.from_features(features, capacity, None if tree is None else tree[:2])
+
+    def candidates(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(point, feature)`` pairs whose bounding box contains the point."""
+        point = np.arange(len(xs) if len(self.order) else 0)
+        node = np.zeros(len(point), dtype=np.int64)
+        for depth in range(len(self.levels) - 1, -1, -1):
+            boxes = self.levels[depth]
+            if depth < len(self.levels) - 1:
+                # Expand every surviving node into its consecutive children.
+                first = node * self.capacity
+                counts = np.minimum(first + self.capacity, len(boxes)) - first
+                point = np.repeat(point, counts)
+                starts = np.repeat(first - np.cumsum(counts) + counts, counts)
+                node = starts + np.arange(len(point))
+            box = boxes[node]
+            hit = (box[:, 0] <= xs[point]) & (xs[point] <= box[:, 2]) & (box[:, 1] <= ys[point]) & (ys[point] <= box[:, 3])
+            point, node = point[hit], node[hit]
+        return point, self.order[node]
+
+    def query(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(point, feature)`` pairs for every feature containing a point."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        xs, ys = points[:, 0], points[:, 1]
+        point, feature = self.candidates(xs, ys)
+        if not len(point):
+            return point, feature
+
+        grouping = np.argsort(feature, kind="stable")
+        point, feature = point[grouping], feature[grouping]
+        inside = np.zeros(len(point), dtype=bool)
+        bounds = np.flatnonzero(np.diff(feature)) + 1
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(feature)]):
+            geometry = self.geometries[feature[start]]
+            if geometry is not None:
+                members = point[start:end]
+                inside[start:end] = shapely.contains_xy(geometry, xs[members], ys[members])
+        return point[inside], feature[inside]
+
+    def locate(self, points: np.ndarray, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """Index of the feature containing each ``(lon, lat)`` point, or -1."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(len(points), -1, dtype=np.int64)
+        for start in range(0, len(points), batch_size):
+            point, feature = self.query(points[start:start + batch_size])
+            if not len(point):
+                continue
+            best = np.full(min(batch_size, len(points) - start), len(self.rank), dtype=np.int64)
+            np.minimum.at(best, point, self.rank_of[feature])
+            matched = np.flatnonzero(best < len(self.rank))
+            result[start + matched] = self.rank[best[matched]]
+        return result
+
+    def lookup(self, points: np.ndarray, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """Area id containing each ``(lon, lat)`` point, or ``None``."""
+        located = self.locate(points, batch_size)
+        result = np.full(len(located), None, dtype=object)
+        found = located >= 0
+        result[found] = self.ids[located[found]]
+        return result
+
+
+def write_spatial_index(path: Path, capacity: int = DEFAULT_NODE_CAPACITY) -> Path:
+    """Write (or keep an up-to-date) sidecar for ``path`` and return its path."""
+    path = Path(path)
+    target = spatial_index_path(path)
+    digest = bytes.fromhex(file_sha256(path))
+    if _read_header(target, digest) is not None:
+        return target
+
+    geometries = feature_geometries(load_topojson_features(path))
+    order, levels = build_tree(shapely.bounds(geometries), capacity)
+
+    tmp_path = target.with_name(target.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, VERSION, capacity, len(levels), digest))
+        handle.write(np.array([len(level) for level in levels], dtype="<u4").tobytes())
+        handle.write(order.astype("<u4").tobytes())
+        for level in levels:
+            handle.write(level.astype("<f8").tobytes())
+    os.replace(tmp_path, target)
+    return target
+
+
+def _read_header(target: Path, digest: bytes) -> Optional[Tuple[int, int]]:
+    try:
+        with open(target, "rb") as handle:
+            header = handle.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) != _HEADER.size:
+        return None
+    magic, version, capacity, level_count, stored = _HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or stored != digest:
+        return None
+    return capacity, level_count
+
+
+def read_spatial_index(path: Path) -> Optional[Tuple[np.ndarray, List[np.ndarray], int]]:
+    """Leaf order, level boxes and capacity from a current sidecar, else None."""
+    target = spatial_index_path(Path(path))
+    header = _read_header(target, bytes.fromhex(file_sha256(path)))
+    if header is None:
+        return None
+    capacity, level_count = header
+
+    payload = target.read_bytes()
+    offset = _HEADER.size
+    sizes = np.frombuffer(payload, dtype="<u4", count=level_count, offset=offset).astype(np.int64)
+    offset += 4 * level_count
+    order = np.frombuffer(payload, dtype="<u4", count=int(sizes[0]), offset=offset).astype(np.int64)
+    offset += 4 * int(sizes[0])
+    levels = []
+    for size in sizes:
+        levels.append(np.frombuffer(payload, dtype="<f8", count=4 * int(size), offset=offset).reshape(-1, 4))
+        offset += 32 * int(size)
+    return order, levels, capacity
+
+
+def default_targets() -> List[Path]:
+    targets = sorted(DATA_DIR.glob("*/*_combined_areas.topojson"))
+    global_path = DATA_DIR / "global_areas.topojson"
+    if global_path.exists():
+        targets.append(global_path)
+    return targets
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="TopoJSON files to index (default: every combined file and the global file under data/)",
+    )
+    parser.add_argument(
+        "--point",
+        nargs=2,
+        type=float,
+        action="append",
+        metavar=("LON", "LAT"),
+        help="Print the area id containing this point in each file (may be repeated)",
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=DEFAULT_NODE_CAPACITY,
+        help="Children per tree node (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    paths = args.paths or default_targets()
+    if not paths:
+        print("No TopoJSON files to index.", file=sys.stderr)
+        return 1
+
+    for path in paths:
+        target = write_spatial_index(path, args.capacity)
+        print(f"Indexed {path} -> {target.name} ({target.stat().st_size:,} bytes)")
+        if args.point:
+            ids = SpatialIndex.open(path).lookup(np.array(args.point))
+            for (lon, lat), area_id in zip(args.point, ids):
+                print(f"  ({lon}, {lat}): {area_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Direct TopoJSON readers (and the quantizing writer) shared by the scripts.
+
+``topojson.Topology(...).to_geojson()`` rebuilds the whole topology, serialises
+it to one large GeoJSON string and has to be parsed again with ``json.loads``.
+The helpers here decode arcs (quantized/delta-encoded or absolute) once and
+stitch them straight into GeoJSON feature dicts in a single pass.
+
+Polygon rings follow the GeoJSON right-hand rule (counter-clockwise exteriors,
+clockwise holes) like ``to_geojson``'s default. Decoded coordinates may share
+point lists between neighbouring rings, so callers must treat geometries as
+read-only and build new lists when changing coordinates.
+
+``quantize_topology`` goes the other way and turns absolute arcs into the
+standard quantized, delta-encoded form described by a ``transform``.
+"""
+
+from __future__ import annotations
+
+import json
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+Position = List[float]
+Arc = List[Position]
+
+
+def decode_arcs(topology: Dict[str, Any]) -> List[Arc]:
+    """Return the topology's arcs as absolute coordinates."""
+    arcs = topology.get("arcs") or []
+    transform = topology.get("transform")
+    if not transform:
+        return arcs
+
+    scale_x, scale_y = transform.get("scale", (1, 1))
+    translate_x, translate_y = transform.get("translate", (0, 0))
+    decoded: List[Arc] = []
+    for arc in arcs:
+        x = y = 0
+        points: Arc = []
+        for position in arc:
+            x += position[0]
+            y += position[1]
+            points.append([x * scale_x + translate_x, y * scale_y + translate_y, *position[2:]])
+        decoded.append(points)
+    return decoded
+
+
+def _transform_point(position: Sequence[float], transform: Optional[Dict[str, Any]]) -> Position:
+    if not transform:
+        return list(position)
+    scale_x, scale_y = transform.get("scale", (1, 1))
+    translate_x, translate_y = transform.get("translate", (0, 0))
+    return [
+        position[0] * scale_x + translate_x,
+        position[1] * scale_y + translate_y,
+        *position[2:],
+    ]
+
+
+def _line(indices: Sequence[int], arcs: List[Arc]) -> List[Position]:
+    points: List[Position] = []
+    for index in indices:
+        arc = arcs[index] if index >= 0 else arcs[~index][::-1]
+        if points:
+            points.extend(arc[1:])
+        else:
+            points.extend(arc)
+    return points
+
+
+def _orientation_index(p: Position, q: Position, r: Position) -> int:
+    det = (Fraction(q[0]) - Fraction(p[0])) * (Fraction(r[1]) - Fraction(q[1])) - (
+        Fraction(q[1]) - Fraction(p[1])
+    ) * (Fraction(r[0]) - Fraction(q[0]))
+    return (det > 0) - (det < 0)
+
+
+def _is_ccw(ring: Sequence[Position]) -> bool:
+    """Counter-clockwise test for a closed ring (GEOS ``Orientation::isCCW``).
+
+    Uses the edges around the highest vertex rather than the signed area so
+    tiny or near-degenerate rings get the same answer as Shapely.
+    """
+    count = len(ring) - 1
+    if count < 3:
+        return False
+
+    up_hi = 0
+    up_low = None
+    prev_y = ring[0][1]
+    for index in range(1, count + 1):
+        y = ring[index][1]
+        if y > prev_y and y >= ring[up_hi][1]:
+            up_hi = index
+            up_low = index - 1
+        prev_y = y
+    if up_hi == 0 or up_low is None:
+        return False
+
+    top = ring[up_hi]
+    down_low = up_hi
+    while True:
+        down_low = (down_low + 1) % count
+        if down_low == up_hi or ring[down_low][1] != top[1]:
+            break
+    down_hi = down_low - 1 if down_low > 0 else count - 1
+
+    if ring[down_hi][:2] == top[:2]:
+        low_up, low_down = ring[up_low], ring[down_low]
+        if low_up[:2] == top[:2] or low_down[:2] == top[:2] or low_up[:2] == low_down[:2]:
+            return False
+        return _orientation_index(low_up, top, low_down) == 1
+    return ring[down_hi][0] - top[0] < 0
+
+
+def _polygon(rings: Sequence[Sequence[int]], arcs: List[Arc]) -> List[List[Position]]:
+    polygon: List[List[Position]] = []
+    for position, ring_arcs in enumerate(rings):
+        ring = _line(ring_arcs, arcs)
+        if ring and (len(ring) < 4 or ring[0] != ring[-1]):
+            # Rings collapsed by coordinate rounding: close and pad them into a
+            # valid LinearRing the same way Shapely does.
+            if ring[0] != ring[-1]:
+                ring.append(ring[0])
+            ring.extend([ring[0]] * (4 - len(ring)))
+        if _is_ccw(ring) != (position == 0):
+            ring.reverse()
+        polygon.append(ring)
+    return polygon
+
+
+def decode_geometry(
+    obj: Dict[str, Any],
+    arcs: List[Arc],
+    transform: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Convert a TopoJSON geometry object into a GeoJSON geometry dict."""
+    geometry_type = obj.get("type")
+    if geometry_type is None:
+        return None
+
+    if geometry_type == "GeometryCollection":
+        geometries = [decode_geometry(child, arcs, transform) for child in obj.get("geometries") or []]
+        return {"type": geometry_type, "geometries": [g for g in geometries if g is not None]}
+
+    if geometry_type == "Point":
+        coordinates: Any = _transform_point(obj["coordinates"], transform)
+    elif geometry_type == "MultiPoint":
+        coordinates = [_transform_point(point, transform) for point in obj["coordinates"]]
+    elif geometry_type == "LineString":
+        coordinates = _line(obj["arcs"], arcs)
+    elif geometry_type == "MultiLineString":
+        coordinates = [_line(line, arcs) for line in obj["arcs"]]
+    elif geometry_type == "Polygon":
+        coordinates = _polygon(obj["arcs"], arcs)
+    elif geometry_type == "MultiPolygon":
+        coordinates = [_polygon(polygon, arcs) for polygon in obj["arcs"]]
+    else:
+        raise ValueError(f"Unsupported TopoJSON geometry type: {geometry_type}")
+
+    return {"type": geometry_type, "coordinates": coordinates}
+
+
+def _feature(
+    obj: Dict[str, Any],
+    index: int,
+    arcs: List[Arc],
+    transform: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
+        "id": obj.get("id", index),
+        "type": "Feature",
+        "properties": obj.get("properties") or {},
+        "geometry": decode_geometry(obj, arcs, transform),
+    }
+
+
+def topology_to_features(
+    topology: Dict[str, Any],
+    object_name: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Decode the geometries of a TopoJSON object into GeoJSON features.
+
+    Reads ``object_name`` when given, otherwise the first object, matching
+    ``topojson.Topology.to_geojson``: members of a GeometryCollection become
+    one feature each and missing ids default to the member's position.
+    """
+    objects = topology.get("objects") if isinstance(topology, dict) else None
+    if not isinstance(objects, dict) or not objects:
+        return []
+
+    name = object_name if object_name is not None else next(iter(objects))
+    obj = objects.get(name)
+    if not isinstance(obj, dict):
+        return []
+
+    if obj.get("type") == "GeometryCollection":
+        members = obj.get("geometries") or []
+    else:
+        members = [obj]
+    arcs = decode_arcs(topology)
+    transform = topology.get("transform")
+    return [
+        _feature(member, index, arcs, transform)
+        for index, member in enumerate(members)
+        if isinstance(member, dict)
+    ]
+
+
+def load_topojson_features(path: Path) -> List[Dict[str, Any]]:
+    """Read a TopoJSON file and return its GeoJSON features."""
+    with open(path, "r", encoding="utf-8") as handle:
+        topo_payload = json.load(handle)
+    return topology_to_features(topo_payload)
+
+
+def _point_objects(obj: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    geometry_type = obj.get("type")
+    if geometry_type == "GeometryCollection":
+        for child in obj.get("geometries") or []:
+            yield from _point_objects(child)
+    elif geometry_type in {"Point", "MultiPoint"} and "coordinates" in obj:
+        yield obj
+
+
+def quantize_topology(topology: Dict[str, Any], quantization: int) -> Dict[str, Any]:
+    """Return a copy of ``topology`` with quantized, delta-encoded arcs.
+
+    Coordinates are snapped to a ``quantization`` x ``quantization`` grid over
+    the topology's bounding box, following the TopoJSON specification. Points
+    that repeat their predecessor after snapping are dropped (every arc keeps
+    at least two positions). Geometry objects are shared with the input and
+    Point/MultiPoint coordinates are rewritten in place.
+    """
+    if quantization < 2:
+        raise ValueError("Quantization must be at least 2")
+
+    arcs = decode_arcs(topology)
+    transform = topology.get("transform")
+    objects = topology.get("objects") or {}
+    point_objects = [point for obj in objects.values() for point in _point_objects(obj)]
+    positions = [
+        _transform_point(position, transform)
+        for point in point_objects
+        for position in (
+            [point["coordinates"]] if point["type"] == "Point" else point["coordinates"]
+        )
+    ]
+
+    lengths = np.fromiter((len(arc) for arc in arcs), dtype=np.int64, count=len(arcs))
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    coords = np.fromiter(
+        (value for arc in arcs for position in arc for value in position[:2]),
+        dtype=np.float64,
+        count=2 * int(offsets[-1]),
+    ).reshape(-1, 2)
+    extent = np.concatenate((coords, np.array([p[:2] for p in positions], dtype=np.float64).reshape(-1, 2)))
+    if not len(extent):
+        return dict(topology)
+
+    low = extent.min(axis=0)
+    high = extent.max(axis=0)
+    scale = np.where(high > low, (high - low) / (quantization - 1), 1.0)
+
+    def snap(values: np.ndarray) -> np.ndarray:
+        return np.floor((values - low) / scale + 0.5).astype(np.int64)
+
+    quantized = snap(coords)
+    deltas = quantized.copy()
+    deltas[1:] -= quantized[:-1]
+    starts = offsets[:-1][lengths > 0]
+    deltas[starts] = quantized[starts]
+    keep = np.any(deltas != 0, axis=1)
+    keep[starts] = True
+    kept_offsets = np.concatenate(([0], np.cumsum(keep)))[offsets]
+
+    kept = deltas[keep].tolist()
+    encoded = []
+    for start, end in zip(kept_offsets[:-1].tolist(), kept_offsets[1:].tolist()):
+        arc = kept[start:end]
+        if len(arc) == 1:
+            arc.append([0, 0])
+        encoded.append(arc)
+
+    for point in point_objects:
+        if point["type"] == "Point":
+            point["coordinates"] = snap(np.array(_transform_point(point["coordinates"], transform)[:2])).tolist()
+        else:
+            point["coordinates"] = [
+                snap(np.array(_transform_point(position, transform)[:2])).tolist()
+                for position in point["coordinates"]
+            ]
+
+    result = {key: value for key, value in topology.items() if key not in {"arcs", "transform"}}
+    if "bbox" in result:
+        result["bbox"] = [*low.tolist(), *high.tolist()]
+    result["transform"] = {"scale": scale.tolist(), "translate": low.tolist()}
+    result["arcs"] = encoded
+    return result
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Concatenate TopoJSON topologies without rebuilding them.
+
+Building the global dataset with ``topojson.Topology`` re-detects shared arcs
+across the whole world even though every country file already is a topology
+and countries rarely share IPC borders. ``concatenate_topologies`` instead
+copies the selected geometry objects of each source, keeps only the arcs they
+use and offsets their arc indices (arcs are decoded to absolute coordinates,
+so quantized sources can be mixed; callers re-quantize the result to a common
+transform if needed).
+
+Shared-arc detection only runs where sources meet: arcs whose bounding box
+touches the extent of another source are matched against each other, and an
+arc that repeats one from a different source (in either direction) is
+replaced by a reference to it. Arcs are matched whole, so a border split at
+different junctions on each side stays as separate arcs; that only costs file
+size, not correctness. The work is linear in the number of arcs.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .topojson_io import decode_arcs
+except ImportError:  # pragma: no cover - script executed directly
+    from topojson_io import decode_arcs
+
+Member = Dict[str, Any]
+# Stand-in key holding the ``(topology, member)`` pair a stand-in was made from.
+MEMBER_SOURCE_KEY = "_source"
+
+
+def topology_members(topology: Dict[str, Any], object_name: Optional[str] = None) -> List[Member]:
+    """Geometry objects of ``object_name`` (default: the first object)."""
+    objects = topology.get("objects") if isinstance(topology, dict) else None
+    if not isinstance(objects, dict) or not objects:
+        return []
+    obj = objects.get(object_name if object_name is not None else next(iter(objects)))
+    if not isinstance(obj, dict):
+        return []
+    members = (obj.get("geometries") or []) if obj.get("type") == "GeometryCollection" else [obj]
+    return [member for member in members if isinstance(member, dict)]
+
+
+def member_features(members: Sequence[Member], topology: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Feature stand-ins for keying members without decoding their geometry.
+
+    The ``geometry`` only records the geometry type (so keying can tell which
+    members have one); use cached fingerprints for geometry keys. Each
+    stand-in carries ``(topology, member)`` under ``MEMBER_SOURCE_KEY`` so the
+    selected members can be passed to ``concatenate_topologies``.
+    """
+    return [
+        {
+            "type": "Feature",
+            "id": member.get("id"),
+            "properties": member.get("properties") or {},
+            "geometry": {"type": member["type"]} if member.get("arcs") else None,
+            MEMBER_SOURCE_KEY: (topology, member),
+        }
+        for member in members
+    ]
+
+
+def _map_arcs(value: Any, mapping: Callable[[int], int]) -> Any:
+    if isinstance(value, list):
+        return [_map_arcs(item, mapping) for item in value]
+    return mapping(value)
+
+
+def _member_arcs(member: Member) -> List[int]:
+    used: List[int] = []
+
+    def collect(value: Any) -> None:
+        if isinstance(value, list):
+            for item in value:
+                collect(item)
+        else:
+            used.append(value if value >= 0 else ~value)
+
+    collect(member.get("arcs") or [])
+    for child in member.get("geometries") or []:
+        used.extend(_member_arcs(child))
+    return used
+
+
+def _remap_member(member: Member, mapping: Callable[[int], int]) -> Member:
+    remapped = dict(member)
+    if "arcs" in member:
+        remapped["arcs"] = _map_arcs(member["arcs"], mapping)
+    if "geometries" in member:
+        remapped["geometries"] = [_remap_member(child, mapping) for child in member["geometries"]]
+    return remapped
+
+
+def _arc_bounds(arcs: Sequence[Sequence[Sequence[float]]]) -> np.ndarray:
+    lengths = np.fromiter((len(arc) for arc in arcs), dtype=np.int64, count=len(arcs))
+    coords = np.array([point[:2] for arc in arcs for point in arc], dtype=np.float64).reshape(-1, 2)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.column_stack([
+        np.minimum.reduceat(coords[:, 0], starts),
+        np.minimum.reduceat(coords[:, 1], starts),
+        np.maximum.reduceat(coords[:, 0], starts),
+        np.maximum.reduceat(coords[:, 1], starts),
+    ])
+
+
+def _share_border_arcs(
+    arcs: List[List[List[float]]], owners: np.ndarray
+) -> Tuple[List[int], int]:
+    """Map every arc to a kept arc (``~index`` when reversed); count the merged ones."""
+    mapping = list(range(len(arcs)))
+    sources = np.unique(owners)
+    if len(sources) < 2 or not arcs:
+        return mapping, 0
+
+    bounds = _arc_bounds(arcs)
+    border_mask = np.zeros(len(arcs), dtype=bool)
+    for source in sources.tolist():
+        own = owners == source
+        minx, miny = bounds[own, :2].min(axis=0)
+        maxx, maxy = bounds[own, 2:].max(axis=0)
+        border_mask |= (
+            ~own
+            & (bounds[:, 0] <= maxx)
+            & (bounds[:, 2] >= minx)
+            & (bounds[:, 1] <= maxy)
+            & (bounds[:, 3] >= miny)
+        )
+    border = np.flatnonzero(border_mask)
+
+    seen: Dict[Tuple[Tuple[float, ...], ...], Tuple[int, int]] = {}
+    merged = 0
+    for index in border.tolist():
+        key = tuple(tuple(point) for point in arcs[index])
+        match = seen.get(key)
+        if match is not None and match[1] != owners[index]:
+            mapping[index] = match[0]
+            merged += 1
+            continue
+        match = seen.get(key[::-1])
+        if match is not None and match[1] != owners[index]:
+            mapping[index] = ~match[0]
+            merged += 1
+            continue
+        seen.setdefault(key, (index, int(owners[index])))
+    return mapping, merged
+
+
+def _global_index(index: int, local: Dict[int, int], final: Sequence[int]) -> int:
+    """Output index for a source arc reference (negative = reversed)."""
+    if index >= 0:
+        return final[local[index]]
+    return ~final[local[~index]]
+
+
+def concatenate_topologies(
+    parts: Sequence[Tuple[Dict[str, Any], Member]],
+    *,
+    object_name: str = "data",
+) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """Build one topology from ``(source topology, member)`` pairs, in order.
+
+    Members get ``topojson``-style positional ids (``feature_000``...). Returns
+    the topology with absolute arcs and ``{"sources", "arcs", "shared_arcs"}``.
+    """
+    decoded: Dict[int, List[List[List[float]]]] = {}
+    offsets: Dict[int, Dict[int, int]] = {}
+    ordinals: Dict[int, int] = {}
+    arcs: List[List[List[float]]] = []
+    owners: List[int] = []
+
+    for topology, member in parts:
+        source = id(topology)
+        if source not in decoded:
+            decoded[source] = decode_arcs(topology)
+            offsets[source] = {}
+            ordinals[source] = len(ordinals)
+        local = offsets[source]
+        for index in _member_arcs(member):
+            if index not in local:
+                local[index] = len(arcs)
+                arcs.append([list(point) for point in decoded[source][index]])
+                owners.append(ordinals[source])
+
+    shared, merged = _share_border_arcs(arcs, np.asarray(owners, dtype=np.int64))
+    kept = [index for index, target in enumerate(shared) if target == index]
+    compact = {index: position for position, index in enumerate(kept)}
+    final = [compact[target] if target >= 0 else ~compact[~target] for target in shared]
+
+    width = len(str(len(parts)))
+    geometries = []
+    for position, (topology, member) in enumerate(parts):
+        local = offsets[id(topology)]
+        remapped = _remap_member(member, lambda index: _global_index(index, local, final))
+        remapped["id"] = f"feature_{str(position).zfill(width)}"
+        geometries.append(remapped)
+
+    result_arcs = [arcs[index] for index in kept]
+    result: Dict[str, Any] = {
+        "type": "Topology",
+        "objects": {object_name: {"geometries": geometries, "type": "GeometryCollection"}},
+    }
+    if result_arcs:
+        points = np.array([point[:2] for arc in result_arcs for point in arc], dtype=np.float64)
+        result["bbox"] = [*points.min(axis=0).tolist(), *points.max(axis=0).tolist()]
+    result["arcs"] = result_arcs
+    return result, {"sources": len(decoded), "arcs": len(result_arcs), "shared_arcs": merged}
@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""Mapbox Vector Tile pyramid for the IPC areas.
+
+``build_tiles`` projects the features of a TopoJSON file to Web Mercator and,
+for every zoom level, simplifies them with a tolerance of one tile pixel
+(``extent`` units per tile) through ``simplify_shapely``, clips them to each
+tile (plus a ``buffer``) and encodes the tile as an MVT 2.1 protobuf with a
+single polygon layer. Tiles are rendered in batches on a process pool and
+written either as a ``{z}/{x}/{y}.pbf`` directory tree with a ``metadata.json``
+or, when the output ends in ``.mbtiles``, as a single MBTiles 1.3 SQLite file
+(gzip-compressed tile data, TMS rows).
+
+The protobuf encoding is implemented here, so no vector tile library is
+needed; Shapely does the projection, simplification and clipping.
+
+Usage example:
+
+    python scripts/vector_tiles.py data/global_areas.topojson --output build/tiles.mbtiles \
+        --min-zoom 0 --max-zoom 8 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import shapely
+except ImportError:  # pragma: no cover - shapely ships with topojson
+    shapely = None  # type: ignore[assignment]
+
+try:
+    from .simplify_ipc_global_areas import simplify_shapely
+    from .spatial_index import feature_geometries, geometry_nbytes
+    from .topojson_io import load_topojson_features
+except ImportError:  # pragma: no cover - script executed directly
+    from simplify_ipc_global_areas import simplify_shapely
+    from spatial_index import feature_geometries, geometry_nbytes
+    from topojson_io import load_topojson_features
+
+DEFAULT_MIN_ZOOM = 0
+DEFAULT_MAX_ZOOM = 10
+DEFAULT_EXTENT = 4096
+DEFAULT_BUFFER = 64
+DEFAULT_LAYER = "ipc_areas"
+TILES_PER_TASK = 8
+PENDING_PER_WORKER = 4
+DEFAULT_CACHED_LEVELS = 4
+
+EARTH_RADIUS = 6378137.0
+HALF_WORLD = math.pi * EARTH_RADIUS
+MAX_LATITUDE = 85.0511287798066
+
+_MOVE_TO, _LINE_TO, _CLOSE_PATH = 1, 2, 7
+_POLYGON = 3
+
+
+# --- protobuf encoding ---------------------------------------------------
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _bytes_field(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _packed_field(field: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(field, b"".join(_varint(value) for value in values))
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _key(7, 0) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _key(5, 0) + _varint(value)
+        return _key(6, 0) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, 1) + np.float64(value).tobytes()
+    return _bytes_field(1, str(value).encode("utf-8"))
+
+
+def _ring_commands(ring: np.ndarray, cursor: List[int]) -> List[int]:
+    commands = [(_MOVE_TO & 0x7) | (1 << 3), _zigzag(int(ring[0, 0]) - cursor[0]), _zigzag(int(ring[0, 1]) - cursor[1])]
+    deltas = np.diff(ring, axis=0)
+    commands.append((_LINE_TO & 0x7) | (len(deltas) << 3))
+    for dx, dy in deltas.tolist():
+        commands.append(_zigzag(dx))
+        commands.append(_zigzag(dy))
+    commands.append((_CLOSE_PATH & 0x7) | (1 << 3))
+    cursor[0], cursor[1] = int(ring[-1, 0]), int(ring[-1, 1])
+    return commands
+
+
+def _tile_ring(coords: np.ndarray) -> Optional[np.ndarray]:
+    """Drop the closing and repeated points; None when the ring collapsed."""
+    ring = coords[:-1].astype(np.int64)
+    keep = np.ones(len(ring), dtype=bool)
+    keep[1:] = np.any(ring[1:] != ring[:-1], axis=1)
+    ring = ring[keep]
+    if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    return ring if len(ring) >= 3 else None
+
+
+def _signed_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0].astype(np.float64), ring[:, 1].astype(np.float64)
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def encode_polygon_geometry(geometry: Any) -> List[int]:
+    """MVT command integers for a (Multi)Polygon in integer tile coordinates.
+
+    Exterior rings get a positive and holes a negative area in tile space
+    (y pointing down), as MVT 2.1 requires.
+    """
+    commands: List[int] = []
+    cursor = [0, 0]
+    for polygon in shapely.get_parts(geometry):
+        if shapely.get_type_id(polygon) != shapely.GeometryType.POLYGON:
+            continue
+        exterior = _tile_ring(shapely.get_coordinates(polygon.exterior))
+        if exterior is None or _signed_area(exterior) == 0:
+            continue
+        if _signed_area(exterior) < 0:
+            exterior = exterior[::-1]
+        commands.extend(_ring_commands(exterior, cursor))
+        for interior in polygon.interiors:
+            hole = _tile_ring(shapely.get_coordinates(interior))
+            if hole is None or _signed_area(hole) == 0:
+                continue
+            if _signed_area(hole) > 0:
+                hole = hole[::-1]
+            commands.extend(_ring_commands(hole, cursor))
+    return commands
+
+
+def encode_tile(layer: str, features: Sequence[Tuple[Any, Dict[str, Any]]], extent: int = DEFAULT_EXTENT) -> bytes:
+    """Encode ``(tile-space geometry, properties)`` pairs as a one-layer tile."""
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_values: List[bytes] = []
+    body = bytearray()
+
+    for geometry, properties in features:
+        commands = encode_polygon_geometry(geometry)
+        if not commands:
+            continue
+        tags: List[int] = []
+        for name, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(name, len(keys)))
+            slot = (type(value), value)
+            if slot not in values:
+                values[slot] = len(encoded_values)
+                encoded_values.append(_encode_value(value))
+            tags.append(values[slot])
+        feature = bytearray()
+        area_id = properties.get("id")
+        if isinstance(area_id, int) and area_id >= 0:
+            feature += _key(1, 0) + _varint(area_id)
+        elif isinstance(area_id, str) and area_id.isdigit():
+            feature += _key(1, 0) + _varint(int(area_id))
+        feature += _packed_field(2, tags)
+        feature += _key(3, 0) + _varint(_POLYGON)
+        feature += _packed_field(4, commands)
+        body += _bytes_field(2, bytes(feature))
+
+    if not body:
+        return b""
+    layer_bytes = bytearray(_key(15, 0) + _varint(2))
+    layer_bytes += _bytes_field(1, layer.encode("utf-8"))
+    layer_bytes += body
+    for name in keys:
+        layer_bytes += _bytes_field(3, name.encode("utf-8"))
+    for value in encoded_values:
+        layer_bytes += _bytes_field(4, value)
+    layer_bytes += _key(5, 0) + _varint(extent)
+    return _bytes_field(3, bytes(layer_bytes))
+
+
+# --- tiling --------------------------------------------------------------
+
+def _to_mercator(coords: np.ndarray) -> np.ndarray:
+    lon = np.radians(coords[:, 0])
+    lat = np.radians(np.clip(coords[:, 1], -MAX_LATITUDE, MAX_LATITUDE))
+    return np.column_stack([EARTH_RADIUS * lon, EARTH_RADIUS * np.log(np.tan(np.pi / 4 + lat / 2))])
+
+
+def tile_size(zoom: int) -> float:
+    return 2 * HALF_WORLD / (1 << zoom)
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    size = tile_size(zoom)
+    minx = -HALF_WORLD + x * size
+    maxy = HALF_WORLD - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def _tiles_for_bounds(bounds: np.ndarray, zoom: int) -> np.ndarray:
+    """Unique ``(x, y)`` tiles touched by any of the mercator ``bounds``."""
+    size = tile_size(zoom)
+    last = (1 << zoom) - 1
+    bounds = bounds[~np.isnan(bounds).any(axis=1)]
+    x0 = np.clip(np.floor((bounds[:, 0] + HALF_WORLD) / size), 0, last).astype(np.int64)
+    x1 = np.clip(np.floor((bounds[:, 2] + HALF_WORLD) / size), 0, last).astype(np.int64)
+    y0 = np.clip(np.floor((HALF_WORLD - bounds[:, 3]) / size), 0, last).astype(np.int64)
+    y1 = np.clip(np.floor((HALF_WORLD - bounds[:, 1]) / size), 0, last).astype(np.int64)
+    tiles = set()
+    for ax, bx, ay, by in zip(x0.tolist(), x1.tolist(), y0.tolist(), y1.tolist()):
+        tiles.update((x, y) for x in range(ax, bx + 1) for y in range(ay, by + 1))
+    return np.array(sorted(tiles), dtype=np.int64).reshape(-1, 2)
+
+
+def _snap_to_grid(geometry: Any) -> Any:
+    """Round tile-space coordinates to integers, keeping the rings valid."""
+    try:
+        return shapely.set_precision(geometry, 1.0)
+    except shapely.errors.GEOSException:
+        pass
+    try:
+        return shapely.set_precision(shapely.make_valid(geometry), 1.0)
+    except shapely.errors.GEOSException:
+        return shapely.transform(geometry, np.rint)
+
+
+def render_tile(
+    zoom: int,
+    x: int,
+    y: int,
+    geometries: np.ndarray,
+    properties: Sequence[Dict[str, Any]],
+    layer: str = DEFAULT_LAYER,
+    extent: int = DEFAULT_EXTENT,
+    buffer: int = DEFAULT_BUFFER,
+) -> bytes:
+    """Encode one tile from mercator ``geometries`` (b"" when it is empty)."""
+    size = tile_size(zoom)
+    margin = size * buffer / extent
+    minx, miny, maxx, maxy = tile_bounds(zoom, x, y)
+    clipped = shapely.clip_by_rect(geometries, minx - margin, miny - margin, maxx + margin, maxy + margin)
+    features = []
+    for geometry, record in zip(clipped, properties):
+        if geometry is None or shapely.is_empty(geometry):
+            continue
+        in_tile = shapely.transform(
+            geometry,
+            lambda coords: np.column_stack([coords[:, 0] - minx, maxy - coords[:, 1]]) * (extent / size),
+        )
+        in_tile = _snap_to_grid(in_tile)
+        if not shapely.is_empty(in_tile):
+            features.append((in_tile, record))
+    return encode_tile(layer, features, extent)
+
+
+def render_tiles(
+    zoom: int,
+    tiles: Sequence[Tuple[int, int]],
+    wkb: Sequence[bytes],
+    properties: Sequence[Dict[str, Any]],
+    candidates: Sequence[Sequence[int]],
+    layer: str = DEFAULT_LAYER,
+    extent: int = DEFAULT_EXTENT,
+    buffer: int = DEFAULT_BUFFER,
+) -> List[Tuple[int, int, int, bytes]]:
+    """Encode a batch of tiles; ``candidates[i]`` index ``wkb`` for ``tiles[i]``."""
+    geometries = shapely.from_wkb(list(wkb))
+    rendered = []
+    for (x, y), members in zip(tiles, candidates):
+        data = render_tile(
+            zoom, x, y, geometries[list(members)], [properties[member] for member in members], layer, extent, buffer
+        )
+        if data:
+            rendered.append((zoom, x, y, data))
+    return rendered
+
+
+class TileSource:
+    """Render single tiles of a feature list on demand.
+
+    Mercator geometries are projected once; each zoom's simplified geometries
+    and their STR-tree are built on first use and the ``max_levels`` most
+    recently used zooms are kept. ``nbytes`` estimates the memory held.
+    """
+
+    def __init__(
+        self,
+        features: Sequence[Dict[str, Any]],
+        *,
+        layer: str = DEFAULT_LAYER,
+        extent: int = DEFAULT_EXTENT,
+        buffer: int = DEFAULT_BUFFER,
+        max_levels: int = DEFAULT_CACHED_LEVELS,
+    ):
+        if shapely is None:
+            raise RuntimeError("shapely is required for vector tiles")
+        geometries = feature_geometries(features)
+        present = np.flatnonzero(geometries != None)  # noqa: E711
+        self.geometries = shapely.transform(geometries[present], _to_mercator)
+        self.properties = [features[index].get("properties") or {} for index in present.tolist()]
+        self.layer = layer
+        self.extent = extent
+        self.buffer = buffer
+        self.max_levels = max(1, int(max_levels))
+        self.levels: "OrderedDict[int, Tuple[np.ndarray, Any, int]]" = OrderedDict()
+        self._base_nbytes = geometry_nbytes(self.geometries)
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._base_nbytes + sum(size for _, _, size in self.levels.values())
+
+    def level(self, zoom: int) -> Tuple[np.ndarray, Any]:
+        with self._lock:
+            entry = self.levels.get(zoom)
+            if entry is not None:
+                self.levels.move_to_end(zoom)
+                return entry[0], entry[1]
+        # Build outside the lock so other zooms keep rendering meanwhile.
+        simplified = simplify_shapely(self.geometries, tile_size(zoom) / self.extent)
+        tree = shapely.STRtree(simplified)
+        with self._lock:
+            self.levels[zoom] = (simplified, tree, geometry_nbytes(simplified))
+            while len(self.levels) > self.max_levels:
+                self.levels.popitem(last=False)
+        return simplified, tree
+
+    def tile(self, zoom: int, x: int, y: int) -> bytes:
+        if not (0 <= zoom <= 24 and 0 <= x < (1 << zoom) and 0 <= y < (1 << zoom)):
+            raise ValueError(f"Tile {zoom}/{x}/{y} is out of range")
+        simplified, tree = self.level(zoom)
+        members = np.sort(tree.query(shapely.box(*tile_bounds(zoom, x, y)), predicate="intersects"))
+        if not len(members):
+            return b""
+        return render_tile(
+            zoom,
+            x,
+            y,
+            simplified[members],
+            [self.properties[member] for member in members.tolist()],
+            self.layer,
+            self.extent,
+            self.buffer,
+        )
+
+
+class TileWriter:
+    """Write tiles to a ``{z}/{x}/{y}.pbf`` tree or an MBTiles file."""
+
+    def __init__(self, output: Path):
+        self.output = Path(output)
+        self.mbtiles = self.output.suffix.lower() == ".mbtiles"
+        self.tmp_path = self.output.with_name(self.output.name + ".tmp")
+        if self.tmp_path.is_dir():
+            shutil.rmtree(self.tmp_path)
+        elif self.tmp_path.exists():
+            self.tmp_path.unlink()
+        self.tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.mbtiles:
+            self.connection = sqlite3.connect(self.tmp_path)
+            self.connection.executescript(
+                "CREATE TABLE metadata (name TEXT, value TEXT);"
+                "CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);"
+            )
+        else:
+            self.tmp_path.mkdir()
+
+    def write(self, zoom: int, x: int, y: int, data: bytes) -> int:
+        if self.mbtiles:
+            payload = gzip.compress(data, mtime=0)
+            self.connection.execute(
+                "INSERT INTO tiles VALUES (?, ?, ?, ?)", (zoom, x, (1 << zoom) - 1 - y, payload)
+            )
+            return len(payload)
+        path = self.tmp_path / str(zoom) / str(x) / f"{y}.pbf"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return len(data)
+
+    def finish(self, metadata: Dict[str, Any]) -> Path:
+        """Store metadata and move the finished output into place."""
+        if self.mbtiles:
+            rows = [(name, value if isinstance(value, str) else json.dumps(value)) for name, value in metadata.items()]
+            self.connection.executemany("INSERT INTO metadata VALUES (?, ?)", rows)
+            self.connection.execute(
+                "CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)"
+            )
+            self.connection.commit()
+            self.connection.close()
+        else:
+            with open(self.tmp_path / "metadata.json", "w", encoding="utf-8") as handle:
+                json.dump(metadata, handle, indent=2)
+
+        if self.output.is_dir():
+            shutil.rmtree(self.output)
+        os.replace(self.tmp_path, self.output)
+        return self.output
+
+
+def tiles_metadata_path(output: Path) -> Path:
+    """File that changes whenever the tile output is rewritten."""
+    return output if output.suffix.lower() == ".mbtiles" else output / "metadata.json"
+
+
+def _batches(
+    zoom: int, geometries: np.ndarray
+) -> Iterator[Tuple[List[Tuple[int, int]], np.ndarray, List[List[int]]]]:
+    tiles = _tiles_for_bounds(shapely.bounds(geometries), zoom)
+    if not len(tiles):
+        return
+    boxes = shapely.box(*np.array([tile_bounds(zoom, x, y) for x, y in tiles.tolist()]).T)
+    tree = shapely.STRtree(geometries)
+    tile_index, feature_index = tree.query(boxes, predicate="intersects")
+    members: List[List[int]] = [[] for _ in range(len(tiles))]
+    for tile, feature in sorted(zip(tile_index.tolist(), feature_index.tolist())):
+        members[tile].append(feature)
+
+    occupied = [index for index, group in enumerate(members) if group]
+    for start in range(0, len(occupied), TILES_PER_TASK):
+        chunk = occupied[start:start + TILES_PER_TASK]
+        used = sorted({feature for index in chunk for feature in members[index]})
+        local = {feature: position for position, feature in enumerate(used)}
+        yield (
+            [tuple(tiles[index].tolist()) for index in chunk],
+            np.array(used, dtype=np.int64),
+            [[local[feature] for feature in members[index]] for index in chunk],
+        )
+
+
+def build_tiles(
+    source: Path,
+    output: Path,
+    *,
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int = DEFAULT_MAX_ZOOM,
+    workers: int = 1,
+    layer: str = DEFAULT_LAYER,
+    extent: int = DEFAULT_EXTENT,
+    buffer: int = DEFAULT_BUFFER,
+) -> Dict[int, Dict[str, int]]:
+    """Render zooms ``min_zoom``..``max_zoom`` of ``source`` into ``output``.
+
+    Returns ``{zoom: {"tiles", "bytes", "max_bytes"}}``.
+    """
+    if shapely is None:
+        raise RuntimeError("shapely is required for vector tiles")
+    if not 0 <= min_zoom <= max_zoom <= 24:
+        raise ValueError("Zoom levels must satisfy 0 <= min_zoom <= max_zoom <= 24")
+
+    features = load_topojson_features(source)
+    properties = [feature.get("properties") or {} for feature in features]
+    geometries = feature_geometries(features)
+    present = np.flatnonzero(geometries != None)  # noqa: E711
+    mercator = shapely.transform(geometries[present], _to_mercator)
+    properties = [properties[index] for index in present]
+
+    writer = TileWriter(output)
+    stats = {zoom: {"tiles": 0, "bytes": 0, "max_bytes": 0} for zoom in range(min_zoom, max_zoom + 1)}
+
+    def store(rendered: List[Tuple[int, int, int, bytes]]) -> None:
+        for zoom, x, y, data in rendered:
+            size = writer.write(zoom, x, y, data)
+            zoom_stats = stats[zoom]
+            zoom_stats["tiles"] += 1
+            zoom_stats["bytes"] += size
+            zoom_stats["max_bytes"] = max(zoom_stats["max_bytes"], size)
+
+    # Batches are collected in submission order once PENDING_PER_WORKER per
+    # worker are in flight: slow low-zoom tiles still overlap with the
+    # simplification of the next levels, but only a bounded window of encoded
+    # tiles is held before reaching the writer, and the output order is stable.
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending: Deque[Future] = deque()
+    try:
+        for zoom in stats:
+            simplified = simplify_shapely(mercator, tile_size(zoom) / extent)
+            for tiles, used, candidates in _batches(zoom, simplified):
+                args = (
+                    zoom,
+                    tiles,
+                    shapely.to_wkb(simplified[used]).tolist(),
+                    [properties[index] for index in used.tolist()],
+                    candidates,
+                    layer,
+                    extent,
+                    buffer,
+                )
+                if pool is None:
+                    store(render_tiles(*args))
+                    continue
+                pending.append(pool.submit(render_tiles, *args))
+                while len(pending) >= PENDING_PER_WORKER * workers:
+                    store(pending.popleft().result())
+        while pending:
+            store(pending.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    minx, miny, maxx, maxy = shapely.total_bounds(geometries[present]) if len(present) else (-180, -85, 180, 85)
+    fields = sorted({name for record in properties for name in record})
+    writer.finish({
+        "name": layer,
+        "format": "pbf",
+        "minzoom": str(min_zoom),
+        "maxzoom": str(max_zoom),
+        "bounds": f"{minx},{miny},{maxx},{maxy}",
+        "center": f"{(minx + maxx) / 2},{(miny + maxy) / 2},{min_zoom}",
+        "json": {
+            "vector_layers": [{
+                "id": layer,
+                "fields": {name: "String" if name != "year" else "Number" for name in fields},
+                "minzoom": min_zoom,
+                "maxzoom": max_zoom,
+            }]
+        },
+    })
+    return stats
+
+
+def format_stats(stats: Dict[int, Dict[str, int]]) -> List[str]:
+    lines = []
+    for zoom, entry in sorted(stats.items()):
+        average = entry["bytes"] / entry["tiles"] if entry["tiles"] else 0
+        lines.append(
+            f"  z{zoom}: {entry['tiles']:,} tiles, {entry['bytes']:,} bytes "
+            f"(avg {average:,.0f}, max {entry['max_bytes']:,})"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, help="TopoJSON file to tile, e.g. data/global_areas.topojson")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Tile directory, or a .mbtiles file for a single SQLite output",
+    )
+    parser.add_argument("--min-zoom", type=int, default=DEFAULT_MIN_ZOOM, help="First zoom level (default: %(default)s)")
+    parser.add_argument("--max-zoom", type=int, default=DEFAULT_MAX_ZOOM, help="Last zoom level (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Render processes (default: CPU count)")
+    parser.add_argument("--layer", default=DEFAULT_LAYER, help="Vector layer name (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = build_tiles(
+            args.source,
+            args.output,
+            min_zoom=args.min_zoom,
+            max_zoom=args.max_zoom,
+            workers=max(args.workers, 1),
+            layer=args.layer,
+        )
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+    print(f"Wrote vector tiles to {args.output}")
+    for line in format_stats(stats):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())